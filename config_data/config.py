@@ -52,30 +52,51 @@ BOT_COMMANDS = {
     ],
     "history": [HISTORY_COMMAND_DATA],
 }
+HOTEL_DETAILS_ON_DEMAND = False
+# Luxury search scans found hotels sorted by price ASC (Hotels API has no
+# price DESC sort), every 200 hotels page is one Hotels API request of
+# RapidAPI quota. Full scan looks through HIGH_PRICE_SCAN_MAX_RESULTS hotels
+# (up to 5 requests per search). Without it only the first page is scanned
+# (1 request per search), so the most expensive of 200 cheapest hotels are
+# found in big cities.
+HIGH_PRICE_FULL_SCAN = True
+HIGH_PRICE_SCAN_MAX_RESULTS = 1000
+SQLITE_PROFILES = {
+    "default": {"pragmas": {}, "timeout": 5},
+    "performance": {
+        "pragmas": {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "cache_size": -16 * 1024,
+            "mmap_size": 64 * 1024 * 1024,
+            "temp_store": "memory",
+        },
+        "timeout": 10,
+    },
+}
 
 
 def load_env_data() -> None:
     """Load .env data and add to os environment.
 
-    If .env or required keys are not found call system exit func.
+    Variables already set in os environment are not overridden by .env,
+    so without .env they are taken from os environment only (docker, tests).
+    If required keys are not found call system exit func.
 
     """
 
-    error_text = "File .env is not found."
-    if not find_dotenv():
-        error_text = ".env is not found."
-    else:
+    if find_dotenv():
         load_dotenv()
-        if not getenv("BOT_TOKEN"):
-            error_text = "BOT TOKEN is not found."
-        elif not getenv("RAPID_API_KEY"):
-            error_text = "RAPID API KEY is not found."
-        elif not getenv("LOGS_FILE_NAME"):
-            error_text = "Logs files name is not found"
-        elif not getenv("DB_NAME"):
-            error_text = "Database name is not found"
-        else:
-            return
+    if not getenv("BOT_TOKEN"):
+        error_text = "BOT TOKEN is not found."
+    elif not getenv("RAPID_API_KEY"):
+        error_text = "RAPID API KEY is not found."
+    elif not getenv("LOGS_FILE_NAME"):
+        error_text = "Logs files name is not found"
+    elif not getenv("DB_NAME"):
+        error_text = "Database name is not found"
+    else:
+        return
     exit(error_text)
 
 
@@ -1 +1,6 @@
-from . import history_model, crud_history_interface
+from . import (
+    history_model,
+    crud_history_interface,
+    telegram_file_model,
+    crud_telegram_file_interface,
+)
@@ -1,11 +1,11 @@
 """Module with CRUD for ORM table 'history'"""
 
-from datetime import datetime
-from typing import Any, Optional
+from typing import Any
 
 from peewee import Model
 
 from .history_model import db, History
+from .history_writer import history_writer
 from project_logging.bot_logger import bot_logger
 
 
@@ -13,6 +13,9 @@ class HistoryCRUD:
     """
     Class HistoryCRUD.
     Class with CRUD operations for ORM table 'history'.
+    Writes are committed in background by history writer, reads wait for
+    pending writes first. Every read opens connection of current thread
+    and closes it.
     """
 
     @staticmethod
@@ -23,40 +26,79 @@ class HistoryCRUD:
             user_id (int): user id
             command (str): command shortcut
 
+        Returns:
+            int: history id
+
         """
-        with db.atomic():
-            created_at = datetime.now()
-            history_id = History.insert(
-                user_id=user_id, command=command, created_at=created_at,
-            ).execute()
+        history_id = history_writer.create(user_id, command)
         bot_logger.debug(f"{user_id=}, {history_id=}")
         return history_id
 
     @staticmethod
-    def get_latest_user_entries(
-            user_id: int, limit: int,
-    ) -> list[Optional[dict]]:
-        """Get latest user records from history table as per limit.
+    def get_latest_user_headers(user_id: int, limit: int) -> list[dict]:
+        """Get latest user records without bot response as per limit.
+
+        Pending history writes are committed before reading.
 
         Args:
             user_id (int): user id
             limit (int): number of entries to get
 
         Returns:
-            list[dict]: latest user history entries
+            list[dict]: latest user history entries with id, created_at,
+                command and user_request
 
         """
-        with db.atomic():
+        HistoryCRUD._flush_writes()
+        with db.connection_context():
             query = (
-                History.select()
+                History.select(
+                    History.id,
+                    History.created_at,
+                    History.command,
+                    History.user_request,
+                )
                 .where(History.user_id == user_id)
                 .order_by(History.id.desc())
                 .limit(limit)
             )
-            response = query.dicts().execute()
+            response = list(query.dicts())
         bot_logger.debug(f"{user_id=}, {limit=}, {response=}")
         return response
 
+    @staticmethod
+    def get_bot_responses(history_ids: list[int]) -> dict[int, str]:
+        """Get bot responses of history records in one query.
+
+        Pending history writes are committed before reading.
+
+        Args:
+            history_ids (list[int]): history ids
+
+        Returns:
+            dict[int, str]: bot response by history id
+
+        """
+        if not history_ids:
+            return {}
+        HistoryCRUD._flush_writes()
+        with db.connection_context():
+            query = History.select(History.id, History.bot_response).where(
+                History.id.in_(history_ids),
+            )
+            response = {
+                i_record.id: i_record.bot_response for i_record in query
+            }
+        bot_logger.debug(f"{history_ids=}, {len(response)=}")
+        return response
+
+    @staticmethod
+    def _flush_writes() -> None:
+        """Wait for pending history writes, log if some of them failed."""
+
+        if not history_writer.flush():
+            bot_logger.warning("History is read without failed writes")
+
     @staticmethod
     def update_field_by_id(
         history_id: int, update_field: Model, new_value: Any,
@@ -70,9 +112,4 @@ class HistoryCRUD:
 
         """
         bot_logger.debug(f"{history_id=}, {update_field=}, {new_value=}")
-        with ((db.atomic())):
-            (
-                History.update({update_field: new_value})
-                .where(History.id == history_id)
-                .execute()
-             )
+        history_writer.update(history_id, update_field.name, new_value)
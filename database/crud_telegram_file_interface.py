@@ -0,0 +1,118 @@
+"""Module with CRUD for ORM table 'telegram_file'"""
+
+from datetime import datetime, timedelta
+
+from .history_model import db
+from .telegram_file_model import TelegramFile
+from project_logging.bot_logger import bot_logger
+
+
+class TelegramFileCRUD:
+    """
+    Class TelegramFileCRUD.
+    Class with CRUD operations for ORM table 'telegram_file'.
+    Every operation opens connection of current thread and closes it.
+
+    Attributes:
+        _max_entries (int): max number of cached file ids, least recently
+            used are deleted
+        _max_age (timedelta): cached file id not used for this time is
+            deleted
+    """
+
+    _max_entries = 50000
+    _max_age = timedelta(days=30)
+
+    @staticmethod
+    def get_file_ids(urls: list[str]) -> dict[str, str]:
+        """Get cached Telegram file ids of photos and mark them as used.
+
+        Args:
+            urls (list[str]): photos urls
+
+        Returns:
+            dict[str, str]: file id by url for cached photos only
+
+        """
+        if not urls:
+            return {}
+        with db.connection_context(), db.atomic():
+            file_ids = {
+                i_row.url: i_row.file_id
+                for i_row in TelegramFile.select().where(
+                    TelegramFile.url.in_(urls),
+                )
+            }
+            if file_ids:
+                (
+                    TelegramFile.update(used_at=datetime.now())
+                    .where(TelegramFile.url.in_(list(file_ids)))
+                    .execute()
+                )
+        bot_logger.debug(f"{len(urls)=}, {len(file_ids)=}")
+        return file_ids
+
+    @classmethod
+    def save_file_ids(cls, file_ids: dict[str, str]) -> None:
+        """Save Telegram file ids of sent photos and evict old entries.
+
+        Args:
+            file_ids (dict[str, str]): file id by photo url
+
+        """
+        if not file_ids:
+            return
+        used_at = datetime.now()
+        with db.connection_context(), db.atomic():
+            (
+                TelegramFile.insert_many(
+                    [
+                        {
+                            "url": i_url,
+                            "file_id": i_file_id,
+                            "used_at": used_at,
+                        }
+                        for i_url, i_file_id in file_ids.items()
+                    ]
+                )
+                .on_conflict_replace()
+                .execute()
+            )
+            cls._evict(used_at)
+        bot_logger.debug(f"{file_ids=}")
+
+    @staticmethod
+    def delete_file_ids(urls: list[str]) -> None:
+        """Delete cached file ids rejected by Telegram.
+
+        Args:
+            urls (list[str]): photos urls
+
+        """
+        bot_logger.debug(f"{urls=}")
+        with db.connection_context(), db.atomic():
+            TelegramFile.delete().where(TelegramFile.url.in_(urls)).execute()
+
+    @classmethod
+    def _evict(cls, now: datetime) -> None:
+        """Delete expired and least recently used file ids over max entries.
+
+        Args:
+            now (datetime): current time
+
+        """
+        TelegramFile.delete().where(
+            TelegramFile.used_at < now - cls._max_age,
+        ).execute()
+        oldest_kept = (
+            TelegramFile.select(TelegramFile.used_at)
+            .order_by(TelegramFile.used_at.desc())
+            .offset(cls._max_entries - 1)
+            .limit(1)
+            .scalar()
+        )
+        if oldest_kept is not None:
+            evicted = TelegramFile.delete().where(
+                TelegramFile.used_at < oldest_kept,
+            ).execute()
+            bot_logger.debug(f"{evicted=}")
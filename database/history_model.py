@@ -1,4 +1,14 @@
-"""Module with ORM table 'history' and its initialization"""
+"""Module with ORM table 'history' and its initialization
+
+Database connection settings are taken from SQLITE_PROFILES by
+SQLITE_PROFILE env variable, "performance" by default: WAL journal, so
+readers do not wait for writer, synchronous NORMAL, bigger page cache,
+memory mapped reads and busy timeout instead of "database is locked"
+errors. Connections are per thread (peewee default).
+
+Database file DB_NAME is kept in DB_DIR env variable dir, this package dir
+by default.
+"""
 import os
 
 from peewee import (
@@ -10,9 +20,18 @@ from peewee import (
     IntegerField,
 )
 
+from config_data.config import SQLITE_PROFILES
+
 parent_dir_abs_path = os.path.abspath(os.path.dirname(__file__))
-db_path = os.path.join(parent_dir_abs_path, os.getenv("DB_NAME"))
-db = SqliteDatabase(db_path)
+db_dir = os.getenv("DB_DIR") or parent_dir_abs_path
+os.makedirs(db_dir, exist_ok=True)
+db_path = os.path.join(db_dir, os.getenv("DB_NAME"))
+sqlite_profile = SQLITE_PROFILES[os.getenv("SQLITE_PROFILE", "performance")]
+db = SqliteDatabase(
+    db_path,
+    pragmas=sqlite_profile["pragmas"],
+    timeout=sqlite_profile["timeout"],
+)
 
 
 class History(Model):
@@ -27,6 +46,8 @@ class History(Model):
         command(str): bot command
         user_request(str): details of user request
         bot_response(str): details of bot response
+
+    Table and its indexes are created by database.migrations.
     """
 
     id = AutoField()
@@ -47,8 +68,3 @@ class History(Model):
 
         database = db
         table_name = "history"
-
-
-"""Create table History if it is not existed in telegram_bot.db """
-with db.atomic():
-    db.create_tables([History])
@@ -0,0 +1,343 @@
+"""Module with single writer of history table working in background."""
+
+from atexit import register as atexit_register
+from datetime import datetime
+from threading import Condition, Thread
+from typing import Any, Optional
+
+from peewee import fn
+
+from .history_model import db, History
+from project_logging.bot_logger import bot_logger
+
+
+class HistoryWriter:
+    """
+    Class HistoryWriter.
+    Write-behind queue of history table with one writer thread.
+
+    Entries are created and updated in memory and returned at once, writer
+    thread commits them in one transaction every flush_interval seconds.
+    Updates of the same entry are coalesced, new entry is inserted with
+    its updates. History ids are allocated in memory from max table id,
+    so history table must have no other writers.
+    If transaction fails, entries are written one by one, so failed entry
+    does not block others. Failed entry is retried in next batches and
+    dropped after max_attempts. After writer is closed, entries are written
+    at once by caller thread.
+
+    Attributes:
+        flush_interval (float): max delay of pending writes in seconds
+        max_attempts (int): max number of writes of failed entry
+        batches (int): number of committed transactions
+        written_entries (int): number of inserted and updated entries
+        dropped_entries (int): number of entries dropped after max_attempts
+
+    """
+
+    def __init__(
+        self, flush_interval: float = 0.2, max_attempts: int = 3,
+    ) -> None:
+        """Init writer, writer thread is started by first write.
+
+        Args:
+            flush_interval (float): max delay of pending writes in seconds
+            max_attempts (int): max number of writes of failed entry
+
+        """
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.batches = 0
+        self.written_entries = 0
+        self.dropped_entries = 0
+        self._condition = Condition()
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._new_ids: set[int] = set()
+        self._attempts: dict[int, int] = {}
+        self._last_id: Optional[int] = None
+        self._flush_requested = 0
+        self._flush_completed = 0
+        self._flush_failed = 0
+        self._writing = False
+        self._closed = False
+        self._thread: Optional[Thread] = None
+
+    def create(self, user_id: int, command: str) -> int:
+        """Create history entry.
+
+        Args:
+            user_id (int): user id
+            command (str): command shortcut
+
+        Returns:
+            int: history id
+
+        """
+        fields = {
+            "user_id": user_id,
+            "command": command,
+            "created_at": datetime.now(),
+        }
+        with self._condition:
+            if self._last_id is None:
+                self._last_id = self._get_max_id()
+            self._last_id += 1
+            history_id = self._last_id
+            if not self._closed:
+                self._pending[history_id] = fields
+                self._new_ids.add(history_id)
+                self._notify_writer()
+                return history_id
+        self._write_closed(history_id, fields, {history_id})
+        return history_id
+
+    def update(self, history_id: int, field_name: str, value: Any) -> None:
+        """Update field of history entry.
+
+        Args:
+            history_id (int): history id
+            field_name (str): name of field to update
+            value (Any): new value
+
+        """
+        with self._condition:
+            if not self._closed:
+                self._pending.setdefault(history_id, {})[field_name] = value
+                self._notify_writer()
+                return
+        self._write_closed(history_id, {field_name: value}, set())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until pending writes are committed by writer thread.
+
+        Failed writes stay pending and are retried in next batch.
+
+        Args:
+            timeout (Optional[float]): max wait time in seconds
+
+        Returns:
+            bool: False if timeout is expired or some of pending writes
+                are failed
+
+        """
+        with self._condition:
+            if not self._pending and not self._writing:
+                return True
+            self._flush_requested += 1
+            flush_id = self._flush_requested
+            self._notify_writer()
+            completed = self._condition.wait_for(
+                lambda: self._flush_completed >= flush_id, timeout,
+            )
+            return completed and self._flush_failed < flush_id
+
+    def close(self) -> None:
+        """Commit pending writes and stop writer thread."""
+
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        bot_logger.info(
+            f"History writer is closed: {self.batches=}, "
+            f"{self.written_entries=}, {self.dropped_entries=}"
+        )
+
+    def _notify_writer(self) -> None:
+        """Start writer thread if needed and wake it up.
+
+        Must be called under self._condition.
+
+        """
+        if self._thread is None:
+            self._thread = Thread(
+                target=self._run, name="history_writer", daemon=True,
+            )
+            self._thread.start()
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Commit pending writes every flush_interval until closed."""
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (
+                        self._pending
+                        or self._closed
+                        or self._flush_requested > self._flush_completed
+                    ),
+                )
+                self._condition.wait_for(
+                    lambda: (
+                        self._closed
+                        or self._flush_requested > self._flush_completed
+                    ),
+                    self.flush_interval,
+                )
+                pending, self._pending = self._pending, {}
+                new_ids, self._new_ids = self._new_ids, set()
+                flush_id = self._flush_requested
+                closed = self._closed
+                self._writing = bool(pending)
+            written = True
+            if pending:
+                try:
+                    written = self._write(pending, new_ids)
+                except Exception as exc:
+                    bot_logger.error(f"{exc=}, {len(pending)=}")
+                    for i_history_id, i_fields in pending.items():
+                        self._retry_entry(i_history_id, i_fields, new_ids, exc)
+                    written = False
+            with self._condition:
+                self._writing = False
+                self._flush_completed = flush_id
+                if not written:
+                    self._flush_failed = flush_id
+                self._condition.notify_all()
+                if closed:
+                    if self._pending:
+                        self.dropped_entries += len(self._pending)
+                        bot_logger.error(
+                            f"History writes are lost: {self._pending=}"
+                        )
+                    return
+
+    def _write(self, pending: dict[int, dict], new_ids: set[int]) -> bool:
+        """Write pending entries in one transaction or one by one.
+
+        Entries which are not written are returned to pending ones to be
+        retried in next batch or dropped after max_attempts.
+
+        Args:
+            pending (dict[int, dict]): fields to write by history id
+            new_ids (set[int]): ids of entries to insert
+
+        Returns:
+            bool: True if all entries are written
+
+        """
+        try:
+            self._write_entries(pending, new_ids)
+        except Exception as exc:
+            bot_logger.error(f"{exc=}, {len(pending)=}")
+        else:
+            self.batches += 1
+            self.written_entries += len(pending)
+            bot_logger.debug(f"{len(pending)=}, {len(new_ids)=}")
+            with self._condition:
+                for i_history_id in pending:
+                    self._attempts.pop(i_history_id, None)
+            return True
+        written = True
+        for i_history_id, i_fields in pending.items():
+            try:
+                self._write_entries(
+                    {i_history_id: i_fields}, new_ids & {i_history_id},
+                )
+            except Exception as exc:
+                written = False
+                self._retry_entry(i_history_id, i_fields, new_ids, exc)
+            else:
+                self.written_entries += 1
+                with self._condition:
+                    self._attempts.pop(i_history_id, None)
+        return written
+
+    def _write_closed(
+        self, history_id: int, fields: dict, new_ids: set[int],
+    ) -> None:
+        """Write entry by caller thread after writer is closed.
+
+        Args:
+            history_id (int): history id
+            fields (dict): fields to write
+            new_ids (set[int]): ids of entries to insert
+
+        """
+        try:
+            self._write_entries({history_id: fields}, new_ids)
+        except Exception as exc:
+            with self._condition:
+                self.dropped_entries += 1
+            bot_logger.error(
+                f"History entry is dropped: {exc=}, {history_id=}, {fields=}"
+            )
+            return
+        with self._condition:
+            self.written_entries += 1
+        bot_logger.warning(f"History is written after close: {history_id=}")
+
+    @staticmethod
+    def _write_entries(pending: dict[int, dict], new_ids: set[int]) -> None:
+        """Insert new and update existing entries in one transaction.
+
+        Args:
+            pending (dict[int, dict]): fields to write by history id
+            new_ids (set[int]): ids of entries to insert
+
+        """
+        with db.connection_context(), db.atomic():
+            new_entries = [
+                dict(i_fields, id=i_history_id)
+                for i_history_id, i_fields in pending.items()
+                if i_history_id in new_ids
+            ]
+            if new_entries:
+                History.insert_many(new_entries).execute()
+            for i_history_id, i_fields in pending.items():
+                if i_history_id not in new_ids:
+                    History.update(**i_fields).where(
+                        History.id == i_history_id,
+                    ).execute()
+
+    def _retry_entry(
+        self,
+        history_id: int,
+        fields: dict,
+        new_ids: set[int],
+        exc: Exception,
+    ) -> None:
+        """Return failed entry to pending ones or drop it after max_attempts.
+
+        Args:
+            history_id (int): history id
+            fields (dict): fields to write
+            new_ids (set[int]): ids of entries to insert
+            exc (Exception): write error
+
+        """
+        with self._condition:
+            attempts = self._attempts.pop(history_id, 0) + 1
+            if attempts >= self.max_attempts:
+                self.dropped_entries += 1
+                bot_logger.error(
+                    f"History entry is dropped: {exc=}, {history_id=}, "
+                    f"{fields=}, {attempts=}"
+                )
+                return
+            self._attempts[history_id] = attempts
+            self._pending[history_id] = dict(
+                fields, **self._pending.get(history_id, {}),
+            )
+            if history_id in new_ids:
+                self._new_ids.add(history_id)
+
+    @staticmethod
+    def _get_max_id() -> int:
+        """Get max history id in history table.
+
+        Returns:
+            int: max history id, 0 if table is empty
+
+        """
+        with db.connection_context():
+            return History.select(fn.MAX(History.id)).scalar() or 0
+
+
+history_writer = HistoryWriter()
+atexit_register(history_writer.close)
@@ -0,0 +1,191 @@
+"""Module with versioned schema migrations of bot database.
+
+Schema version is kept in SQLite user_version pragma. Migrations newer than
+database version are applied once at bot start, each one in its own
+transaction together with version update.
+
+Run as script to benchmark history query of /history command on growing
+history table with and without (user_id, id DESC) index (.env is
+required as for the bot, benchmark uses its own temporary database):
+    python -m database.migrations [rows_number ...]
+"""
+
+from os import path, remove
+from random import randrange
+from sys import argv
+from tempfile import mkdtemp
+from time import perf_counter
+from typing import Callable
+
+from peewee import SqliteDatabase
+
+from .history_model import db, History
+from .telegram_file_model import TelegramFile
+from project_logging.bot_logger import bot_logger
+
+
+def _create_history_table(database: SqliteDatabase) -> None:
+    """Create table history if it is not existed.
+
+    Args:
+        database (SqliteDatabase): database to migrate
+
+    """
+    History.create_table(safe=True)
+
+
+def _create_telegram_file_table(database: SqliteDatabase) -> None:
+    """Create table telegram_file if it is not existed.
+
+    Args:
+        database (SqliteDatabase): database to migrate
+
+    """
+    TelegramFile.create_table(safe=True)
+
+
+def _create_history_user_id_index(database: SqliteDatabase) -> None:
+    """Create index for latest user history entries query.
+
+    Index (user_id, id DESC) serves user_id filter and id DESC order, so
+    latest user entries are read without scan and sort of whole table.
+
+    Args:
+        database (SqliteDatabase): database to migrate
+
+    """
+    database.execute_sql(
+        "CREATE INDEX IF NOT EXISTS history_user_id_id "
+        "ON history (user_id, id DESC)"
+    )
+
+
+migrations: tuple[Callable[[SqliteDatabase], None], ...] = (
+    _create_history_table,
+    _create_telegram_file_table,
+    _create_history_user_id_index,
+)
+
+
+def get_schema_version(database: SqliteDatabase) -> int:
+    """Get database schema version.
+
+    Args:
+        database (SqliteDatabase): database
+
+    Returns:
+        int: number of applied migrations
+
+    """
+    return database.execute_sql("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(database: SqliteDatabase = db) -> int:
+    """Apply not applied migrations to database.
+
+    Version is checked again inside write transaction, so migration is not
+    applied twice by concurrent processes.
+
+    Args:
+        database (SqliteDatabase): database to migrate, models must be
+            bound to it
+
+    Returns:
+        int: database schema version
+
+    """
+    with database.connection_context():
+        version = get_schema_version(database)
+        while version < len(migrations):
+            with database.atomic("IMMEDIATE"):
+                version = get_schema_version(database)
+                if version >= len(migrations):
+                    break
+                migration = migrations[version]
+                migration(database)
+                version += 1
+                database.execute_sql(f"PRAGMA user_version = {version}")
+            bot_logger.info(f"Applied: {version=}, {migration.__name__=}")
+    return version
+
+
+def _get_latest_entries_time(
+    database: SqliteDatabase, users_number: int, queries: int,
+) -> float:
+    """Get average time of latest user history entries query.
+
+    Args:
+        database (SqliteDatabase): benchmark database
+        users_number (int): number of users in history table
+        queries (int): number of queries to average
+
+    Returns:
+        float: average query time in milliseconds
+
+    """
+    start = perf_counter()
+    for _ in range(queries):
+        list(
+            History.select()
+            .where(History.user_id == randrange(users_number))
+            .order_by(History.id.desc())
+            .limit(5)
+            .dicts()
+        )
+    return (perf_counter() - start) / queries * 1000
+
+
+def _run_benchmark(rows_numbers: list[int]) -> None:
+    """Compare history query time without and with index on growing table.
+
+    Number of users grows with table, every user has about
+    rows_per_user entries as bot users do.
+
+    Args:
+        rows_numbers (list[int]): history table sizes to measure
+
+    """
+    rows_per_user = 20
+    queries = 200
+    db_path = path.join(mkdtemp(), "history_benchmark.db")
+    benchmark_db = SqliteDatabase(db_path)
+    with benchmark_db.bind_ctx([History, TelegramFile]):
+        History.create_table()
+        rows_in_table = 0
+        for i_rows_number in sorted(rows_numbers):
+            users_number = max(1, i_rows_number // rows_per_user)
+            with benchmark_db.atomic():
+                for i_index in range(rows_in_table, i_rows_number, 10000):
+                    History.insert_many(
+                        [
+                            {
+                                "user_id": randrange(users_number),
+                                "created_at": "2024-01-01 00:00:00",
+                                "command": "Top Budget Hotels",
+                            }
+                            for _ in range(
+                                min(10000, i_rows_number - i_index),
+                            )
+                        ]
+                    ).execute()
+            rows_in_table = i_rows_number
+            benchmark_db.execute_sql("DROP INDEX IF EXISTS history_user_id_id")
+            scan_time = _get_latest_entries_time(
+                benchmark_db, users_number, queries,
+            )
+            _create_history_user_id_index(benchmark_db)
+            index_time = _get_latest_entries_time(
+                benchmark_db, users_number, queries,
+            )
+            print(
+                f"{i_rows_number} rows: without index {scan_time:.3f} ms, "
+                f"with index {index_time:.3f} ms"
+            )
+    benchmark_db.close()
+    remove(db_path)
+
+
+if __name__ == "__main__":
+    _run_benchmark(
+        list(map(int, argv[1:] or ["10000", "100000", "1000000"])),
+    )
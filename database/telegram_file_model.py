@@ -0,0 +1,39 @@
+"""Module with ORM table 'telegram_file' and its initialization"""
+
+from peewee import DateTimeField, Model, TextField
+
+from .history_model import db
+
+
+class TelegramFile(Model):
+    """
+    Class TelegramFile for telegram_file table in telegram_bot.db (SQL
+    database). Parent class(peewee.Model)
+
+    Cache of Telegram file_id of photos sent by url, so the same photo is
+    sent again by file_id without downloading it by Telegram.
+
+    Attributes:
+        url(str): photo url, primary key
+        file_id(str): Telegram file_id of sent photo
+        used_at(datetime): time of last photo sending with DateTimeField
+            format, indexed for eviction
+
+    Table is created by database.migrations.
+    """
+
+    url = TextField(primary_key=True)
+    file_id = TextField()
+    used_at = DateTimeField(index=True)
+
+    class Meta:
+        """
+        Inner Class Meta.
+
+        Attributes:
+            database(.db): database
+            table_name(str): name of table in db
+        """
+
+        database = db
+        table_name = "telegram_file"
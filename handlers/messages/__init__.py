@@ -2,6 +2,7 @@ from . import (
     commands,
     shortcuts,
     calendar_navigation_buttons,
+    hotel_details_buttons,
     top_budget_hotels_search_states,
     top_luxury_hotels_search_states,
     custom_hotel_search_states,
@@ -4,6 +4,7 @@ from .common import msg_type_city_name
 from config_data.config import BEST_DEALS_COMMAND_DATA
 from database.crud_history_interface import HistoryCRUD
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
 from keyboards.reply.cancel import cancel_reply_keyboard
 from loader import bot
 from project_logging.bot_logger import bot_logger
@@ -21,8 +22,9 @@ msg_selected_best_deal = "Selected {command_shortcut}".format(
 def handle_best_deal_command(chat_id: int, user_id: int) -> None:
     """Handle best_deal command from user.
 
-    Delete previous user state data, set new state, save data id db and bot
-    state storage and send message for new state.
+    Cancel speculative hotel search, delete previous user state data, set
+    new state, save data id db and bot state storage and send message for
+    new state.
 
     Args:
         chat_id (int): chat identifier
@@ -31,6 +33,7 @@ def handle_best_deal_command(chat_id: int, user_id: int) -> None:
     """
     bot_logger.debug(f"{chat_id=}, {user_id=}")
     bot.send_message(chat_id, msg_selected_best_deal)
+    HotelsApi.cancel_prefetch(chat_id, user_id)
     StateData.delete_state(chat_id, user_id)
     bot.set_state(user_id, CustomSearchStates.input_city, chat_id)
     history_id = HistoryCRUD.create_entry(
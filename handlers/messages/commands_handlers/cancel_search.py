@@ -1,6 +1,7 @@
 """Module for handling cancel_search command."""
 
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
 from keyboards.inline.start import start_inline_keyboard
 from loader import bot
 from project_logging.bot_logger import bot_logger
@@ -11,7 +12,8 @@ msg_cancel_search = "Your search state was canceled."
 def handle_cancel_search_command(chat_id: int, user_id) -> None:
     """Handle cansel search command from user.
 
-    Delete user state data and send reply message.
+    Cancel speculative hotel search, delete user state data and send reply
+    message.
 
     Args:
         chat_id (int): chat identifier
@@ -19,6 +21,7 @@ def handle_cancel_search_command(chat_id: int, user_id) -> None:
 
     """
     bot_logger.debug(f"{chat_id=}, {user_id=}")
+    HotelsApi.cancel_prefetch(chat_id, user_id)
     StateData.delete_state(chat_id, user_id)
     bot_logger.debug(f"{chat_id=}, {user_id=}, {msg_cancel_search=}")
     bot.send_message(
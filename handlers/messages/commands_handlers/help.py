@@ -2,6 +2,7 @@
 
 from config_data.config import BOT_COMMANDS
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
 from keyboards.reply.help import help_reply_keyboard
 from loader import bot
 from project_logging.bot_logger import bot_logger
@@ -40,7 +41,8 @@ msg_help = create_help_text()
 def handle_help_command(chat_id: int, user_id: int) -> None:
     """Handle help command from user.
 
-    Delete user state data and send reply message.
+    Cancel speculative hotel search, delete user state data and send reply
+    message.
 
     Args:
         chat_id (int): chat identifier
@@ -48,6 +50,7 @@ def handle_help_command(chat_id: int, user_id: int) -> None:
 
     """
     bot_logger.debug(f"{chat_id=}, {user_id=}")
+    HotelsApi.cancel_prefetch(chat_id, user_id)
     StateData.delete_state(chat_id, user_id)
     bot_logger.debug(f"{chat_id=}, {user_id=}, {msg_help=}")
     bot.send_message(chat_id, msg_help, reply_markup=help_reply_keyboard)
@@ -7,6 +7,7 @@ from handlers.messages.states_handlers.history_records_number import (
     msg_no_records_found,
 )
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
 from keyboards.reply.cancel import cancel_reply_keyboard
 from loader import bot
 from project_logging.bot_logger import bot_logger
@@ -22,8 +23,8 @@ msg_select_records = (
 def handle_history_search_command(chat_id: int, user_id: int) -> None:
     """Handle history command from user.
 
-    Delete user state data set new history state if user's history record
-    found.  Send new state  msg.
+    Cancel speculative hotel search, delete user state data set new history
+    state if user's history record found.  Send new state  msg.
 
     Args:
         chat_id (int): chat identifier.
@@ -31,8 +32,9 @@ def handle_history_search_command(chat_id: int, user_id: int) -> None:
 
     """
     bot_logger.debug(f"{chat_id=}, {user_id=}")
+    HotelsApi.cancel_prefetch(chat_id, user_id)
     StateData.delete_state(chat_id, user_id)
-    if HistoryCRUD.get_latest_user_entries(user_id, 1):
+    if HistoryCRUD.get_latest_user_headers(user_id, 1):
         bot.set_state(user_id, HistoryStates.records_number, chat_id)
         reply_msg = msg_select_records
     else:
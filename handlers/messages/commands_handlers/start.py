@@ -3,6 +3,7 @@
 from keyboards.inline.start import start_inline_keyboard
 from loader import bot
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
 from project_logging.bot_logger import bot_logger
 
 blank_msg_start = (
@@ -14,7 +15,8 @@ blank_msg_start = (
 def handle_start_command(chat_id: int, user_id: int, user_name: str) -> None:
     """Handle start command from user.
 
-    Delete user state data if it is existed and send start message.
+    Cancel speculative hotel search, delete user state data if it is
+    existed and send start message.
 
     Args:
         chat_id (int): chat identifier
@@ -23,6 +25,7 @@ def handle_start_command(chat_id: int, user_id: int, user_name: str) -> None:
 
     """
     bot_logger.debug(f"{chat_id=}, {user_id=}")
+    HotelsApi.cancel_prefetch(chat_id, user_id)
     StateData.delete_state(chat_id, user_id)
     msg_start = blank_msg_start.format(name=user_name)
     bot_logger.debug(f"{chat_id=}, {user_id=}, {msg_start=}")
@@ -0,0 +1,37 @@
+"""Module for catching callback query of hotel details button.
+
+Handling "Details & photos" button of hotel listed without details.
+"""
+
+from telebot.types import CallbackQuery
+
+from .states_handlers.search_result import handle_hotel_details_request
+from keyboards.inline.hotel_details import hotel_details_factory
+from loader import bot
+from project_logging.bot_logger import bot_logger
+
+
+@bot.callback_query_handler(
+    func=lambda call: hotel_details_factory.filter().check(query=call),
+)
+def hotel_details_button(call: CallbackQuery) -> None:
+    """Catch callback query with hotel details button data.
+
+    Request details of listed hotel and send them to user.
+
+    Args:
+        call (CallbackQuery): user reply data from inline keyboard
+
+    """
+    bot_logger.info(
+        f"{call.data=}, {call.message.chat.id=}, {call.from_user.id=}"
+    )
+    callback_data: dict = hotel_details_factory.parse(callback_data=call.data)
+    bot.answer_callback_query(call.id)
+    handle_hotel_details_request(
+        call.message.chat.id,
+        call.from_user.id,
+        callback_data["search_key"],
+        callback_data["property_id"],
+        int(callback_data["photo_amount"]),
+    )
@@ -4,8 +4,9 @@ from datetime import datetime
 import json
 
 from .common import get_int_number
-from .search_result import send_hotels_details
+from .search_result import send_hotels_details, send_hotels_list
 from database.crud_history_interface import HistoryCRUD
+from database.history_model import History
 from keyboards.inline.start import start_inline_keyboard
 from keyboards.reply.cancel import cancel_reply_keyboard
 from loader import bot
@@ -55,6 +56,9 @@ def send_history_search_header(chat_id: int, history_record: dict) -> None:
 def send_processed_response(chat_id: int, history_record: dict) -> None:
     """Send result of hotel search from history record to user.
 
+    Hotels listed without details are sent with hotel details buttons as
+    in search result.
+
     Args:
         chat_id (int): chat id.
         history_record (dict): history record entry.
@@ -63,9 +67,14 @@ def send_processed_response(chat_id: int, history_record: dict) -> None:
     if history_record["bot_response"] == "not initialized":
         reply_msg = msg_bot_response_canceled
         bot.send_message(chat_id, reply_msg)
+        return
+    hotels_details: list[dict] = json.loads(history_record["bot_response"])
+    if all("property_id" in i_hotel for i_hotel in hotels_details):
+        send_hotels_list(chat_id, hotels_details)
     else:
-        hotels_details: list[dict] = json.loads(history_record["bot_response"])
-        display_photos = True if hotels_details[0].get("photos") else False
+        display_photos = any(
+            i_hotel.get("photos") for i_hotel in hotels_details
+        )
         send_hotels_details(chat_id, hotels_details, display_photos)
 
 
@@ -75,7 +84,8 @@ def send_history_records(
     """Send user's search history records details.
 
     Send msg if found history records are less then requested records or not
-    found. Then send hotel search result from history records.
+    found. Then send hotel search result from history records. Bot responses
+    are fetched in one query only for records which are not canceled.
 
     Args:
         chat_id (int): chat id.
@@ -84,7 +94,7 @@ def send_history_records(
 
     """
     bot.send_message(chat_id, msg_searching_records)
-    found_records = HistoryCRUD.get_latest_user_entries(
+    found_records = HistoryCRUD.get_latest_user_headers(
         user_id, required_records,
     )
     total_found_records = len(found_records)
@@ -101,11 +111,20 @@ def send_history_records(
             bot.send_message(
                 chat_id, reply_msg, reply_markup=cancel_reply_keyboard,
             )
+        bot_responses = HistoryCRUD.get_bot_responses(
+            [
+                i_record["id"] for i_record in found_records
+                if i_record["user_request"] != History.user_request.default
+            ]
+        )
         for index, i_record in enumerate(found_records, 1):
             bot.send_message(chat_id, f"*****Record # {index }******")
             send_history_search_header(chat_id, i_record)
-            if i_record["user_request"] != "Search was canceled by user":
-                send_processed_response(chat_id, i_record)
+            if i_record["id"] in bot_responses:
+                send_processed_response(
+                    chat_id,
+                    dict(i_record, bot_response=bot_responses[i_record["id"]]),
+                )
 
 
 def handle_records_number(
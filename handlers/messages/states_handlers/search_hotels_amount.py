@@ -8,7 +8,9 @@ scenarios.
 from telebot.handler_backends import State
 
 from .common import get_int_number
+from config_data.config import HOTEL_DETAILS_ON_DEMAND
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
 from keyboards.reply.cancel import cancel_reply_keyboard
 from loader import bot
 from project_logging.bot_logger import bot_logger
@@ -28,7 +30,11 @@ msg_max_hotels_amount = (
 
 
 def handle_hotels_amount(
-        chat_id: int, user_id: int, hotels_amount: str, next_state: State
+        chat_id: int,
+        user_id: int,
+        hotels_amount: str,
+        next_state: State,
+        prefetch_hotels: bool = False,
 ) -> None:
     """Handle user input data for setting hotels amount to display.
 
@@ -36,16 +42,21 @@ def handle_hotels_amount(
     save data into bot state storage, set next state(next_state) and send
     message for next state.
     Other vice send  message  with corrective action.
+    If hotel search settings are complete after hotels amount
+    (prefetch_hotels), hotel search is started in background, so hotels are
+    found while user answers remaining questions.
 
     Args:
         chat_id (int): chat identifier
         user_id (int): user identifier
         hotels_amount (str): hotels amount to display
         next_state (State): next search state
+        prefetch_hotels (bool): start speculative hotel search
 
     """
     bot_logger.debug(
-        f"{chat_id=}, {user_id=}, {hotels_amount=}, {next_state=}"
+        f"{chat_id=}, {user_id=}, {hotels_amount=}, {next_state=}, "
+        f"{prefetch_hotels=}"
     )
     hotels_amount = get_int_number(hotels_amount)
     if not hotels_amount and hotels_amount != 0:
@@ -60,5 +71,11 @@ def handle_hotels_amount(
         StateData.save_single_user_data(
             chat_id, user_id, "hotels_amount", hotels_amount,
         )
+        if prefetch_hotels:
+            HotelsApi.prefetch_hotels_in_city(
+                chat_id,
+                user_id,
+                details_amount=0 if HOTEL_DETAILS_ON_DEMAND else 1,
+            )
     bot_logger.debug(f"{chat_id=}, {user_id=}, {reply_msg=}")
     bot.send_message(chat_id, reply_msg, reply_markup=cancel_reply_keyboard)
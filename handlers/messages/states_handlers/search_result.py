@@ -6,14 +6,22 @@ scenarios.
 """
 
 from json import dumps
+from typing import Optional
 
+from telebot.apihelper import ApiTelegramException
 from telebot.types import InputMediaPhoto
 
-from config_data.config import BEST_DEALS_COMMAND_DATA
+from config_data.config import (
+    BEST_DEALS_COMMAND_DATA,
+    HOTEL_DETAILS_ON_DEMAND,
+)
 from database.crud_history_interface import HistoryCRUD
+from database.crud_telegram_file_interface import TelegramFileCRUD
 from database.history_model import History
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.hotel_summary import HotelSummary
 from handlers.sites_API.rapidapi_hotels import HotelsApi
+from keyboards.inline.hotel_details import get_hotel_details_inline_keyboard
 from keyboards.inline.start import start_inline_keyboard
 from keyboards.reply.cancel import cancel_reply_keyboard
 from loader import bot
@@ -50,6 +58,18 @@ hotel_caption = (
     "Address: {hotel_address}\n"
     "Website: {site_url}"
 )
+hotel_list_caption = (
+    "Name: {hotel_name}\n"
+    "Price per day: {price_per_day}\n"
+    "Price per stay: {price_per_stay}\n"
+    "Distance from city center: {distance}"
+)
+msg_not_provided = "not provided"
+msg_not_rated = "not rated"
+msg_hotel_details_expired = (
+    "Hotel details are not available anymore.\n"
+    "Kindly repeat the search."
+)
 
 
 def create_search_settings_msg(user_state_data: dict) -> str:
@@ -97,38 +117,71 @@ def create_search_settings_msg(user_state_data: dict) -> str:
     return search_settings_msg
 
 
-def create_hotel_caption(hotel_details: dict) -> str:
+def format_main_hotel_details(hotel_details: HotelSummary) -> dict:
+    """Format hotel values from hotels search for caption.
+
+    Hotel values are formatted here, right before sending.
+
+    Args:
+        hotel_details (HotelSummary): found hotel
+
+    Returns
+        dict: formatted name, prices and distance
+
+    """
+    if hotel_details.total_price is None:
+        price_per_stay = msg_not_provided
+    else:
+        price_per_stay = "{price:,.0f} {currency} including all taxes".format(
+            price=hotel_details.total_price,
+            currency=hotel_details.currency,
+        )
+    return {
+        "hotel_name": hotel_details.name,
+        "price_per_day": "{price} {currency}".format(
+            price=round(hotel_details.price_per_night, 2),
+            currency=hotel_details.currency,
+        ),
+        "price_per_stay": price_per_stay,
+        "distance": "{distance} {unit}".format(
+            distance=round(hotel_details.distance, 2),
+            unit=hotel_details.distance_unit,
+        ),
+    }
+
+
+def create_hotel_caption(hotel_details: HotelSummary) -> str:
     """Create hotel caption.
 
     Args:
-        hotel_details (dict): hotel details
+        hotel_details (HotelSummary): found hotel with extra data
 
     Returns
         str: hotel caption
 
     """
     specific_hotel_caption = hotel_caption.format(
-        hotel_name=hotel_details["name"],
-        price_per_day=hotel_details["price_per_day"],
-        price_per_stay=hotel_details["price_per_stay"],
-        rating=hotel_details["hotel_rating"],
-        distance=hotel_details["distance"],
-        hotel_address=hotel_details["hotel_address"],
-        site_url=hotel_details["site_url"],
+        **format_main_hotel_details(hotel_details),
+        rating=(
+            msg_not_rated if hotel_details.rating is None
+            else hotel_details.rating
+        ),
+        hotel_address=hotel_details.address or msg_not_provided,
+        site_url=hotel_details.site_url or msg_not_provided,
     )
     bot_logger.debug(f"{hotel_details=}, {specific_hotel_caption=}")
     return specific_hotel_caption
 
 
 def sort_hotels_details_for_response(
-        hotels_details: list[dict], required_photos: bool = False,
+        hotels_details: list[HotelSummary], required_photos: bool = False,
 ) -> list[dict]:
     """Sort hotels details for response to user.
 
     Create hotel caption and include hotel photos if required.
 
     Args:
-        hotels_details (list[dict]): hotel details
+        hotels_details (list[HotelSummary]): found hotels
         required_photos (bool): include or exclude hotel photos
 
     Returns:
@@ -139,7 +192,7 @@ def sort_hotels_details_for_response(
     for i_hotel in hotels_details:
         i_hotel_details_to_send = {"caption": create_hotel_caption(i_hotel)}
         if required_photos:
-            i_hotel_details_to_send["photos"] = i_hotel["photos_url"]
+            i_hotel_details_to_send["photos"] = i_hotel.photos_url
         hotels_details_to_send.append(i_hotel_details_to_send)
     bot_logger.debug(
         f"{hotels_details=}, {required_photos=}, {hotels_details_to_send=}",
@@ -147,34 +200,68 @@ def sort_hotels_details_for_response(
     return hotels_details_to_send
 
 
-def create_photo_media_msgs_for_hotels(
-        sorted_hotels_details: list[dict],
-) -> list[list[InputMediaPhoto]]:
-    """Create media messages with hotel caption and photos.
+def sort_hotels_list_for_response(
+        hotels_details: list[HotelSummary],
+        photo_amount: int,
+        search_key: str,
+) -> list[dict]:
+    """Sort hotels listed without details for response to user.
+
+    Create short hotel caption, hotel details are sent on demand.
 
     Args:
-        sorted_hotels_details (list[dict]): sorted hotel details prepared for
-            response
+        hotels_details (list[HotelSummary]): found hotels
+        photo_amount (int): number of hotel photos, 0 if photos are not
+            required
+        search_key (str): key of search which listed hotels
 
     Returns:
-        list[list[InputMediaPhoto]]: media msgs with hotel details
+        list[dict]: hotels captions and ids to send
 
     """
-    media_msgs = []
-    for i_hotel in sorted_hotels_details:
-        i_hotel_media_photos = [
-            InputMediaPhoto(
-                media=i_hotel["photos"][0], caption=i_hotel["caption"],
-            )
-        ]
-        for photos_index in range(1, len(i_hotel["photos"])):
-            photo_media = InputMediaPhoto(
-                media=i_hotel["photos"][photos_index],
-            )
-            i_hotel_media_photos.append(photo_media)
-        media_msgs.append(i_hotel_media_photos)
-    bot_logger.debug(f"{sorted_hotels_details=}, {media_msgs=}")
-    return media_msgs
+    hotels_list_to_send = [
+        {
+            "caption": hotel_list_caption.format(
+                **format_main_hotel_details(i_hotel),
+            ),
+            "search_key": search_key,
+            "property_id": i_hotel.property_id,
+            "photo_amount": photo_amount,
+        }
+        for i_hotel in hotels_details
+    ]
+    bot_logger.debug(f"{hotels_details=}, {hotels_list_to_send=}")
+    return hotels_list_to_send
+
+
+def create_photo_media_msg_for_hotel(
+        hotel_details: dict, file_ids: Optional[dict[str, str]] = None,
+) -> list[InputMediaPhoto]:
+    """Create media message with hotel caption and photos.
+
+    Photo is sent by Telegram file id if it is known, otherwise by url.
+
+    Args:
+        hotel_details (dict): hotel details prepared for response
+        file_ids (Optional[dict[str, str]]): Telegram file id by photo url
+
+    Returns:
+        list[InputMediaPhoto]: media msg with hotel details
+
+    """
+    file_ids = file_ids or {}
+    photos = [
+        file_ids.get(i_photo_url, i_photo_url)
+        for i_photo_url in hotel_details["photos"]
+    ]
+    hotel_media_photos = [
+        InputMediaPhoto(media=photos[0], caption=hotel_details["caption"])
+    ]
+    for photos_index in range(1, len(photos)):
+        photo_media = InputMediaPhoto(media=photos[photos_index])
+        hotel_media_photos.append(photo_media)
+    bot_logger.debug(f"{hotel_details=}, {hotel_media_photos=}")
+    return hotel_media_photos
 
 
 def send_hotels_details(
@@ -184,6 +271,8 @@ def send_hotels_details(
 ) -> None:
     """Send hotels details to user.
 
+    Hotel without found photos is sent as text message.
+
     Args:
         chat_id (int): chat identifier
         sorted_hotels_details (list[dict]): sorted hotel details prepared for
@@ -192,17 +281,106 @@ def send_hotels_details(
 
     """
     bot_logger.debug(f"{sorted_hotels_details=}, {display_hotel_photos=}")
-    if display_hotel_photos:
-        media_reply_msgs = create_photo_media_msgs_for_hotels(
-            sorted_hotels_details,
-        )
-        for i_media_msg in media_reply_msgs:
-            bot.send_media_group(chat_id, i_media_msg)
-    else:
-        for i_hotel_details in sorted_hotels_details:
+    for i_hotel_details in sorted_hotels_details:
+        if display_hotel_photos and i_hotel_details.get("photos"):
+            send_hotel_photos(chat_id, i_hotel_details)
+        else:
             bot.send_message(chat_id, i_hotel_details["caption"])
 
 
+def send_hotel_photos(chat_id: int, hotel_details: dict) -> None:
+    """Send hotel photos with caption reusing cached Telegram file ids.
+
+    File ids of photos sent by url are cached. If Telegram rejects album
+    with cached file ids, they are deleted from cache and album is sent
+    again by urls.
+
+    Args:
+        chat_id (int): chat identifier
+        hotel_details (dict): hotel details prepared for response
+
+    Raises:
+        ApiTelegramException: if album is not sent
+
+    """
+    photos_url = hotel_details["photos"]
+    file_ids = TelegramFileCRUD.get_file_ids(photos_url)
+    try:
+        sent_messages = bot.send_media_group(
+            chat_id, create_photo_media_msg_for_hotel(hotel_details, file_ids),
+        )
+    except ApiTelegramException as exc:
+        if not file_ids or exc.error_code != 400:
+            raise
+        bot_logger.warning(f"{exc=}, {chat_id=}, {file_ids=}")
+        TelegramFileCRUD.delete_file_ids(list(file_ids))
+        file_ids = {}
+        sent_messages = bot.send_media_group(
+            chat_id, create_photo_media_msg_for_hotel(hotel_details),
+        )
+    TelegramFileCRUD.save_file_ids(
+        {
+            i_photo_url: i_message.photo[-1].file_id
+            for i_photo_url, i_message in zip(photos_url, sent_messages)
+            if i_message.photo and i_photo_url not in file_ids
+        }
+    )
+
+
+def send_hotels_list(chat_id: int, hotels_list: list[dict]) -> None:
+    """Send hotels listed without details with hotel details button.
+
+    Args:
+        chat_id (int): chat identifier
+        hotels_list (list[dict]): hotels captions and ids prepared for
+            response
+
+    """
+    bot_logger.debug(f"{hotels_list=}")
+    for i_hotel in hotels_list:
+        bot.send_message(
+            chat_id,
+            i_hotel["caption"],
+            reply_markup=get_hotel_details_inline_keyboard(
+                i_hotel["search_key"],
+                i_hotel["property_id"],
+                i_hotel["photo_amount"],
+            ),
+        )
+
+
+def handle_hotel_details_request(
+        chat_id: int,
+        user_id: int,
+        search_key: str,
+        property_id: str,
+        photo_amount: int,
+) -> None:
+    """Send details and photos of hotel listed without details.
+
+    Args:
+        chat_id (int): chat identifier
+        user_id (int): user identifier
+        search_key (str): key of search which listed hotel
+        property_id (str): unic hotel id
+        photo_amount (int): number of hotel photos, 0 if photos are not
+            required
+
+    """
+    bot_logger.debug(f"{chat_id=}, {user_id=}, {property_id=}")
+    hotel_details = HotelsApi.get_listed_hotel_details(
+        user_id, search_key, property_id, photo_amount,
+    )
+    if hotel_details is None:
+        bot.send_message(chat_id, msg_hotel_details_expired)
+        return
+    send_hotels_details(
+        chat_id,
+        sort_hotels_details_for_response([hotel_details], bool(photo_amount)),
+        bool(photo_amount),
+    )
+
+
 def send_commence_search_msgs(chat_id: int, user_search_settings: str) -> None:
     """Send selected user search settings and commence search msgs to use.
 
@@ -218,6 +396,79 @@ def send_commence_search_msgs(chat_id: int, user_search_settings: str) -> None:
     )
 
 
+def is_search_commenced(chat_id: int, user_id: int) -> bool:
+    """Check that user did not cancel search state.
+
+    Args:
+        chat_id (int): chat identifier
+        user_id (int): user identifier
+
+    Returns:
+        bool: True if search is not canceled
+
+    """
+    return bool(
+        StateData.get_user_data_by_key(chat_id, user_id, "commence_search")
+    )
+
+
+def send_found_hotels_list(
+        chat_id: int, user_id: int, user_state_data: dict,
+) -> list[dict]:
+    """Find hotels without details and send them if search is not canceled.
+
+    Args:
+        chat_id (int): chat identifier
+        user_id (int): user identifier
+        user_state_data (dict): user search settings
+
+    Returns:
+        list[dict]: sent hotels captions and ids
+
+    """
+    found_hotels = HotelsApi.find_hotels_in_city(
+        chat_id, user_id, add_details=False,
+    )
+    if not found_hotels or not is_search_commenced(chat_id, user_id):
+        return []
+    hotels_list = sort_hotels_list_for_response(
+        found_hotels,
+        user_state_data["hotel_photo_amount"],
+        HotelsApi.get_search_key(user_state_data),
+    )
+    send_hotels_list(chat_id, hotels_list)
+    return hotels_list
+
+
+def send_found_hotels_details(
+        chat_id: int, user_id: int, display_hotel_photos: bool,
+) -> list[dict]:
+    """Send every found hotel as soon as its details are received.
+
+    Hotels are sent in rank order. Sending stops if search is canceled.
+
+    Args:
+        chat_id (int): chat identifier
+        user_id (int): user identifier
+        display_hotel_photos (bool): display hotel photos
+
+    Returns:
+        list[dict]: sent hotels details
+
+    """
+    sent_hotels_details = []
+    for i_hotel in HotelsApi.iter_hotels_in_city(chat_id, user_id):
+        if not is_search_commenced(chat_id, user_id):
+            break
+        i_hotel_details = sort_hotels_details_for_response(
+            [i_hotel], display_hotel_photos,
+        )
+        send_hotels_details(chat_id, i_hotel_details, display_hotel_photos)
+        sent_hotels_details.extend(i_hotel_details)
+    bot_logger.debug(f"{chat_id=}, {user_id=}, {sent_hotels_details=}")
+    return sent_hotels_details
+
+
 def handle_hotel_search(chat_id: int, user_id: int) -> None:
     """Find hotels as per user search settings, save data and send response.
 
@@ -235,18 +486,17 @@ def handle_hotel_search(chat_id: int, user_id: int) -> None:
         user_state_data["history_id"], History.user_request, search_settings,
     )
     send_commence_search_msgs(chat_id, search_settings)
-    found_hotels = HotelsApi.find_hotels_in_city(chat_id, user_id)
-    if StateData.get_user_data_by_key(chat_id, user_id, "commence_search"):
-        if found_hotels:
-            sorted_hotels_details = sort_hotels_details_for_response(
-                found_hotels, user_state_data["display_hotel_photos"],
-            )
-            send_hotels_details(
-                chat_id,
-                sorted_hotels_details,
-                user_state_data["display_hotel_photos"]
-            )
-            bot_response = dumps(sorted_hotels_details)
+    if HOTEL_DETAILS_ON_DEMAND:
+        sent_hotels = send_found_hotels_list(
+            chat_id, user_id, user_state_data,
+        )
+    else:
+        sent_hotels = send_found_hotels_details(
+            chat_id, user_id, user_state_data["display_hotel_photos"],
+        )
+    if is_search_commenced(chat_id, user_id):
+        if sent_hotels:
+            bot_response = dumps(sent_hotels)
         else:
             reply_msg = msg_hotels_not_found
             bot.send_message(
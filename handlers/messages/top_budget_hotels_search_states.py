@@ -194,6 +194,7 @@ def hotels_amount_state(message: Message) -> None:
         message.from_user.id,
         message.text,
         BudgetSearchStates.hotels_photos_display,
+        prefetch_hotels=True,
     )
 
 
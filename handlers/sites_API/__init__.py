@@ -1 +1 @@
-from . import rapidapi_hotels
+from . import rapidapi_hotels, async_rapidapi_hotels
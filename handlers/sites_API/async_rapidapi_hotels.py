@@ -0,0 +1,799 @@
+"""Module for asyncio communication with Hotels API"""
+
+from asyncio import (
+    FIRST_COMPLETED,
+    Semaphore,
+    TimeoutError,
+    create_task,
+    gather,
+    wait,
+    wait_for,
+)
+from dataclasses import replace
+from json import loads
+from time import monotonic
+from typing import AsyncIterator, Optional, Union
+
+import backoff
+from aiohttp import (
+    ClientConnectionError,
+    ClientError,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+)
+
+from handlers.sites_API.endpoint_policy import (
+    CircuitOpenError,
+    EndpointPolicy,
+)
+from handlers.sites_API.hotel_summary import HotelSummary
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from handlers.sites_API.rate_limiter import RateLimitError
+from handlers.sites_API.response_parser import (
+    parse_hotel_details,
+    parse_properties,
+)
+from handlers.sites_API.retry_policy import HotelsApiStatusError
+from handlers.sites_API.top_price_selector import TopPriceSelector
+from project_logging.bot_logger import bot_logger
+
+
+class AsyncHotelsApi:
+    """
+    Class AsyncHotelsApi.
+    Asyncio client for website https://rapidapi.com/apidojo/api/hotels4/
+    for AsyncTeleBot deployments.
+
+    Provides the same search operations as HotelsApi as coroutines. All
+    requests are sent through one shared aiohttp session, so in-flight
+    searches wait on the event loop instead of holding bot worker thread
+    each. HotelsApi is composed, not inherited: its caches, rate limiter,
+    endpoint policies, retry policy and sorting helpers are shared with
+    sync searches, and missing cache entries are loaded once for all
+    concurrent sync and async callers.
+
+    Attributes:
+        _api (type[HotelsApi]): sync client with shared caches, policies
+            and helpers
+        _connector_limit (int): max simultaneous connections in pool
+        _connector_limit_per_host (int): max simultaneous connections to host
+        _keepalive_timeout (int): idle keep-alive connection timeout
+        _async_session (Optional[ClientSession]): shared aiohttp session
+        _async_backoff_exceptions (tuple): exceptions for backoff
+        _request_exceptions (tuple): Hotels API request errors which give
+            no found cities or hotels and missing extra hotel data
+
+    """
+
+    _api = HotelsApi
+    _connector_limit = 100
+    _connector_limit_per_host = 100
+    _keepalive_timeout = 30
+    _async_session = None
+    _async_backoff_exceptions = (
+        ClientConnectionError, TimeoutError, HotelsApiStatusError,
+    )
+    _request_exceptions = (
+        ClientError,
+        TimeoutError,
+        ValueError,
+        RateLimitError,
+        CircuitOpenError,
+        HotelsApiStatusError,
+    )
+
+    @classmethod
+    async def find_city(
+        cls, user_id: int, city_name: str,
+    ) -> list[Optional[dict]]:
+        """Search matching cities based on city name.
+
+        Get sorted cities from cache by normalized city name. If they are
+        not cached, send get request, save response, sort and cache found
+        cities. Request errors are logged and give no matching cities.
+
+        Args:
+             user_id (int): user identifier
+             city_name (str): city name for search
+
+        Returns:
+            list[Optional[dict]]: matching cities
+
+        """
+        city_query = cls._api._normalize_city_name(city_name)
+        try:
+            sorted_cities = await cls._api._cities_cache.get_or_load_async(
+                city_query,
+                lambda: cls._request_cities(user_id, city_query),
+                cls._api._get_cities_ttl,
+            )
+        except cls._request_exceptions as exc:
+            bot_logger.error(f"{exc=}, {user_id=}, {city_name=}")
+            return []
+        bot_logger.debug(f"{user_id=}, {city_name=}, {sorted_cities=}")
+        return sorted_cities or []
+
+    @classmethod
+    async def _request_cities(
+        cls, user_id: int, city_name: str,
+    ) -> Optional[list[dict]]:
+        """Request matching cities, save response and sort found cities.
+
+        Args:
+             user_id (int): user identifier
+             city_name (str): city name for search
+
+        Returns:
+            Optional[list[dict]]: matching cities, None if response is not
+                valid
+
+        """
+        found_cities = await cls._get_matching_cities(city_name)
+        cls._api._save_response(
+            user_id,
+            city_name,
+            cls._api.find_city.__name__,
+            found_cities,
+        )
+        return cls._api._sort_cities_response(found_cities)
+
+    @classmethod
+    async def find_hotels_in_city(
+        cls, user_id: int, search_settings: dict, add_details: bool = True,
+    ) -> list[HotelSummary]:
+        """Find hotels in city based on user search settings.
+
+        Found hotels are requested by pages as in HotelsApi. Every page is
+        got from cache or requested, saved and cached. Then extra hotels
+        data is added as per search settings. Without details found hotels
+        are cached for get_listed_hotel_details.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            add_details (bool): request hotels details
+
+        Returns:
+            list[HotelSummary]: found hotels
+
+        """
+        hotels_data = await cls._find_sorted_hotels(user_id, search_settings)
+        if hotels_data and add_details:
+            hotels_data = await cls._add_extra_hotels_data(
+                user_id, search_settings, hotels_data,
+            )
+        elif hotels_data:
+            cls._api._cache_listed_hotels(search_settings, hotels_data)
+        bot_logger.debug(f"{search_settings=}, {hotels_data=}")
+        return hotels_data
+
+    @classmethod
+    async def iter_hotels_in_city(
+        cls, user_id: int, search_settings: dict,
+    ) -> AsyncIterator[HotelSummary]:
+        """Find hotels in city and yield them as their details are received.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Yields:
+            HotelSummary: found hotel with extra data if found, in rank
+                order
+
+        """
+        hotels_data = await cls._find_sorted_hotels(user_id, search_settings)
+        bot_logger.debug(f"{search_settings=}, {hotels_data=}")
+        if hotels_data:
+            async for i_hotel in cls._iter_extra_hotels_data(
+                user_id, search_settings, hotels_data,
+            ):
+                yield i_hotel
+
+    @classmethod
+    async def _find_sorted_hotels(
+        cls, user_id: int, search_settings: dict,
+    ) -> list[HotelSummary]:
+        """Find hotels in city sorted as per search settings command.
+
+        Request errors are logged and give no found hotels.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Returns:
+            list[HotelSummary]: sorted hotels without extra data
+
+        """
+        try:
+            if cls._api._is_top_price_scan_required(search_settings):
+                return await cls._find_most_expensive_hotels(
+                    user_id, search_settings,
+                )
+            return await cls._find_first_matching_hotels(
+                user_id, search_settings,
+            )
+        except cls._request_exceptions as exc:
+            bot_logger.error(f"{exc=}, {user_id=}")
+            return []
+
+    @classmethod
+    async def get_listed_hotel_details(
+        cls,
+        user_id: int,
+        search_key: str,
+        property_id: str,
+        photo_amount: int,
+    ) -> Optional[HotelSummary]:
+        """Get found hotel with extra data for hotel listed without details.
+
+        Args:
+            user_id (int): user identifier
+            search_key (str): key of search which listed hotel
+            property_id (str): unic hotel id
+            photo_amount (int): number of hotel photos, 0 if photos are not
+                required
+
+        Returns:
+            Optional[HotelSummary]: found hotel with extra data if found,
+                None if listed hotel is not cached any more
+
+        """
+        listed_hotel = cls._api._listed_hotels_cache.get(
+            (search_key, property_id),
+        )
+        if listed_hotel is None:
+            bot_logger.debug(
+                f"Listed hotel is not cached: {search_key=}, {property_id=}"
+            )
+            return None
+        hotel_data = replace(listed_hotel, photos_url=[])
+        search_settings = {
+            "display_hotel_photos": bool(photo_amount),
+            "hotel_photo_amount": photo_amount,
+        }
+        await cls._add_extra_hotels_data(
+            user_id, search_settings, [hotel_data],
+        )
+        return hotel_data
+
+    @classmethod
+    async def _find_first_matching_hotels(
+        cls, user_id: int, search_settings: dict,
+    ) -> list[HotelSummary]:
+        """Find first hotels matching search settings in API sort order.
+
+        Pages are looked through as in HotelsApi, best deal hotels are
+        ranked among first page and next pages only.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Returns:
+            list[HotelSummary]: sorted hotels
+
+        """
+        payload = cls._api.create_hotel_search_payload(search_settings)
+        found_hotels = []
+        hotels_data = []
+        while payload is not None:
+            page = await cls._get_properties_page(
+                user_id, search_settings, payload,
+            )
+            if not page:
+                break
+            found_hotels.extend(page)
+            hotels_data = cls._api._sort_hotels_in_city(
+                found_hotels, search_settings,
+            ) or []
+            if len(hotels_data) >= search_settings["hotels_amount"]:
+                break
+            payload = cls._api._get_next_page_payload(payload, len(page))
+        return hotels_data
+
+    @classmethod
+    async def _find_most_expensive_hotels(
+        cls, user_id: int, search_settings: dict,
+    ) -> list[HotelSummary]:
+        """Find the most expensive hotels by scanning found hotels pages.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Returns:
+            list[HotelSummary]: sorted hotels
+
+        """
+        selector = TopPriceSelector(search_settings["hotels_amount"])
+        payload = cls._api.create_hotel_search_payload(search_settings)
+        while payload is not None:
+            page = await cls._get_properties_page(
+                user_id, search_settings, payload,
+            )
+            if page is None:
+                break
+            selector.add_page(page, payload["resultsSize"])
+            payload = cls._api._get_next_page_payload(
+                payload, len(page), cls._api._top_price_max_results,
+            )
+        bot_logger.debug(f"{search_settings=}, {selector.stats()=}")
+        return cls._api._create_hotel_summaries(selector.result())
+
+    @classmethod
+    async def _get_properties_page(
+        cls, user_id: int, search_settings: dict, payload: dict,
+    ) -> Optional[list[dict]]:
+        """Get found hotels page from cache or request and cache it.
+
+        Concurrent requests of the same page are coalesced into one
+        upstream request.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            payload (dict): hotel search payload of the page
+
+        Returns:
+            Optional[list[dict]]: found hotels (properties), None if response
+                is not valid
+
+        """
+        page = await cls._api._properties_cache.get_or_load_async(
+            cls._api._get_payload_key(payload),
+            lambda: cls._request_properties(user_id, search_settings, payload),
+            cls._api._get_properties_ttl,
+        )
+        bot_logger.debug(
+            f"{payload['resultsStartingIndex']=}, {payload['resultsSize']=}, "
+            f"{len(page or [])=}"
+        )
+        return page
+
+    @classmethod
+    async def _request_properties(
+        cls, user_id: int, search_settings: dict, payload: dict,
+    ) -> Optional[list[dict]]:
+        """Request hotels in city, save response and extract found hotels.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            payload (dict): hotel search payload
+
+        Returns:
+            Optional[list[dict]]: found hotels (properties), None if response
+                is not valid
+
+        """
+        response_content = await cls._get_hotels_in_city(payload)
+        cls._api._save_response(
+            user_id,
+            search_settings["full_name"],
+            cls._api.find_hotels_in_city.__name__,
+            response_content,
+        )
+        return parse_properties(response_content)
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close shared aiohttp session and its connections."""
+
+        if cls._async_session is not None and not cls._async_session.closed:
+            await cls._async_session.close()
+        cls._async_session = None
+
+    @classmethod
+    def _get_async_session(cls) -> ClientSession:
+        """Get shared aiohttp session with keep-alive connection pool.
+
+        Session is created on first call inside running event loop.
+
+        Returns:
+            ClientSession: shared aiohttp session
+
+        """
+        if cls._async_session is None or cls._async_session.closed:
+            connector = TCPConnector(
+                limit=cls._connector_limit,
+                limit_per_host=cls._connector_limit_per_host,
+                keepalive_timeout=cls._keepalive_timeout,
+            )
+            cls._async_session = ClientSession(connector=connector)
+            bot_logger.debug(
+                f"{cls._api._base_url=}, {cls._connector_limit=}"
+            )
+        return cls._async_session
+
+    @classmethod
+    async def _send_async_request(
+        cls, method: str, endpoint: str, **kwargs,
+    ) -> bytes:
+        """Send request to Hotels API endpoint through shared session.
+
+        If response is not received within endpoint latency p95, hedged
+        duplicate request is sent within hedging budget. The first
+        successful response is returned, the other request is cancelled.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Hotels API endpoint
+            **kwargs: extra request arguments (params, json, headers)
+
+        Raises:
+            RateLimitError: if request is not allowed by rate limiter
+            CircuitOpenError: if endpoint circuit breaker is open
+            HotelsApiStatusError: if response status is 4xx or 5xx
+
+        Returns:
+            bytes: response content
+
+        """
+        policy = cls._api._endpoint_policies[endpoint]
+        trial = policy.before_request()
+        try:
+            cls._api._retry_policy.record_request()
+            hedge_delay = policy.get_hedge_delay()
+            if hedge_delay is None:
+                return await cls._send_single_async_request(
+                    method, endpoint, **kwargs,
+                )
+            return await cls._send_hedged_async_request(
+                policy, hedge_delay, method, endpoint, **kwargs,
+            )
+        finally:
+            if trial:
+                policy.release_trial()
+
+    @classmethod
+    async def _send_hedged_async_request(
+        cls,
+        policy: EndpointPolicy,
+        hedge_delay: float,
+        method: str,
+        endpoint: str,
+        **kwargs,
+    ) -> bytes:
+        """Send request and hedged one if response is late.
+
+        Args:
+            policy (EndpointPolicy): endpoint policy
+            hedge_delay (float): time to wait before hedged request
+            method (str): HTTP method
+            endpoint (str): Hotels API endpoint
+            **kwargs: extra request arguments (params, json, headers)
+
+        Raises:
+            RateLimitError: if request is not allowed by rate limiter
+            HotelsApiStatusError: if response status is 4xx or 5xx
+
+        Returns:
+            bytes: response content
+
+        """
+        tasks = {
+            create_task(
+                cls._send_single_async_request(method, endpoint, **kwargs)
+            ),
+        }
+        done, _ = await wait(tasks, timeout=hedge_delay)
+        if not done and policy.try_hedge():
+            bot_logger.debug(f"Hedged request: {endpoint=}, {hedge_delay=}")
+            tasks.add(
+                create_task(
+                    cls._send_single_async_request(method, endpoint, **kwargs)
+                )
+            )
+        try:
+            while True:
+                done, tasks = await wait(tasks, return_when=FIRST_COMPLETED)
+                succeeded = [
+                    i_task for i_task in done if i_task.exception() is None
+                ]
+                if succeeded:
+                    return succeeded[0].result()
+                if not tasks:
+                    return done.pop().result()
+        finally:
+            for i_task in tasks:
+                i_task.cancel()
+
+    @classmethod
+    async def _send_single_async_request(
+        cls, method: str, endpoint: str, **kwargs,
+    ) -> bytes:
+        """Send one request with adaptive read timeout and record latency.
+
+        Request waits for rate limiter first, remaining quota is updated
+        from response headers. Only 5xx statuses are circuit breaker
+        failures, 429 is handled by retry policy.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Hotels API endpoint
+            **kwargs: extra request arguments (params, json, headers)
+
+        Raises:
+            RateLimitError: if request is not allowed by rate limiter
+            HotelsApiStatusError: if response status is 4xx or 5xx
+
+        Returns:
+            bytes: response content
+
+        """
+        policy = cls._api._endpoint_policies[endpoint]
+        waited = await cls._api._rate_limiter.acquire_async(
+            endpoint, cls._api._request_priorities[endpoint],
+        )
+        connect_timeout, _ = cls._api._request_timeouts[endpoint]
+        read_timeout = policy.get_read_timeout()
+        timeout = ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout,
+        )
+        started_at = monotonic()
+        try:
+            async with cls._get_async_session().request(
+                method,
+                cls._api._base_url + endpoint,
+                timeout=timeout,
+                **kwargs,
+            ) as response:
+                content = await response.read()
+        except (ClientError, TimeoutError):
+            policy.record_failure()
+            raise
+        if response.status >= 500:
+            policy.record_failure()
+        else:
+            policy.record_success(monotonic() - started_at)
+        cls._api._rate_limiter.update_quota(response.headers)
+        bot_logger.debug(f"{endpoint=}, {response.status=}, {waited=}")
+        cls._api._retry_policy.check_status(
+            response.status, response.headers,
+        )
+        return content
+
+    @classmethod
+    @backoff.on_exception(
+        _api._retry_policy.wait_gen,
+        exception=_async_backoff_exceptions,
+        max_time=_api._backoff_max_time,
+        max_tries=_api._backoff_max_tries,
+        giveup=_api._retry_policy.giveup,
+        jitter=None,
+    )
+    async def _get_matching_cities(cls, city_name: str) -> dict:
+        """Send GET request to find cities as per city name.
+
+        Args:
+            city_name (str): city name for search
+
+        Returns:
+            dict: response
+
+        """
+        response_content = await cls._send_async_request(
+            "GET",
+            cls._api._find_city_endpoint,
+            params={"q": city_name},
+            headers=cls._api._headers_get,
+        )
+        return loads(response_content)
+
+    @classmethod
+    @backoff.on_exception(
+        _api._retry_policy.wait_gen,
+        exception=_async_backoff_exceptions,
+        max_time=_api._backoff_max_time,
+        max_tries=_api._backoff_max_tries,
+        giveup=_api._retry_policy.giveup,
+        jitter=None,
+    )
+    async def _get_hotels_in_city(cls, payload: dict) -> bytes:
+        """Send POST request to find hotels in city.
+
+        Args:
+            payload (dict): hotel search payload
+
+        Returns:
+            bytes: response content
+
+        """
+        return await cls._send_async_request(
+            "POST",
+            cls._api._find_hotels_endpoint,
+            json=payload,
+            headers=cls._api._headers_post,
+        )
+
+    @classmethod
+    @backoff.on_exception(
+        _api._retry_policy.wait_gen,
+        exception=_async_backoff_exceptions,
+        max_time=_api._backoff_max_time,
+        max_tries=_api._backoff_max_tries,
+        giveup=_api._retry_policy.giveup,
+        jitter=None,
+    )
+    async def _get_hotel_details(cls, hotel_id: str) -> bytes:
+        """Send POST request to get hotel details.
+
+        Args:
+            hotel_id(str): unic hotel id
+
+        Returns:
+            bytes: response content
+
+        """
+        return await cls._send_async_request(
+            "POST",
+            cls._api._get_hotel_details_endpoint,
+            json={"currency": cls._api._currency, "propertyId": hotel_id},
+            headers=cls._api._headers_post,
+        )
+
+    @classmethod
+    async def _get_cached_hotel_details(
+        cls, semaphore: Semaphore, user_id: int, hotel_data: HotelSummary,
+    ) -> Optional[dict]:
+        """Get hotel details from cache or request and cache them.
+
+        Concurrent requests of the same hotel are coalesced into one
+        upstream request. Only responses with property info are cached.
+
+        Args:
+            semaphore (Semaphore): search concurrency limit
+            user_id (int): user identifier
+            hotel_data (HotelSummary): found hotel
+
+        Returns:
+            Optional[dict]: parsed hotel details, None if response is not
+                valid
+
+        """
+        return await cls._api._hotel_details_cache.get_or_load_async(
+            (hotel_data.property_id, cls._api._currency),
+            lambda: cls._request_hotel_details(semaphore, user_id, hotel_data),
+            cls._api._get_hotel_details_ttl,
+        )
+
+    @classmethod
+    async def _request_hotel_details(
+        cls, semaphore: Semaphore, user_id: int, hotel_data: HotelSummary,
+    ) -> Optional[dict]:
+        """Request hotel details, save response and parse required fields.
+
+        Request is sent within search concurrency limit and timeout.
+
+        Args:
+            semaphore (Semaphore): search concurrency limit
+            user_id (int): user identifier
+            hotel_data (HotelSummary): found hotel
+
+        Returns:
+            Optional[dict]: parsed hotel details, None if response is not
+                valid
+
+        """
+        async with semaphore:
+            response_content = await wait_for(
+                cls._get_hotel_details(hotel_data.property_id),
+                cls._api._details_timeout,
+            )
+        cls._api._save_response(
+            user_id,
+            hotel_data.name,
+            cls._api._add_extra_hotels_data.__name__,
+            response_content,
+        )
+        return parse_hotel_details(
+            response_content, cls._api._max_hotel_photos,
+        )
+
+    @classmethod
+    async def _add_extra_hotels_data(
+        cls,
+        user_id: int,
+        search_settings: dict,
+        hotels_data: list[HotelSummary],
+    ) -> list[HotelSummary]:
+        """Add extra hotel data as per search settings.
+
+        Hotels details are requested concurrently. Failed request gives
+        default extra hotel data instead of failing the whole search.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            hotels_data (list[HotelSummary]): found hotels
+
+        Returns:
+            list[HotelSummary]: found hotels with extra data if found
+
+        """
+        bot_logger.debug(f"{search_settings=}, {hotels_data=}")
+        semaphore = Semaphore(cls._api._details_max_workers)
+        responses = await gather(
+            *(
+                cls._get_cached_hotel_details(semaphore, user_id, i_hotel)
+                for i_hotel in hotels_data
+            ),
+            return_exceptions=True,
+        )
+        for i_hotel, i_response in zip(hotels_data, responses):
+            cls._add_hotel_response(search_settings, i_hotel, i_response)
+        bot_logger.debug(f"{hotels_data=}")
+        return hotels_data
+
+    @classmethod
+    async def _iter_extra_hotels_data(
+        cls,
+        user_id: int,
+        search_settings: dict,
+        hotels_data: list[HotelSummary],
+    ) -> AsyncIterator[HotelSummary]:
+        """Add extra hotel data and yield hotels in rank order.
+
+        Hotels details are requested concurrently, hotel is yielded as soon
+        as its details and details of all higher ranked hotels are received.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            hotels_data (list[HotelSummary]): found hotels in rank order
+
+        Yields:
+            HotelSummary: found hotel with extra data if found
+
+        """
+        semaphore = Semaphore(cls._api._details_max_workers)
+        tasks = [
+            create_task(
+                cls._get_cached_hotel_details(semaphore, user_id, i_hotel)
+            )
+            for i_hotel in hotels_data
+        ]
+        try:
+            for i_hotel, i_task in zip(hotels_data, tasks):
+                i_response, = await gather(i_task, return_exceptions=True)
+                cls._add_hotel_response(search_settings, i_hotel, i_response)
+                yield i_hotel
+        finally:
+            for i_task in tasks:
+                i_task.cancel()
+
+    @classmethod
+    def _add_hotel_response(
+        cls,
+        search_settings: dict,
+        hotel_data: HotelSummary,
+        response: Union[dict, BaseException, None],
+    ) -> None:
+        """Add extra hotel data from hotel details response to found hotel.
+
+        Failed request gives default extra hotel data.
+
+        Args:
+            search_settings (dict): hotel search settings
+            hotel_data (HotelSummary): found hotel
+            response (Union[dict, BaseException, None]): parsed hotel
+                details or request error
+
+        Raises:
+            BaseException: if request error is not expected one
+
+        """
+        if isinstance(response, cls._request_exceptions):
+            bot_logger.error(f"{response=}, {hotel_data.property_id=}")
+            hotel_data.add_details(cls._api._missing_extra_hotel_data)
+        elif isinstance(response, BaseException):
+            raise response
+        else:
+            hotel_data.add_details(
+                cls._api._process_extra_hotel_data(
+                    search_settings, hotel_data, response,
+                )
+            )
@@ -0,0 +1,194 @@
+"""Module for filtering and ranking found hotels for best deal command.
+
+Price, distance (in miles) and rating of found hotels are extracted once,
+hotels out of user price and distance ranges are dropped and matching
+hotels are ranked by best deal score. Candidates are bounded by found
+hotels page (HotelsApi._best_deal_candidates), so plain lists are used:
+NumPy arrays were slower than lists at this size.
+
+Best deal score is sum of weighted price, distance and rating of hotel,
+each one scaled to 0..1 among matching hotels, so cheap, close and well
+rated hotel gets max score.
+
+Run as script to time ranker on synthetic found hotels (.env is required as for the bot):
+    python -m handlers.sites_API.best_deal_ranker [hotels_number ...]
+"""
+
+from math import isnan, nan
+from random import choice, random, uniform
+from sys import argv
+from time import perf_counter
+
+from project_logging.bot_logger import bot_logger
+
+
+MILES_PER_UNIT = {"MILE": 1.0, "KILOMETER": 0.621371}
+
+
+def rank_best_deals(
+    hotels_details: list[dict],
+    search_settings: dict,
+    required_hotels: int,
+    score_weights: dict,
+) -> list[dict]:
+    """Filter found hotels as per search settings and rank by score.
+
+    Args:
+        hotels_details (list[dict]): found hotels (properties)
+        search_settings (dict): hotel search settings with price and
+            distance ranges
+        required_hotels (int): number of hotels to return
+        score_weights (dict): weights of "price", "distance" and "rating"
+            in best deal score
+
+    Returns:
+        list[dict]: matching hotels with max score, sorted by score DESC
+
+    """
+    if not hotels_details or required_hotels <= 0:
+        return []
+    values = [_get_hotel_values(i_hotel) for i_hotel in hotels_details]
+    top_indexes = _rank_values(
+        values, search_settings, required_hotels, score_weights,
+    )
+    bot_logger.debug(f"{len(hotels_details)=}, {top_indexes=}")
+    return [hotels_details[i_index] for i_index in top_indexes]
+
+
+def _rank_values(
+    values: list[tuple],
+    search_settings: dict,
+    required_hotels: int,
+    score_weights: dict,
+) -> list[int]:
+    """Filter and rank hotels values.
+
+    Args:
+        values (list[tuple]): (price, distance, rating) of found hotels,
+            nan if value is missing
+        search_settings (dict): hotel search settings
+        required_hotels (int): number of hotels to return
+        score_weights (dict): weights of best deal score
+
+    Returns:
+        list[int]: indexes of top hotels
+
+    """
+    indexes = [
+        i_index for i_index, (i_price, i_distance, _) in enumerate(values)
+        if search_settings["min_price"] <= i_price
+        <= search_settings["max_price"]
+        and search_settings["min_distance"] <= i_distance
+        <= search_settings["max_distance"]
+    ]
+    if not indexes:
+        return []
+    prices = _scale_list([values[i_index][0] for i_index in indexes])
+    distances = _scale_list([values[i_index][1] for i_index in indexes])
+    ratings = _scale_list([
+        0.0 if isnan(values[i_index][2]) else values[i_index][2]
+        for i_index in indexes
+    ])
+    scores = [
+        score_weights["price"] * (1 - i_price)
+        + score_weights["distance"] * (1 - i_distance)
+        + score_weights["rating"] * i_rating
+        for i_price, i_distance, i_rating in zip(prices, distances, ratings)
+    ]
+    order = sorted(range(len(indexes)), key=lambda i_pos: -scores[i_pos])
+    return [indexes[i_pos] for i_pos in order[:required_hotels]]
+
+
+def _scale_list(values: list[float]) -> list[float]:
+    """Scale list values to 0..1 range.
+
+    Args:
+        values (list[float]): values
+
+    Returns:
+        list[float]: scaled values, zeros if all values are equal
+
+    """
+    min_value = min(values)
+    value_range = max(values) - min_value
+    if not value_range:
+        return [0.0] * len(values)
+    return [(i_value - min_value) / value_range for i_value in values]
+
+
+def _get_hotel_values(hotel_details: dict) -> tuple:
+    """Get price, distance in miles and rating of found hotel.
+
+    Distance without unit is considered in miles.
+
+    Args:
+        hotel_details (dict): found hotel (property)
+
+    Returns:
+        tuple: (price, distance, rating), nan if value is missing or
+            distance unit is unknown
+
+    """
+    try:
+        price = float(hotel_details["price"]["lead"]["amount"])
+    except (KeyError, TypeError, ValueError):
+        price = nan
+    try:
+        distance = hotel_details["destinationInfo"]["distanceFromDestination"]
+        distance = float(distance["value"]) * MILES_PER_UNIT[
+            distance.get("unit") or "MILE"
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        distance = nan
+    try:
+        rating = float(hotel_details["reviews"]["score"])
+    except (KeyError, TypeError, ValueError):
+        rating = nan
+    return price, distance, rating
+
+
+def _run_benchmark(hotels_number: int) -> None:
+    """Time value extraction and ranking of synthetic found hotels.
+
+    Args:
+        hotels_number (int): number of synthetic found hotels
+
+    """
+    repeats = 20
+    search_settings = {
+        "min_price": 50, "max_price": 300,
+        "min_distance": 0.5, "max_distance": 5,
+    }
+    score_weights = {"price": 1.0, "distance": 1.0, "rating": 1.0}
+    hotels_details = [
+        {
+            "id": str(i_id),
+            "price": {"lead": {"amount": uniform(10, 1000)}},
+            "destinationInfo": {
+                "distanceFromDestination": {
+                    "value": uniform(0, 20),
+                    "unit": choice(("MILE", "KILOMETER")),
+                },
+            },
+            "reviews": {"score": round(uniform(0, 10), 1)}
+            if random() > 0.1 else {},
+        }
+        for i_id in range(hotels_number)
+    ]
+    start = perf_counter()
+    for _ in range(repeats):
+        values = [_get_hotel_values(i_hotel) for i_hotel in hotels_details]
+    values_time = (perf_counter() - start) / repeats
+    start = perf_counter()
+    for _ in range(repeats):
+        _rank_values(values, search_settings, 10, score_weights)
+    rank_time = (perf_counter() - start) / repeats
+    print(
+        f"{hotels_number=}: values {values_time * 1000:.2f} ms, "
+        f"rank {rank_time * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    for i_number in map(int, argv[1:] or ["100", "200", "1000"]):
+        _run_benchmark(i_number)
@@ -0,0 +1,105 @@
+"""Module with thread pool which starts submitted calls after delay."""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from heapq import heappop, heappush
+from itertools import count
+from threading import Condition, Thread
+from time import monotonic
+from typing import Any, Callable, Optional
+
+
+class DelayedExecutor:
+    """
+    Class DelayedExecutor.
+    Small shared thread pool for calls which are started after delay.
+
+    One timer thread keeps delayed calls in heap and submits due ones to
+    thread pool, so waiting calls hold no pool thread. Call cancelled by
+    its future before it is started is not run.
+
+    Attributes:
+        max_workers (int): max number of pool threads
+
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str) -> None:
+        """Init executor, timer thread is started by first call.
+
+        Args:
+            max_workers (int): max number of pool threads
+            thread_name_prefix (str): name prefix of pool threads
+
+        """
+        self.max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix,
+        )
+        self._condition = Condition()
+        self._delayed: list[tuple] = []
+        self._order = count()
+        self._thread: Optional[Thread] = None
+
+    def submit_after(
+        self, delay: float, function: Callable, *args: Any,
+    ) -> Future:
+        """Schedule call of function after delay.
+
+        Args:
+            delay (float): delay in seconds
+            function (Callable): function to call
+            *args (Any): function arguments
+
+        Returns:
+            Future: future of function result, call is not run if future
+                is cancelled before it is started
+
+        """
+        future = Future()
+        started_at = monotonic() + delay
+        with self._condition:
+            heappush(
+                self._delayed,
+                (started_at, next(self._order), future, function, args),
+            )
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run,
+                    name=f"{self._thread_name_prefix}_timer",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def _run(self) -> None:
+        """Submit due calls to thread pool."""
+
+        while True:
+            with self._condition:
+                while not self._delayed or self._delayed[0][0] > monotonic():
+                    self._condition.wait(
+                        self._delayed[0][0] - monotonic()
+                        if self._delayed
+                        else None
+                    )
+                _, _, future, function, args = heappop(self._delayed)
+            if not future.cancelled():
+                self._executor.submit(self._call, future, function, args)
+
+    @staticmethod
+    def _call(future: Future, function: Callable, args: tuple) -> None:
+        """Run function if its future is not cancelled and set its result.
+
+        Args:
+            future (Future): future of function result
+            function (Callable): function to call
+            args (tuple): function arguments
+
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except Exception as exc:
+            future.set_exception(exc)
@@ -0,0 +1,245 @@
+"""Module with latency-based request policy for Hotels API endpoints."""
+
+from collections import deque
+from threading import Lock
+from time import monotonic
+from typing import Optional
+
+from project_logging.bot_logger import bot_logger
+
+
+class CircuitOpenError(Exception):
+    """Endpoint is not requested while its circuit breaker is open."""
+
+
+class EndpointPolicy:
+    """
+    Class EndpointPolicy.
+    Thread-safe latency tracker, hedging budget and circuit breaker of
+    one Hotels API endpoint.
+
+    Rolling window of successful response latencies gives adaptive read
+    timeout (timeout_factor * timeout_percentile, within min_read_timeout
+    and max_read_timeout) and hedge delay (hedge_percentile). Hedged
+    requests are limited to hedge_ratio of all requests. After
+    failure_threshold consecutive failures the circuit is open for
+    open_seconds, then one trial request is allowed.
+
+    Attributes:
+        endpoint (str): Hotels API endpoint
+        max_read_timeout (float): max read timeout, used until window has
+            min_samples latencies
+        min_read_timeout (float): min read timeout
+        hedge_ratio (float): max share of hedged requests, 0 disables
+            hedging
+        requests (int): number of sent requests
+        hedged (int): number of hedged requests
+        failures (int): number of failed requests
+        rejected (int): number of requests rejected by open circuit
+
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        max_read_timeout: float,
+        min_read_timeout: float = 2.0,
+        window_size: int = 200,
+        min_samples: int = 20,
+        timeout_percentile: float = 99,
+        timeout_factor: float = 2.0,
+        hedge_percentile: float = 95,
+        hedge_ratio: float = 0.1,
+        failure_threshold: int = 5,
+        open_seconds: float = 30,
+    ) -> None:
+        """Init endpoint policy.
+
+        Args:
+            endpoint (str): Hotels API endpoint
+            max_read_timeout (float): max read timeout in seconds
+            min_read_timeout (float): min read timeout in seconds
+            window_size (int): number of latest latencies to track
+            min_samples (int): min number of latencies for adaptive values
+            timeout_percentile (float): latency percentile for read timeout
+            timeout_factor (float): read timeout multiplier of percentile
+            hedge_percentile (float): latency percentile for hedge delay
+            hedge_ratio (float): max share of hedged requests
+            failure_threshold (int): consecutive failures to open circuit
+            open_seconds (float): time circuit stays open in seconds
+
+        """
+        self.endpoint = endpoint
+        self.max_read_timeout = max_read_timeout
+        self.min_read_timeout = min_read_timeout
+        self.min_samples = min_samples
+        self.timeout_percentile = timeout_percentile
+        self.timeout_factor = timeout_factor
+        self.hedge_percentile = hedge_percentile
+        self.hedge_ratio = hedge_ratio
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.requests = 0
+        self.hedged = 0
+        self.failures = 0
+        self.rejected = 0
+        self._latencies: deque = deque(maxlen=window_size)
+        self._lock = Lock()
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def before_request(self) -> bool:
+        """Check circuit breaker before request.
+
+        Raises:
+            CircuitOpenError: if circuit is open or its trial request is in
+                flight
+
+        Returns:
+            bool: True if request is trial one of half-open circuit
+
+        """
+        with self._lock:
+            trial = False
+            if self._opened_at is not None:
+                if (
+                    self._trial_in_flight
+                    or monotonic() - self._opened_at < self.open_seconds
+                ):
+                    self.rejected += 1
+                    raise CircuitOpenError(
+                        f"Circuit is open: {self.endpoint=}"
+                    )
+                self._trial_in_flight = trial = True
+            self.requests += 1
+            return trial
+
+    def release_trial(self) -> None:
+        """Allow new trial request if trial one ended without result.
+
+        Must be called after trial request, as it may be not sent (rate
+        limiter error) or end with exception which is not recorded as
+        success or failure.
+
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        """Record successful response and close circuit.
+
+        Args:
+            latency (float): response latency in seconds
+
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+            if self._opened_at is not None:
+                bot_logger.info(f"Circuit is closed: {self.endpoint=}")
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record failed request and open circuit if threshold is reached."""
+
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if (
+                self._trial_in_flight
+                or self._consecutive_failures >= self.failure_threshold
+            ):
+                if self._opened_at is None or self._trial_in_flight:
+                    bot_logger.warning(
+                        f"Circuit is open: {self.endpoint=}, "
+                        f"{self._consecutive_failures=}"
+                    )
+                self._opened_at = monotonic()
+                self._trial_in_flight = False
+
+    def get_read_timeout(self) -> float:
+        """Get adaptive read timeout.
+
+        Returns:
+            float: read timeout in seconds
+
+        """
+        percentile = self._get_percentile(self.timeout_percentile)
+        if percentile is None:
+            return self.max_read_timeout
+        return min(
+            max(percentile * self.timeout_factor, self.min_read_timeout),
+            self.max_read_timeout,
+        )
+
+    def get_hedge_delay(self) -> Optional[float]:
+        """Get time to wait for response before hedged request.
+
+        Returns:
+            Optional[float]: hedge delay in seconds, None if hedging is
+                disabled or there are not enough latencies
+
+        """
+        if not self.hedge_ratio:
+            return None
+        return self._get_percentile(self.hedge_percentile)
+
+    def try_hedge(self) -> bool:
+        """Take hedged request from hedging budget.
+
+        Returns:
+            bool: True if hedged request is allowed
+
+        """
+        with self._lock:
+            if self.hedged + 1 > self.requests * self.hedge_ratio:
+                return False
+            self.hedged += 1
+            return True
+
+    def stats(self) -> dict:
+        """Get endpoint policy statistics.
+
+        Returns:
+            dict: requests, hedged, failed and rejected requests, latency
+                percentiles and circuit state
+
+        """
+        with self._lock:
+            circuit_open = self._opened_at is not None
+            requests, hedged = self.requests, self.hedged
+            failures, rejected = self.failures, self.rejected
+        return {
+            "endpoint": self.endpoint,
+            "requests": requests,
+            "hedged": hedged,
+            "failures": failures,
+            "rejected": rejected,
+            "p50": self._get_percentile(50),
+            "p95": self._get_percentile(95),
+            "p99": self._get_percentile(99),
+            "read_timeout": self.get_read_timeout(),
+            "circuit_open": circuit_open,
+        }
+
+    def _get_percentile(self, percentile: float) -> Optional[float]:
+        """Get latency percentile of rolling window.
+
+        Args:
+            percentile (float): percentile from 0 to 100
+
+        Returns:
+            Optional[float]: latency in seconds, None if there are less than
+                min_samples latencies
+
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(
+            len(latencies) - 1, int(len(latencies) * percentile / 100),
+        )
+        return latencies[index]
@@ -0,0 +1,54 @@
+"""Module with compact record of found hotel.
+
+Hotel values are kept numeric, so found hotels can be sorted, filtered and
+cached cheaply. They are formatted only when hotel caption is created.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(slots=True)
+class HotelSummary:
+    """
+    Class HotelSummary.
+    Found hotel main data from hotels search and extra data from hotel
+    details.
+
+    Attributes:
+        property_id (str): unic hotel id
+        name (str): hotel name
+        price_per_night (float): price per night
+        currency (str): price currency code
+        distance (float): distance from city center in MILE
+        total_price (Optional[float]): price per stay including all taxes
+        rating (Optional[float]): hotel star rating from hotel details
+        address (Optional[str]): hotel address from hotel details
+        site_url (Optional[str]): hotel website from hotel details
+        photos_url (list[str]): hotel photos urls from hotel details
+
+    """
+
+    distance_unit = "MILE"
+
+    property_id: str
+    name: str
+    price_per_night: float
+    currency: str
+    distance: float
+    total_price: Optional[float] = None
+    rating: Optional[float] = None
+    address: Optional[str] = None
+    site_url: Optional[str] = None
+    photos_url: list[str] = field(default_factory=list)
+
+    def add_details(self, extra_hotel_data: dict) -> None:
+        """Set extra hotel data from hotel details.
+
+        Args:
+            extra_hotel_data (dict): values of rating, address, site_url
+                and photos_url
+
+        """
+        for i_name, i_value in extra_hotel_data.items():
+            setattr(self, i_name, i_value)
@@ -1,27 +1,62 @@
 """Module for communication with Hotels API"""
 
-from datetime import datetime
-from json import dump
-from os import mkdir, path, getenv
-from requests import get, post, exceptions
-from typing import Optional
+from concurrent.futures import (
+    CancelledError,
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError,
+    as_completed,
+)
+from dataclasses import replace
+from hashlib import sha256
+from json import dumps
+from os import makedirs, path, getenv
+from re import compile as re_compile
+from threading import Event, Lock
+from time import monotonic
+from typing import Iterator, Optional, Union
 
 import backoff
+from requests import Response, Session, exceptions
+from requests.adapters import HTTPAdapter
 
 from config_data.config import (
+    BEST_DEALS_COMMAND_DATA,
     HIGH_PRICE_COMMAND_DATA,
+    HIGH_PRICE_FULL_SCAN,
+    HIGH_PRICE_SCAN_MAX_RESULTS,
     LOW_PRICE_COMMAND_DATA,
 )
 from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.best_deal_ranker import (
+    MILES_PER_UNIT,
+    rank_best_deals,
+)
+from handlers.sites_API.delayed_executor import DelayedExecutor
+from handlers.sites_API.endpoint_policy import CircuitOpenError, EndpointPolicy
+from handlers.sites_API.hotel_summary import HotelSummary
+from handlers.sites_API.rate_limiter import RateLimiter, RateLimitError
+from handlers.sites_API.response_archive import (
+    ResponseArchiver,
+    SegmentedArchive,
+)
+from handlers.sites_API.response_cache import ResponseCache
+from handlers.sites_API.response_parser import (
+    parse_hotel_details,
+    parse_properties,
+)
+from handlers.sites_API.retry_policy import (
+    HotelsApiStatusError, RetryPolicy,
+)
+from handlers.sites_API.top_price_selector import TopPriceSelector
 from project_logging.bot_logger import bot_logger
 
 file_dir_abs_path = path.abspath(path.dirname(__file__))
-response_files_abs_path = path.join(
+response_files_abs_path = getenv("HOTELS_RESPONSES_DIR") or path.join(
     file_dir_abs_path, "./hotels_response_files",
 )
 bot_logger.debug(response_files_abs_path)
-if not path.exists(response_files_abs_path):
-    mkdir(response_files_abs_path)
+makedirs(response_files_abs_path, exist_ok=True)
 
 
 class HotelsApi:
@@ -31,23 +66,85 @@ class HotelsApi:
     https://rapidapi.com/apidojo/api/hotels4/
 
     Attributes:
-        _base_url (str): Hotels base url
+        _base_url (str): Hotels base url, HOTELS_API_BASE_URL env variable
+            if set (e.g. local stand-in server)
         _rapid_api_key (str): Rapid API key
         _headers_get (dict): headers for get request to hotels
         _headers_post (dict): headers for post request to hotels
-        _file_name (str): name of file for saving json response
-        _response_files_dir (str): dir path for _file_name
+        _response_files_dir (str): dir path for responses archive,
+            HOTELS_RESPONSES_DIR env variable if set
+        _archiver (ResponseArchiver): background writer of responses to
+            segmented archive
         _find_city_endpoint (str): endpoint for searching cities
         _find_hotels_endpoint (str): endpoint for searching hotels_in_city
         _get_hotel_details_endpoint (str): endpoint to get extra hotel details
-        _request_timeout (int): request timeout
+        _request_timeouts (dict): (connect, max read) timeouts per endpoint
+        _endpoint_policies (dict): adaptive read timeout, hedging and circuit
+            breaker per endpoint
+        _hedge_executor (DelayedExecutor): shared executor of hedged
+            requests
+        _request_priorities (dict): rate limiter priority lane per endpoint,
+            city search is served first
+        _rate_limiter (RateLimiter): process-wide limiter of requests rate
+            and monthly quota
+        _pool_connections (int): number of host connection pools to cache
+        _pool_maxsize (int): max keep-alive connections kept per host
+        _pool_block (bool): wait for free connection if pool is exhausted
+        _session (Optional[Session]): shared HTTP session for all threads
+        _session_lock (Lock): lock for lazy session creation
+        _retry_policy (RetryPolicy): process-wide retry policy with status
+            classification, Retry-After, full jitter and retry budget
         _backoff_exceptions (tuple): exceptions for backoff
         _backoff_max_time (int): maximum backoff time
         _backoff_max_tries (int): maximum backoff tries
+        _details_max_workers (int): max parallel detail requests per search
+        _details_timeout (int): max time to wait for all hotels details
+        _missing_extra_hotel_data (dict): extra hotel data if details are
+            not received
+        _request_exceptions (tuple): Hotels API request errors which give
+            no found cities or hotels and missing extra hotel data
+        _currency (str): currency of hotel prices
+        _max_hotel_photos (int): max number of photos kept from hotel details
+        _hotel_details_cache (ResponseCache): hotel details responses cache
+            by hotel id and currency
+        _cities_cache (ResponseCache): sorted found cities cache by
+            normalized city name
+        _cities_not_found_ttl (int): cache ttl if cities are not found
+        _properties_cache (ResponseCache): found hotels (properties) cache by
+            hotel search payload hash
+        _listed_hotels_cache (ResponseCache): hotels listed without details
+            by search key and hotel id, for details requested on demand
+        _search_key_length (int): length of search key in callback data
+        _min_page_size (int): min number of hotels in first results page
+        _page_size_per_hotel (int): first page hotels per required hotel
+        _max_page_size (int): max number of hotels in results page
+        _max_results_index (int): max number of found hotels to look through
+        _high_price_sort (Optional[str]): server-side sort by price DESC for
+            high price command, None as Hotels API has no such sort
+        _top_price_max_results (int): max number of found hotels to scan
+            for the most expensive ones, HIGH_PRICE_SCAN_MAX_RESULTS if
+            HIGH_PRICE_FULL_SCAN is set, first results page otherwise
+        _best_deal_candidates (int): min number of hotels in first results
+            page of best deal search, all of them are ranked by score
+        _best_deal_score_weights (dict): weights of price, distance and
+            rating in best deal score
+        _total_price_pattern (Pattern): price in price per stay message
+        _prefetch_executor (ThreadPoolExecutor): executor for speculative
+            hotel search prefetch
+        _prefetches (dict): in-flight prefetch (future, first page payload
+            hash, cancel event, start time) by (chat_id, user_id)
+        _prefetches_lock (Lock): lock for _prefetches
+        _prefetch_wait_timeout (int): max time for search to wait for its
+            prefetch
+        _prefetch_ttl (int): time after which prefetch of user who left
+            search is dropped
+
 
     """
 
-    _base_url = url = "https://hotels4.p.rapidapi.com/"
+    _base_url = url = (
+        getenv("HOTELS_API_BASE_URL") or "https://hotels4.p.rapidapi.com/"
+    )
     _rapid_api_key = getenv("RAPID_API_KEY")
     _headers_get = {
         "X-RapidAPI-Key": _rapid_api_key,
@@ -58,22 +155,146 @@ class HotelsApi:
         "X-RapidAPI-Key": _rapid_api_key,
         "X-RapidAPI-Host": "hotels4.p.rapidapi.com",
     }
-    _file_name = "{user_id}_{city_or_hotel}_{method}_{datetime}.json"
     _response_files_dir = response_files_abs_path
+    _archiver = ResponseArchiver(
+        archive=SegmentedArchive(
+            files_dir=_response_files_dir,
+            compression="gzip",
+            segment_period="hour",
+            max_age_days=90,
+            max_total_bytes=5 * 1024 * 1024 * 1024,
+        ),
+        queue_size=256,
+        block_when_full=False,
+    )
     _suitable_city_types = ["CITY", "NEIGHBORHOOD", "MULTIREGION"]
     _find_city_endpoint = "locations/v3/search"
     _find_hotels_endpoint = "properties/v2/list"
     _get_hotel_details_endpoint = "properties/v2/detail"
-    _request_timeout = 10
-    _backoff_exceptions = (exceptions.Timeout, exceptions.ConnectionError)
+    _request_timeouts = {
+        _find_city_endpoint: (3.05, 10),
+        _find_hotels_endpoint: (3.05, 15),
+        _get_hotel_details_endpoint: (3.05, 10),
+    }
+    _endpoint_policies = {
+        _find_city_endpoint: EndpointPolicy(
+            _find_city_endpoint, max_read_timeout=10,
+        ),
+        _find_hotels_endpoint: EndpointPolicy(
+            _find_hotels_endpoint, max_read_timeout=15, hedge_ratio=0,
+        ),
+        _get_hotel_details_endpoint: EndpointPolicy(
+            _get_hotel_details_endpoint, max_read_timeout=10,
+        ),
+    }
+    _hedge_executor = DelayedExecutor(
+        max_workers=4, thread_name_prefix="hotels_hedge",
+    )
+    _request_priorities = {
+        _find_city_endpoint: 0,
+        _find_hotels_endpoint: 1,
+        _get_hotel_details_endpoint: 2,
+    }
+    _rate_limiter = RateLimiter(
+        rate=5,
+        capacity=5,
+        endpoint_limits={
+            _find_city_endpoint: (5, 5),
+            _find_hotels_endpoint: (2, 4),
+            _get_hotel_details_endpoint: (4, 4),
+        },
+        max_wait=10,
+        quota_reserve=50,
+    )
+    _pool_connections = 1
+    _pool_maxsize = 10
+    _pool_block = False
+    _session = None
+    _session_lock = Lock()
+    _retry_policy = RetryPolicy(
+        retry_statuses=(429, 500, 502, 503, 504),
+        base_delay=0.5,
+        max_delay=8,
+        max_retry_after=10,
+        budget_ratio=0.2,
+        budget_min_retries=5,
+        budget_window=10,
+    )
+    _backoff_exceptions = (
+        exceptions.Timeout, exceptions.ConnectionError, HotelsApiStatusError,
+    )
     _backoff_max_time = 20
-    _backoff_max_tries = 2
+    _backoff_max_tries = 3
+    _details_max_workers = 3
+    _details_timeout = 30
+    _missing_extra_hotel_data = {
+        "site_url": None,
+        "address": None,
+        "rating": None,
+        "photos_url": [],
+    }
+    _request_exceptions = (
+        exceptions.RequestException,
+        RateLimitError,
+        CircuitOpenError,
+        HotelsApiStatusError,
+    )
+    _currency = "USD"
+    _max_hotel_photos = 5
+    _min_page_size = 10
+    _page_size_per_hotel = 3
+    _max_page_size = 200
+    _max_results_index = 200
+    _high_price_sort = None
+    _top_price_max_results = (
+        HIGH_PRICE_SCAN_MAX_RESULTS
+        if HIGH_PRICE_FULL_SCAN
+        else _max_results_index
+    )
+    _best_deal_candidates = 100
+    _best_deal_score_weights = {"price": 1.0, "distance": 1.0, "rating": 1.0}
+    _total_price_pattern = re_compile(r"\d[\d,]*(?:\.\d+)?")
+    _prefetch_executor = ThreadPoolExecutor(
+        max_workers=4, thread_name_prefix="hotels_prefetch",
+    )
+    _prefetches = {}
+    _prefetches_lock = Lock()
+    _prefetch_wait_timeout = 20
+    _prefetch_ttl = 600
+    _hotel_details_cache = ResponseCache(
+        name="hotel_details",
+        ttl=12 * 60 * 60,
+        max_entries=5000,
+        max_bytes=256 * 1024 * 1024,
+    )
+    _cities_cache = ResponseCache(
+        name="cities",
+        ttl=7 * 24 * 60 * 60,
+        max_entries=20000,
+        max_bytes=16 * 1024 * 1024,
+    )
+    _cities_not_found_ttl = 30 * 60
+    _properties_cache = ResponseCache(
+        name="properties",
+        ttl=10 * 60,
+        max_entries=500,
+        max_bytes=128 * 1024 * 1024,
+    )
+    _listed_hotels_cache = ResponseCache(
+        name="listed_hotels",
+        ttl=24 * 60 * 60,
+        max_entries=20000,
+        max_bytes=32 * 1024 * 1024,
+    )
+    _search_key_length = 16
 
     @classmethod
     def find_city(cls, user_id: int, city_name: str) -> list[Optional[dict]]:
         """Search matching cities based on city name.
 
-        Send get request, save response, sort found cities and return them.
+        Get sorted cities from cache by normalized city name. If they are
+        not cached, send get request, save response, sort and cache found
+        cities. Request errors are logged and give no matching cities.
 
         Args:
              user_id (int): user identifier
@@ -83,79 +304,877 @@ class HotelsApi:
             list[Optional[dict]]: matching cities
 
         """
-        found_cities = HotelsApi._get_matching_cities(city_name)
-        file_name = cls._file_name.format(
-            user_id=user_id,
-            city_or_hotel=city_name,
-            method=cls.find_city.__name__,
-            datetime=datetime.now(),
-        )
-        cls._save_response(file_name, found_cities)
-        if found_cities and found_cities.get("sr"):
-            sorted_cities = cls._sort_found_cities(found_cities["sr"])
-        else:
-            sorted_cities = []
+        city_query = cls._normalize_city_name(city_name)
+        try:
+            sorted_cities = cls._cities_cache.get_or_load(
+                city_query,
+                lambda: cls._request_cities(user_id, city_query),
+                cls._get_cities_ttl,
+            )
+        except cls._request_exceptions as exc:
+            bot_logger.error(f"{exc=}, {user_id=}, {city_name=}")
+            return []
         bot_logger.debug(f"{user_id=}, {city_name=}, {sorted_cities=}")
-        return sorted_cities
+        return sorted_cities or []
+
+    @classmethod
+    def _request_cities(
+        cls, user_id: int, city_name: str,
+    ) -> Optional[list[dict]]:
+        """Request matching cities, save response and sort found cities.
+
+        Args:
+             user_id (int): user identifier
+             city_name (str): city name for search
+
+        Returns:
+            Optional[list[dict]]: matching cities, None if response is not
+                valid
+
+        """
+        found_cities = cls._get_matching_cities(city_name)
+        cls._save_response(
+            user_id,
+            city_name,
+            cls.find_city.__name__,
+            found_cities,
+        )
+        return cls._sort_cities_response(found_cities)
+
+    @classmethod
+    def _sort_cities_response(
+        cls, found_cities: dict,
+    ) -> Optional[list[dict]]:
+        """Sort found cities from response.
+
+        Args:
+            found_cities (dict): response
+
+        Returns:
+            Optional[list[dict]]: matching cities, None if response is not
+                valid
+
+        """
+        if not isinstance(found_cities, dict) or "sr" not in found_cities:
+            bot_logger.error(f"{found_cities=}")
+            return None
+        if not found_cities["sr"]:
+            return []
+        return cls._sort_found_cities(found_cities["sr"])
+
+    @classmethod
+    def _get_cities_ttl(
+        cls, sorted_cities: Optional[list[dict]],
+    ) -> Optional[float]:
+        """Get cities cache ttl, None if response was not valid.
+
+        Found cities are cached for long time, not found for short time.
+
+        Args:
+            sorted_cities (Optional[list[dict]]): matching cities
+
+        Returns:
+            Optional[float]: cache ttl
+
+        """
+        if sorted_cities is None:
+            return None
+        if sorted_cities:
+            return cls._cities_cache.ttl
+        return cls._cities_not_found_ttl
+
+    @staticmethod
+    def _normalize_city_name(city_name: str) -> str:
+        """Normalize city name for cities search and cache key.
+
+        Strip and fold punctuation the same way as input city name check,
+        lower case and collapse spaces. (ex. " Paris, " -> "paris")
+
+        Args:
+            city_name (str): city name
+
+        Returns:
+            str: normalized city name
+
+        """
+        stripped_name = city_name.strip(",. ").replace(",", "").lower()
+        return " ".join(stripped_name.split())
 
     @classmethod
     def find_hotels_in_city(
-        cls, chat_id: int, user_id: int
-    ) -> list[Optional[dict]]:
+        cls, chat_id: int, user_id: int, add_details: bool = True,
+    ) -> list[HotelSummary]:
         """Find hotels in city based on user search settings.
 
-        Send POST request, save response, sort found hotels, add extra hotels
-        data as per search settings.
+        Found hotels are requested by pages, every page is got from cache or
+        requested, saved and cached. Then extra hotels data is added as per
+        search settings. Without details found hotels are cached for
+        get_listed_hotel_details.
 
         Args:
             chat_id (int): chat identifier
             user_id (int): user identifier
+            add_details (bool): request hotels details
 
         Returns:
-            list[Optional[dict]]: hotels details
+            list[HotelSummary]: found hotels
+
+        """
+        search_settings = StateData.get_full_user_data(chat_id, user_id)
+        cls._wait_prefetch(chat_id, user_id, search_settings)
+        hotels_data = cls._find_sorted_hotels(user_id, search_settings)
+        if hotels_data and add_details:
+            hotels_data = cls._add_extra_hotels_data(
+                user_id, search_settings, hotels_data,
+            )
+        elif hotels_data:
+            cls._cache_listed_hotels(search_settings, hotels_data)
+        bot_logger.debug(f"{search_settings=}, {hotels_data=}")
+        return hotels_data
+
+    @classmethod
+    def iter_hotels_in_city(
+        cls, chat_id: int, user_id: int,
+    ) -> Iterator[HotelSummary]:
+        """Find hotels in city and yield them as their details are received.
+
+        Hotels are found as in find_hotels_in_city, then every hotel is
+        yielded with extra data in rank order as soon as its details and
+        details of all higher ranked hotels are received.
+
+        Args:
+            chat_id (int): chat identifier
+            user_id (int): user identifier
+
+        Yields:
+            HotelSummary: found hotel with extra data if found
 
         """
         search_settings = StateData.get_full_user_data(chat_id, user_id)
-        found_hotels = HotelsApi._get_hotels_in_city(search_settings)
-        file_name = cls._file_name.format(
-            user_id=user_id,
-            city_or_hotel=search_settings["full_name"],
-            method=cls.find_hotels_in_city.__name__,
-            datetime=datetime.now(),
+        cls._wait_prefetch(chat_id, user_id, search_settings)
+        hotels_data = cls._find_sorted_hotels(user_id, search_settings)
+        bot_logger.debug(f"{search_settings=}, {hotels_data=}")
+        if hotels_data:
+            yield from cls._iter_extra_hotels_data(
+                user_id, search_settings, hotels_data,
+            )
+
+    @classmethod
+    def prefetch_hotels_in_city(
+        cls, chat_id: int, user_id: int, details_amount: int = 0,
+    ) -> None:
+        """Start speculative hotel search in background.
+
+        Must be called once hotel search payload is fully determined by
+        user search settings (hotels amount included, as first page size
+        depends on it), otherwise prefetch is not started. First found
+        hotels page and details of details_amount top hotels of the page
+        are requested into caches, so hotel search started later gets them
+        from cache or joins in-flight requests. Previous prefetch of the
+        user and prefetches older than _prefetch_ttl are cancelled.
+
+        Args:
+            chat_id (int): chat identifier
+            user_id (int): user identifier
+            details_amount (int): number of top hotels to request details
+
+        """
+        search_settings = dict(
+            StateData.get_full_user_data(chat_id, user_id),
         )
-        cls._save_response(file_name, found_hotels)
-        hotels_data = []
-        if found_hotels and found_hotels.get("data"):
-            hotels_data = cls._sort_hotels_in_city(
-                found_hotels["data"], search_settings,
+        try:
+            payload = cls.create_hotel_search_payload(search_settings)
+        except KeyError as exc:
+            bot_logger.error(f"Prefetch is not started: {exc=}")
+            return
+        cancel_event = Event()
+        future = cls._prefetch_executor.submit(
+            cls._prefetch_hotels,
+            user_id,
+            search_settings,
+            payload,
+            details_amount,
+            cancel_event,
+        )
+        with cls._prefetches_lock:
+            outdated_prefetches = cls._pop_outdated_prefetches()
+            previous_prefetch = cls._prefetches.get((chat_id, user_id))
+            cls._prefetches[(chat_id, user_id)] = (
+                future, cls._get_payload_key(payload), cancel_event,
+                monotonic(),
+            )
+        if previous_prefetch is not None:
+            outdated_prefetches.append(previous_prefetch)
+        for i_future, _, i_cancel_event, _ in outdated_prefetches:
+            i_future.cancel()
+            i_cancel_event.set()
+        bot_logger.debug(
+            f"{chat_id=}, {user_id=}, {details_amount=}, "
+            f"{len(outdated_prefetches)=}"
+        )
+
+    @classmethod
+    def _pop_outdated_prefetches(cls) -> list[tuple]:
+        """Remove prefetches older than _prefetch_ttl.
+
+        Prefetch is removed by search or cancel_prefetch, so it outlives
+        its ttl only if user left search without finishing or cancelling
+        it. Must be called under _prefetches_lock.
+
+        Returns:
+            list[tuple]: removed prefetches
+
+        """
+        expired_at = monotonic() - cls._prefetch_ttl
+        outdated_keys = [
+            i_key for i_key, i_prefetch in cls._prefetches.items()
+            if i_prefetch[3] < expired_at
+        ]
+        return [cls._prefetches.pop(i_key) for i_key in outdated_keys]
+
+    @classmethod
+    def cancel_prefetch(cls, chat_id: int, user_id: int) -> None:
+        """Cancel speculative hotel search of the user.
+
+        Queued prefetch is not started, running prefetch stops before its
+        next request.
+
+        Args:
+            chat_id (int): chat identifier
+            user_id (int): user identifier
+
+        """
+        with cls._prefetches_lock:
+            prefetch = cls._prefetches.pop((chat_id, user_id), None)
+        if prefetch is not None:
+            prefetch[0].cancel()
+            prefetch[2].set()
+            bot_logger.debug(f"Prefetch is cancelled: {chat_id=}, {user_id=}")
+
+    @classmethod
+    def _prefetch_hotels(
+        cls,
+        user_id: int,
+        search_settings: dict,
+        payload: dict,
+        details_amount: int,
+        cancel_event: Event,
+    ) -> None:
+        """Request first found hotels page and top hotels details.
+
+        Details are not requested for the most expensive hotels scan, as
+        first page top hotels are not final.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            payload (dict): hotel search payload of first page
+            details_amount (int): number of top hotels to request details
+            cancel_event (Event): set if prefetch is cancelled
+
+        """
+        page = cls._get_properties_page(user_id, search_settings, payload)
+        if (
+            not page
+            or not details_amount
+            or cls._is_top_price_scan_required(search_settings)
+        ):
+            return
+        top_hotels = cls._sort_hotels_in_city(
+            page, dict(search_settings, hotels_amount=details_amount),
+        ) or []
+        for i_hotel in top_hotels:
+            if cancel_event.is_set():
+                return
+            try:
+                cls._get_cached_hotel_details(user_id, i_hotel)
+            except cls._request_exceptions as exc:
+                bot_logger.error(f"{exc=}, {i_hotel.property_id=}")
+
+    @classmethod
+    def _wait_prefetch(
+        cls, chat_id: int, user_id: int, search_settings: dict,
+    ) -> None:
+        """Wait for prefetch of the user before hotel search.
+
+        Prefetch is used only if its payload matches search settings,
+        otherwise it is cancelled. Prefetch errors are ignored, as search
+        requests missing responses itself.
+
+        Args:
+            chat_id (int): chat identifier
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        """
+        with cls._prefetches_lock:
+            prefetch = cls._prefetches.pop((chat_id, user_id), None)
+        if prefetch is None:
+            return
+        future, payload_key, cancel_event, _ = prefetch
+        if payload_key != cls._get_payload_key(
+            cls.create_hotel_search_payload(search_settings),
+        ):
+            future.cancel()
+            cancel_event.set()
+            bot_logger.debug(f"Prefetch is outdated: {chat_id=}, {user_id=}")
+            return
+        try:
+            future.result(timeout=cls._prefetch_wait_timeout)
+        except (
+            CancelledError, TimeoutError, *cls._request_exceptions,
+        ) as exc:
+            bot_logger.error(f"{exc=}, {chat_id=}, {user_id=}")
+        else:
+            bot_logger.debug(f"Prefetch is used: {chat_id=}, {user_id=}")
+
+    @classmethod
+    def _find_sorted_hotels(
+        cls, user_id: int, search_settings: dict,
+    ) -> list[HotelSummary]:
+        """Find hotels in city sorted as per search settings command.
+
+        Request errors are logged and give no found hotels.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Returns:
+            list[HotelSummary]: sorted hotels without extra data
+
+        """
+        try:
+            if cls._is_top_price_scan_required(search_settings):
+                return cls._find_most_expensive_hotels(
+                    user_id, search_settings,
+                )
+            return cls._find_first_matching_hotels(user_id, search_settings)
+        except cls._request_exceptions as exc:
+            bot_logger.error(f"{exc=}, {user_id=}")
+            return []
+
+    @classmethod
+    def get_listed_hotel_details(
+        cls,
+        user_id: int,
+        search_key: str,
+        property_id: str,
+        photo_amount: int,
+    ) -> Optional[HotelSummary]:
+        """Get found hotel with extra data for hotel listed without details.
+
+        Args:
+            user_id (int): user identifier
+            search_key (str): key of search which listed hotel
+            property_id (str): unic hotel id
+            photo_amount (int): number of hotel photos, 0 if photos are not
+                required
+
+        Returns:
+            Optional[HotelSummary]: found hotel with extra data if found,
+                None if listed hotel is not cached any more
+
+        """
+        listed_hotel = cls._listed_hotels_cache.get(
+            (search_key, property_id),
+        )
+        if listed_hotel is None:
+            bot_logger.debug(
+                f"Listed hotel is not cached: {search_key=}, {property_id=}"
+            )
+            return None
+        hotel_data = replace(listed_hotel, photos_url=[])
+        search_settings = {
+            "display_hotel_photos": bool(photo_amount),
+            "hotel_photo_amount": photo_amount,
+        }
+        try:
+            extra_hotel_data = cls._get_cached_hotel_details(
+                user_id, hotel_data,
             )
-            if hotels_data:
-                hotels_data = cls._add_extra_hotels_data(
-                    user_id, search_settings, hotels_data,
+        except cls._request_exceptions as exc:
+            bot_logger.error(f"{exc=}, {property_id=}")
+            hotel_data.add_details(cls._missing_extra_hotel_data)
+        else:
+            hotel_data.add_details(
+                cls._process_extra_hotel_data(
+                    search_settings, hotel_data, extra_hotel_data,
                 )
-        bot_logger.debug(f"{search_settings=}, {hotels_data=}")
+            )
+        bot_logger.debug(f"{hotel_data=}")
+        return hotel_data
+
+    @classmethod
+    def get_search_key(cls, search_settings: dict) -> str:
+        """Get short key of hotel search for hotels listed without details.
+
+        Key is hash of hotel search payload, so listed hotel prices of
+        searches with other dates or travellers are kept apart. It is short
+        enough for inline button callback data.
+
+        Args:
+            search_settings (dict): hotel search settings
+
+        Returns:
+            str: search key
+
+        """
+        payload = cls.create_hotel_search_payload(search_settings)
+        return cls._get_payload_key(payload)[:cls._search_key_length]
+
+    @classmethod
+    def _cache_listed_hotels(
+        cls, search_settings: dict, hotels_data: list[HotelSummary],
+    ) -> None:
+        """Cache hotels listed without details by search key and hotel id.
+
+        Args:
+            search_settings (dict): hotel search settings
+            hotels_data (list[HotelSummary]): found hotels
+
+        """
+        search_key = cls.get_search_key(search_settings)
+        for i_hotel in hotels_data:
+            cls._listed_hotels_cache.set(
+                (search_key, i_hotel.property_id), i_hotel,
+            )
+
+    @classmethod
+    def _find_first_matching_hotels(
+        cls, user_id: int, search_settings: dict,
+    ) -> list[HotelSummary]:
+        """Find first hotels matching search settings in API sort order.
+
+        First page is sized from required hotels amount, next pages are
+        requested only if sorted hotels are not enough. Best deal hotels
+        are ranked among first page (_best_deal_candidates hotels) and
+        next pages only, not among all hotels in city.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Returns:
+            list[HotelSummary]: sorted hotels
+
+        """
+        payload = cls.create_hotel_search_payload(search_settings)
+        found_hotels = []
+        hotels_data = []
+        while payload is not None:
+            page = cls._get_properties_page(user_id, search_settings, payload)
+            if not page:
+                break
+            found_hotels.extend(page)
+            hotels_data = cls._sort_hotels_in_city(
+                found_hotels, search_settings,
+            ) or []
+            if len(hotels_data) >= search_settings["hotels_amount"]:
+                break
+            payload = cls._get_next_page_payload(payload, len(page))
         return hotels_data
 
     @classmethod
-    def _save_response(cls, file_name: str, data: dict) -> None:
-        """Save response data in json file.
+    def _find_most_expensive_hotels(
+        cls, user_id: int, search_settings: dict,
+    ) -> list[HotelSummary]:
+        """Find the most expensive hotels by scanning found hotels pages.
+
+        Only required number of hotels is kept while pages are scanned.
+        Scan stops at last page or after _top_price_max_results hotels.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+
+        Returns:
+            list[HotelSummary]: sorted hotels
+
+        """
+        selector = TopPriceSelector(search_settings["hotels_amount"])
+        payload = cls.create_hotel_search_payload(search_settings)
+        while payload is not None:
+            page = cls._get_properties_page(user_id, search_settings, payload)
+            if page is None:
+                break
+            selector.add_page(page, payload["resultsSize"])
+            payload = cls._get_next_page_payload(
+                payload, len(page), cls._top_price_max_results,
+            )
+        bot_logger.debug(f"{search_settings=}, {selector.stats()=}")
+        return cls._create_hotel_summaries(selector.result())
+
+    @classmethod
+    def _is_top_price_scan_required(cls, search_settings: dict) -> bool:
+        """Check that the most expensive hotels require scan of all pages.
+
+        Args:
+            search_settings (dict): hotel search settings
+
+        Returns:
+            bool: True for high price command without server-side sort by
+                price DESC
+
+        """
+        return (
+            search_settings["command"] == HIGH_PRICE_COMMAND_DATA["shortcut"]
+            and cls._high_price_sort is None
+        )
+
+    @classmethod
+    def _get_properties_page(
+        cls, user_id: int, search_settings: dict, payload: dict,
+    ) -> Optional[list[dict]]:
+        """Get found hotels page from cache or request and cache it.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            payload (dict): hotel search payload of the page
+
+        Returns:
+            Optional[list[dict]]: found hotels (properties), None if response
+                is not valid
+
+        """
+        page = cls._properties_cache.get_or_load(
+            cls._get_payload_key(payload),
+            lambda: cls._request_properties(user_id, search_settings, payload),
+            cls._get_properties_ttl,
+        )
+        bot_logger.debug(
+            f"{payload['resultsStartingIndex']=}, {payload['resultsSize']=}, "
+            f"{len(page or [])=}"
+        )
+        return page
+
+    @classmethod
+    def _get_first_page_size(cls, search_settings: dict) -> int:
+        """Get number of hotels to request in first results page.
+
+        Scan for the most expensive hotels requests max pages. Best deal
+        search requests at least _best_deal_candidates hotels, so score
+        ranks them all instead of first matches in API sort order at the
+        same quota cost of one request.
 
         Args:
-            file_name(str): file name
-            data (dict): data to save
+            search_settings (dict): hotel search settings
+
+        Returns:
+            int: page size
 
         """
-        bot_logger.debug(f"{file_name=}")
-        file_path = path.join(cls._response_files_dir, file_name)
-        with open(file_path, "w", encoding="utf-8") as file:
-            dump(data, file, indent=4)
+        if cls._is_top_price_scan_required(search_settings):
+            return cls._max_page_size
+        min_page_size = cls._min_page_size
+        if search_settings["command"] == BEST_DEALS_COMMAND_DATA["shortcut"]:
+            min_page_size = cls._best_deal_candidates
+        return min(
+            max(
+                search_settings["hotels_amount"] * cls._page_size_per_hotel,
+                min_page_size,
+            ),
+            cls._max_page_size,
+        )
+
+    @classmethod
+    def _get_next_page_payload(
+        cls,
+        payload: dict,
+        page_length: int,
+        max_results_index: Optional[int] = None,
+    ) -> Optional[dict]:
+        """Create hotel search payload of next results page.
+
+        Next page is twice bigger than previous one, so number of requests
+        stays small if many found hotels do not match search settings.
+
+        Args:
+            payload (dict): hotel search payload of previous page
+            page_length (int): number of found hotels in previous page
+            max_results_index (Optional[int]): max number of found hotels
+                to look through, default _max_results_index
+
+        Returns:
+            Optional[dict]: payload, None if there are no more results
+
+        """
+        max_results_index = max_results_index or cls._max_results_index
+        next_index = payload["resultsStartingIndex"] + payload["resultsSize"]
+        if (
+            page_length < payload["resultsSize"]
+            or next_index >= max_results_index
+        ):
+            return None
+        return dict(
+            payload,
+            resultsStartingIndex=next_index,
+            resultsSize=min(
+                payload["resultsSize"] * 2,
+                cls._max_page_size,
+                max_results_index - next_index,
+            ),
+        )
+
+    @classmethod
+    def _request_properties(
+        cls, user_id: int, search_settings: dict, payload: dict,
+    ) -> Optional[list[dict]]:
+        """Request hotels in city, save response and extract found hotels.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            payload (dict): hotel search payload
+
+        Returns:
+            Optional[list[dict]]: found hotels (properties), None if response
+                is not valid
+
+        """
+        response_content = cls._get_hotels_in_city(payload)
+        cls._save_response(
+            user_id,
+            search_settings["full_name"],
+            cls.find_hotels_in_city.__name__,
+            response_content,
+        )
+        return parse_properties(response_content)
+
+    @classmethod
+    def _get_properties_ttl(
+        cls, found_hotels: Optional[list[dict]],
+    ) -> Optional[float]:
+        """Get found hotels cache ttl, None if response was not valid.
+
+        Args:
+            found_hotels (Optional[list[dict]]): found hotels
+
+        Returns:
+            Optional[float]: cache ttl
+
+        """
+        return None if found_hotels is None else cls._properties_cache.ttl
+
+    @staticmethod
+    def _get_payload_key(payload: dict) -> str:
+        """Get cache key as hash of canonical hotel search payload.
+
+        Args:
+            payload (dict): hotel search payload
+
+        Returns:
+            str: payload hash
+
+        """
+        canonical_payload = dumps(
+            payload, sort_keys=True, separators=(",", ":"),
+        )
+        return sha256(canonical_payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _get_session(cls) -> Session:
+        """Get shared HTTP session with keep-alive connection pool.
+
+        Session is created on first call and reused by all bot worker threads,
+        so TCP and TLS handshakes are done once per pooled connection instead
+        of once per request.
+
+        Returns:
+            Session: shared HTTP session
+
+        """
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    adapter = HTTPAdapter(
+                        pool_connections=cls._pool_connections,
+                        pool_maxsize=cls._pool_maxsize,
+                        pool_block=cls._pool_block,
+                    )
+                    session = Session()
+                    session.mount(cls._base_url, adapter)
+                    cls._session = session
+                    bot_logger.debug(f"{cls._base_url=}, {cls._pool_maxsize=}")
+        return cls._session
+
+    @classmethod
+    def _send_request(
+        cls, method: str, endpoint: str, **kwargs,
+    ) -> Response:
+        """Send request to Hotels API endpoint through shared session.
+
+        Request is sent on caller thread. If endpoint has enough latencies
+        for hedging, hedged duplicate request is scheduled on shared hedge
+        executor after endpoint latency p95 and cancelled as soon as
+        request succeeds, so it is sent only for late requests within
+        hedging budget. If late request fails (e.g. by adaptive read
+        timeout), response of hedged one is returned.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Hotels API endpoint
+            **kwargs: extra request arguments (params, json, headers)
+
+        Raises:
+            RateLimitError: if request is not allowed by rate limiter
+            CircuitOpenError: if endpoint circuit breaker is open
+            HotelsApiStatusError: if response status is 4xx or 5xx
+
+        Returns:
+            Response: response
+
+        """
+        policy = cls._endpoint_policies[endpoint]
+        trial = policy.before_request()
+        try:
+            cls._retry_policy.record_request()
+            hedge_delay = policy.get_hedge_delay()
+            if hedge_delay is None:
+                return cls._send_single_request(method, endpoint, **kwargs)
+            hedge = cls._hedge_executor.submit_after(
+                hedge_delay,
+                cls._send_hedged_request,
+                policy,
+                method,
+                endpoint,
+                kwargs,
+            )
+            try:
+                response = cls._send_single_request(method, endpoint, **kwargs)
+            except Exception:
+                if hedge.cancel():
+                    raise
+                hedged_response = cls._get_hedged_response(hedge)
+                if hedged_response is None:
+                    raise
+                return hedged_response
+            hedge.cancel()
+            return response
+        finally:
+            if trial:
+                policy.release_trial()
+
+    @classmethod
+    def _send_hedged_request(
+        cls, policy: EndpointPolicy, method: str, endpoint: str, kwargs: dict,
+    ) -> Optional[Response]:
+        """Send hedged duplicate of late request within hedging budget.
+
+        Args:
+            policy (EndpointPolicy): endpoint policy
+            method (str): HTTP method
+            endpoint (str): Hotels API endpoint
+            kwargs (dict): extra request arguments (params, json, headers)
+
+        Returns:
+            Optional[Response]: response, None if hedging budget is spent
+
+        """
+        if not policy.try_hedge():
+            return None
+        bot_logger.debug(f"Hedged request: {endpoint=}")
+        return cls._send_single_request(method, endpoint, **kwargs)
+
+    @staticmethod
+    def _get_hedged_response(hedge: Future) -> Optional[Response]:
+        """Wait for hedged request of failed request.
+
+        Args:
+            hedge (Future): hedged request
+
+        Returns:
+            Optional[Response]: response, None if hedged request is not
+                sent or failed
+
+        """
+        try:
+            return hedge.result()
+        except Exception as exc:
+            bot_logger.debug(f"Hedged request failed: {exc=}")
+            return None
+
+    @classmethod
+    def _send_single_request(
+        cls, method: str, endpoint: str, **kwargs,
+    ) -> Response:
+        """Send one request with adaptive read timeout and record latency.
+
+        Request waits for rate limiter first, remaining quota is updated
+        from response headers. Only 5xx statuses are circuit breaker
+        failures, 429 is handled by retry policy.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Hotels API endpoint
+            **kwargs: extra request arguments (params, json, headers)
+
+        Raises:
+            RateLimitError: if request is not allowed by rate limiter
+            HotelsApiStatusError: if response status is 4xx or 5xx
+
+        Returns:
+            Response: response
+
+        """
+        policy = cls._endpoint_policies[endpoint]
+        waited = cls._rate_limiter.acquire(
+            endpoint, cls._request_priorities[endpoint],
+        )
+        connect_timeout, _ = cls._request_timeouts[endpoint]
+        read_timeout = policy.get_read_timeout()
+        started_at = monotonic()
+        try:
+            response = cls._get_session().request(
+                method,
+                url=cls._base_url + endpoint,
+                timeout=(connect_timeout, read_timeout),
+                **kwargs,
+            )
+        except exceptions.RequestException:
+            policy.record_failure()
+            raise
+        if response.status_code >= 500:
+            policy.record_failure()
+        else:
+            policy.record_success(monotonic() - started_at)
+        cls._rate_limiter.update_quota(response.headers)
+        bot_logger.debug(
+            f"{endpoint=}, {response.status_code=}, {waited=}, "
+            f"{read_timeout=}"
+        )
+        cls._retry_policy.check_status(response.status_code, response.headers)
+        return response
+
+    @classmethod
+    def _save_response(
+        cls,
+        user_id: int,
+        city_or_hotel: str,
+        method: str,
+        data: Union[dict, bytes],
+    ) -> None:
+        """Queue response data for saving in archive in background.
+
+        Args:
+            user_id (int): user identifier
+            city_or_hotel (str): searched city or hotel name
+            method (str): HotelsApi method name
+            data (Union[dict, bytes]): response data or raw json content
+
+        """
+        bot_logger.debug(f"{user_id=}, {city_or_hotel=}, {method=}")
+        cls._archiver.save(user_id, method, city_or_hotel, data)
 
     @classmethod
     @backoff.on_exception(
-        backoff.expo,
+        _retry_policy.wait_gen,
         exception=_backoff_exceptions,
         max_time=_backoff_max_time,
         max_tries=_backoff_max_tries,
+        giveup=_retry_policy.giveup,
+        jitter=None,
     )
     def _get_matching_cities(cls, city_name: str) -> dict:
         """Send GET request to find cities as per city name.
@@ -167,18 +1186,18 @@ class HotelsApi:
             dict: response
 
         """
-        response = get(
-            url=cls._base_url + cls._find_city_endpoint,
+        response = cls._send_request(
+            "GET",
+            cls._find_city_endpoint,
             params={"q": city_name},
             headers=cls._headers_get,
-            timeout=cls._request_timeout,
         )
         bot_logger.debug(f"{city_name=}, {response.status_code=}")
         return response.json()
 
     @classmethod
     def create_hotel_search_payload(cls, search_settings: dict) -> dict:
-        """Create payload for POST request of hotel search.
+        """Create payload for POST request of first page of hotel search.
 
         Args:
             search_settings (dict): hotel search settings details
@@ -187,15 +1206,22 @@ class HotelsApi:
             dict: payload
 
         """
+        sort = search_settings["sort"]
+        if (
+            cls._high_price_sort
+            and search_settings["command"]
+            == HIGH_PRICE_COMMAND_DATA["shortcut"]
+        ):
+            sort = cls._high_price_sort
         payload = {
-            "currency": "USD",
+            "currency": cls._currency,
             "destination": {"regionId": search_settings["region_id"]},
             "checkInDate": search_settings["check_in_date"],
             "checkOutDate": search_settings["check_out_date"],
             "rooms": [{"adults": search_settings["adults"], "children": []}],
             "resultsStartingIndex": 0,
-            "resultsSize": 200,
-            "sort": search_settings["sort"],
+            "resultsSize": cls._get_first_page_size(search_settings),
+            "sort": sort,
             "filters": {
                 "price": {
                     "max": search_settings["max_price"],
@@ -209,55 +1235,59 @@ class HotelsApi:
 
     @classmethod
     @backoff.on_exception(
-        backoff.expo,
+        _retry_policy.wait_gen,
         exception=_backoff_exceptions,
         max_tries=_backoff_max_tries,
         max_time=_backoff_max_time,
+        giveup=_retry_policy.giveup,
+        jitter=None,
     )
-    def _get_hotels_in_city(cls, search_settings: dict) -> dict:
+    def _get_hotels_in_city(cls, payload: dict) -> bytes:
         """Send POST request to find hotels in city.
 
         Args:
-            search_settings (dict): hotel search settings details
+            payload (dict): hotel search payload
 
         Returns:
-            dict: response
+            bytes: response content
 
         """
-        response = post(
-            url=cls._base_url + cls._find_hotels_endpoint,
-            json=cls.create_hotel_search_payload(search_settings),
+        response = cls._send_request(
+            "POST",
+            cls._find_hotels_endpoint,
+            json=payload,
             headers=cls._headers_post,
-            timeout=cls._request_timeout,
         )
-        bot_logger.debug(f"{search_settings=}, {response.status_code=}")
-        return response.json()
+        bot_logger.debug(f"{payload=}, {response.status_code=}")
+        return response.content
 
     @classmethod
     @backoff.on_exception(
-        backoff.expo,
+        _retry_policy.wait_gen,
         exception=_backoff_exceptions,
         max_time=_backoff_max_time,
         max_tries=_backoff_max_tries,
+        giveup=_retry_policy.giveup,
+        jitter=None,
     )
-    def _get_hotel_details(cls, hotel_id: str) -> dict:
+    def _get_hotel_details(cls, hotel_id: str) -> bytes:
         """Send POST request to get hotel details.
 
         Args:
             hotel_id(str): unic hotel id
 
         Returns:
-            dict: response
+            bytes: response content
 
         """
-        response = post(
-            url=cls._base_url + cls._get_hotel_details_endpoint,
-            json={"currency": "USD", "propertyId": hotel_id},
+        response = cls._send_request(
+            "POST",
+            cls._get_hotel_details_endpoint,
+            json={"currency": cls._currency, "propertyId": hotel_id},
             headers=cls._headers_post,
-            timeout=cls._request_timeout,
         )
         bot_logger.debug(f"{hotel_id=}, {response.status_code=}")
-        return response.json()
+        return response.content
 
     @classmethod
     def _sort_extra_hotel_data(
@@ -275,8 +1305,7 @@ class HotelsApi:
 
         """
         hotel_info = extra_details["data"]["propertyInfo"]
-        hotel_rating = "not rated"
-        site_url = "not provided"
+        hotel_rating = None
         photos_urls = list()
         if require_photos:
             photo_amount = min(
@@ -289,12 +1318,10 @@ class HotelsApi:
                 )
         if hotel_info["summary"]["overview"]["propertyRating"]:
             hotel_rating = hotel_info["summary"]["overview"]["propertyRating"]["rating"]
-        if site_url.startswith("https"):
-            site_url = hotel_info["summary"]["name"]
         sorted_extra_data = {
-            "site_url": site_url,
-            "hotel_address": hotel_info["summary"]["location"]["address"]["addressLine"],
-            "hotel_rating": hotel_rating,
+            "site_url": None,
+            "address": hotel_info["summary"]["location"]["address"]["addressLine"],
+            "rating": hotel_rating,
             "photos_url": photos_urls,
         }
         bot_logger.debug(f"{hotel_info=}, {sorted_extra_data=}")
@@ -302,37 +1329,246 @@ class HotelsApi:
 
     @classmethod
     def _add_extra_hotels_data(
-        cls, user_id: int, search_settings: dict, hotels_data: list[dict],
-    ) -> list[dict]:
+        cls,
+        user_id: int,
+        search_settings: dict,
+        hotels_data: list[HotelSummary],
+    ) -> list[HotelSummary]:
         """Add extra hotel data as per search settings.
 
         Args:
             user_id (int): user identifier
             search_settings (dict): hotel search settings
-            hotels_data (list[dict]): hotels data
+            hotels_data (list[HotelSummary]): found hotels
 
         Returns:
-            dict: hotels data with extra data if found
+            list[HotelSummary]: found hotels with extra data if found
+
+        """
+        return list(
+            cls._iter_extra_hotels_data(user_id, search_settings, hotels_data)
+        )
+
+    @classmethod
+    def _iter_extra_hotels_data(
+        cls,
+        user_id: int,
+        search_settings: dict,
+        hotels_data: list[HotelSummary],
+    ) -> Iterator[HotelSummary]:
+        """Add extra hotel data and yield hotels in rank order.
+
+        Hotels details are requested concurrently. Details received out of
+        order wait in reorder buffer until details of all higher ranked
+        hotels are received. Hotels without details after _details_timeout
+        get default extra data.
+
+        Args:
+            user_id (int): user identifier
+            search_settings (dict): hotel search settings
+            hotels_data (list[HotelSummary]): found hotels in rank order
+
+        Yields:
+            HotelSummary: found hotel with extra data if found
 
         """
         bot_logger.debug(f"{search_settings=}, {hotels_data=}")
-        for index, i_hotel in enumerate(hotels_data):
-            extra_hotel_data = cls._get_hotel_details(i_hotel["property_id"])
-            file_name = cls._file_name.format(
-                user_id=user_id,
-                city_or_hotel=i_hotel["name"],
-                method=cls._add_extra_hotels_data.__name__,
-                datetime=datetime.now(),
+        executor = ThreadPoolExecutor(
+            max_workers=min(cls._details_max_workers, len(hotels_data)),
+            thread_name_prefix="hotel_details",
+        )
+        futures = [
+            executor.submit(cls._get_cached_hotel_details, user_id, i_hotel)
+            for i_hotel in hotels_data
+        ]
+        ranks = {i_future: i_rank for i_rank, i_future in enumerate(futures)}
+        reorder_buffer = set()
+        max_buffered = 0
+        next_rank = 0
+        try:
+            try:
+                for i_future in as_completed(
+                    futures, timeout=cls._details_timeout,
+                ):
+                    reorder_buffer.add(ranks[i_future])
+                    max_buffered = max(max_buffered, len(reorder_buffer))
+                    while next_rank in reorder_buffer:
+                        reorder_buffer.remove(next_rank)
+                        yield cls._add_hotel_extra_data(
+                            search_settings,
+                            hotels_data[next_rank],
+                            futures[next_rank],
+                        )
+                        next_rank += 1
+            except TimeoutError:
+                pass
+            for i_rank in range(next_rank, len(hotels_data)):
+                yield cls._add_hotel_extra_data(
+                    search_settings, hotels_data[i_rank], futures[i_rank],
+                )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            details_policy = cls._endpoint_policies[
+                cls._get_hotel_details_endpoint
+            ]
+            bot_logger.debug(
+                f"{max_buffered=}, {cls._hotel_details_cache.stats()=}, "
+                f"{cls._rate_limiter.stats()=}, {details_policy.stats()=}, "
+                f"{cls._retry_policy.stats()=}",
             )
-            cls._save_response(file_name, extra_hotel_data)
-            sorted_extra_hotel_data = cls._sort_extra_hotel_data(
+
+    @classmethod
+    def _add_hotel_extra_data(
+        cls,
+        search_settings: dict,
+        hotel_data: HotelSummary,
+        details_future: Future,
+    ) -> HotelSummary:
+        """Add extra hotel data from hotel details request to found hotel.
+
+        Args:
+            search_settings (dict): hotel search settings
+            hotel_data (HotelSummary): found hotel
+            details_future (Future): hotel details request
+
+        Returns:
+            HotelSummary: found hotel with extra data
+
+        """
+        hotel_data.add_details(
+            cls._get_extra_hotel_data(
+                search_settings, hotel_data, details_future,
+            )
+        )
+        return hotel_data
+
+    @classmethod
+    def _get_cached_hotel_details(
+        cls, user_id: int, hotel_data: HotelSummary,
+    ) -> dict:
+        """Get hotel details from cache or request and cache them.
+
+        Concurrent requests of the same hotel are coalesced into one
+        upstream request. Only responses with property info are cached.
+
+        Args:
+            user_id (int): user identifier
+            hotel_data (HotelSummary): found hotel
+
+        Returns:
+            dict: hotel details response
+
+        """
+        return cls._hotel_details_cache.get_or_load(
+            (hotel_data.property_id, cls._currency),
+            lambda: cls._request_hotel_details(user_id, hotel_data),
+            cls._get_hotel_details_ttl,
+        )
+
+    @classmethod
+    def _get_hotel_details_ttl(cls, hotel_details: dict) -> Optional[float]:
+        """Get hotel details cache ttl, None if details are not cacheable.
+
+        Args:
+            hotel_details (dict): hotel details response
+
+        Returns:
+            Optional[float]: cache ttl
+
+        """
+        try:
+            if hotel_details["data"]["propertyInfo"]:
+                return cls._hotel_details_cache.ttl
+        except (KeyError, TypeError):
+            pass
+        return None
+
+    @classmethod
+    def _request_hotel_details(
+        cls, user_id: int, hotel_data: HotelSummary,
+    ) -> Optional[dict]:
+        """Request hotel details, save response and parse required fields.
+
+        Args:
+            user_id (int): user identifier
+            hotel_data (HotelSummary): found hotel
+
+        Returns:
+            Optional[dict]: parsed hotel details, None if response is not
+                valid
+
+        """
+        response_content = cls._get_hotel_details(hotel_data.property_id)
+        cls._save_response(
+            user_id,
+            hotel_data.name,
+            cls._add_extra_hotels_data.__name__,
+            response_content,
+        )
+        return parse_hotel_details(response_content, cls._max_hotel_photos)
+
+    @classmethod
+    def _get_extra_hotel_data(
+        cls,
+        search_settings: dict,
+        hotel_data: HotelSummary,
+        details_future: Future,
+    ) -> dict:
+        """Get sorted extra hotel data from hotel details request.
+
+        If request is not completed in time, failed or response can not be
+        sorted, return default extra hotel data, so one hotel can not fail
+        the whole search.
+
+        Args:
+            search_settings (dict): hotel search settings
+            hotel_data (HotelSummary): found hotel
+            details_future (Future): hotel details request
+
+        Returns:
+            dict: sorted extra hotel data
+
+        """
+        if not details_future.done():
+            bot_logger.error(f"Timeout: {hotel_data.property_id=}")
+            return dict(cls._missing_extra_hotel_data)
+        try:
+            extra_hotel_data = details_future.result()
+        except cls._request_exceptions as exc:
+            bot_logger.error(f"{exc=}, {hotel_data.property_id=}")
+            return dict(cls._missing_extra_hotel_data)
+        return cls._process_extra_hotel_data(
+            search_settings, hotel_data, extra_hotel_data,
+        )
+
+    @classmethod
+    def _process_extra_hotel_data(
+        cls,
+        search_settings: dict,
+        hotel_data: HotelSummary,
+        extra_hotel_data: dict,
+    ) -> dict:
+        """Sort extra hotel data from hotel details response.
+
+        Args:
+            search_settings (dict): hotel search settings
+            hotel_data (HotelSummary): found hotel
+            extra_hotel_data (dict): hotel details response
+
+        Returns:
+            dict: sorted extra hotel data or default one if response can not
+                be sorted
+
+        """
+        try:
+            return cls._sort_extra_hotel_data(
                 extra_hotel_data,
                 search_settings["display_hotel_photos"],
                 search_settings["hotel_photo_amount"],
             )
-            hotels_data[index].update(sorted_extra_hotel_data)
-        bot_logger.debug(f"{hotels_data=}")
-        return hotels_data
+        except (KeyError, TypeError, ValueError) as exc:
+            bot_logger.error(f"{exc=}, {hotel_data.property_id=}")
+            return dict(cls._missing_extra_hotel_data)
 
     @classmethod
     def _sort_found_cities(cls, cities_data: list) -> list[Optional[dict]]:
@@ -363,161 +1599,167 @@ class HotelsApi:
             return []
 
     @classmethod
-    def _sort_main_hotel_details(cls, hotel_details: dict) -> dict:
+    def _sort_main_hotel_details(
+        cls, hotel_details: dict,
+    ) -> Optional[HotelSummary]:
         """Sort hotel details from hotels search in city.
 
+        Values are kept numeric, distance is converted to MILE.
+
         Args:
             hotel_details (dict): hotel details from hotels search in city
 
         Returns:
-            list[dict]: hotel details
+            Optional[HotelSummary]: found hotel, None if hotel details are
+                not valid
 
         """
         try:
-            distance = "{distance} {unit}".format(
-                distance=hotel_details["destinationInfo"]["distanceFromDestination"]["value"],
-                unit=hotel_details["destinationInfo"]["distanceFromDestination"]["unit"],
-            )
-            price_per_day = "{price} {currency}".format(
-                price=round(hotel_details["price"]["lead"]["amount"], 2),
-                currency=hotel_details["price"]["lead"]["currencyInfo"]["code"],
-            )
-            price_per_stay = hotel_details["price"]["displayMessages"][1]["lineItems"][0]["value"]
-            price_per_stay = price_per_stay.replace(
-                "total", "including all taxes",
+            price = hotel_details["price"]
+            destination = hotel_details["destinationInfo"]
+            distance = destination["distanceFromDestination"]
+            hotel_summary = HotelSummary(
+                property_id=hotel_details["id"],
+                name=hotel_details["name"],
+                price_per_night=float(price["lead"]["amount"]),
+                currency=price["lead"]["currencyInfo"]["code"],
+                distance=float(distance["value"]) * MILES_PER_UNIT[
+                    distance.get("unit") or HotelSummary.distance_unit
+                ],
+                total_price=cls._parse_total_price(
+                    price["displayMessages"][1]["lineItems"][0]["value"],
+                ),
             )
-            sorted_hotel_details = {
-                "name": hotel_details["name"],
-                "property_id": hotel_details["id"],
-                "distance": distance,
-                "price_per_day": price_per_day,
-                "price_per_stay": price_per_stay,
-            }
-            bot_logger.debug(f"{sorted_hotel_details=}")
-            return sorted_hotel_details
-        except (KeyError, TypeError, ValueError) as exc:
+            bot_logger.debug(f"{hotel_summary=}")
+            return hotel_summary
+        except (KeyError, TypeError, ValueError, IndexError) as exc:
             bot_logger.debug(f"{exc=}")
-            return {}
+            return None
+
+    @classmethod
+    def _parse_total_price(cls, price_per_stay: str) -> Optional[float]:
+        """Parse price per stay message, e.g. "$1,204 total".
+
+        Args:
+            price_per_stay (str): price per stay message
+
+        Returns:
+            Optional[float]: price per stay, None if message has no price
+
+        """
+        amount = cls._total_price_pattern.search(price_per_stay)
+        if amount is None:
+            return None
+        return float(amount.group().replace(",", ""))
+
+    @classmethod
+    def _create_hotel_summaries(
+        cls, hotels_details: list[dict],
+    ) -> list[HotelSummary]:
+        """Create found hotels records, invalid hotels details are skipped.
+
+        Args:
+            hotels_details (list[dict]): hotels details from hotels search
+
+        Returns:
+            list[HotelSummary]: found hotels in the same order
+
+        """
+        hotel_summaries = []
+        for i_hotel in hotels_details:
+            hotel_summary = cls._sort_main_hotel_details(i_hotel)
+            if hotel_summary is not None:
+                hotel_summaries.append(hotel_summary)
+        return hotel_summaries
 
     @classmethod
     def _sort_hotels_for_low_price_cmd(
             cls, hotels_details: list[dict],
-    ) -> list[dict]:
+    ) -> list[HotelSummary]:
         """Sort found hotels in city as per low price command shortcut.
 
         Args:
             hotels_details (list[dict]): main hotels details
 
         Returns:
-            list[dict]: sorted hotels details
+            list[HotelSummary]: sorted hotels
 
         """
-        sorted_hotels = []
-        for i_hotel in hotels_details:
-            sorted_hotels.append(cls._sort_main_hotel_details(i_hotel))
+        sorted_hotels = cls._create_hotel_summaries(hotels_details)
         bot_logger.debug(f"{sorted_hotels=}")
         return sorted_hotels
 
     @classmethod
     def _sort_hotels_for_high_price_cmd(
         cls, hotels_details: list[dict], required_hotels: int,
-    ) -> list[dict]:
+    ) -> list[HotelSummary]:
         """Sort found hotels in city as per high price command shortcut.
 
-        Hotels details are sorted as per price ASC.
+        Hotels details can be in any order, the most expensive ones are
+        selected as per price DESC.
 
         Args:
             hotels_details (list[dict]): main hotels details
             required_hotels (int): required hotels amount
 
         Returns:
-            list[dict]: sorted hotels details
+            list[HotelSummary]: sorted hotels
 
         """
-        sorted_hotels = []
-        start_index = len(hotels_details) - 1
-        stop_index = start_index - required_hotels
-        step_range = -1
-        for index in range(start_index, stop_index, step_range):
-            sorted_hotels.append(
-                cls._sort_main_hotel_details(hotels_details[index])
-            )
+        selector = TopPriceSelector(required_hotels)
+        selector.add_page(hotels_details)
+        sorted_hotels = cls._create_hotel_summaries(selector.result())
         bot_logger.debug(f"{sorted_hotels=}")
         return sorted_hotels
 
-    @classmethod
-    def _is_hotel_as_per_search_settings(
-            cls, hotel_details: dict, user_data: dict
-    ) -> bool:
-        """Check that main hotel data as per user search settings.
-
-        Args:
-            hotel_details (dict): main hotels details
-            user_data (dict): user search settings
-
-        Returns:
-            bool: True if hotel is per search settings, False otherwise
-
-        """
-        try:
-            user_min_price = user_data["min_price"]
-            user_max_price = user_data["max_price"]
-            user_min_distance = user_data["min_distance"]
-            user_max_distance = user_data["max_distance"]
-            price_per_day = hotel_details["price"]["lead"]["amount"]
-            distance = hotel_details["destinationInfo"]["distanceFromDestination"]["value"]
-            if (
-                    user_min_price <= price_per_day <= user_max_price
-                    and user_min_distance <= distance <= user_max_distance
-            ):
-                matching = True
-            else:
-                matching = False
-            bot_logger.debug(f"{hotel_details['name']=}, {matching=}")
-            return matching
-        except (KeyError, TypeError, ValueError) as exc:
-            bot_logger.debug(f"{exc=}")
-
     @classmethod
     def _sort_hotels_for_best_deal_cmd(
-        cls, hotels_details: list[dict], user_data: dict,
-    ) -> list[dict]:
+        cls, hotels_details: list[dict], user_data: dict, required_hotels: int,
+    ) -> list[HotelSummary]:
         """Sort found hotels in city as per best deal command shortcut.
 
         Require additional check as HotelAPI provides all hotels in city if
-        there is no hotel as per price range.
+        there is no hotel as per price range. All found hotels are filtered
+        by price and distance ranges and ranked by best deal score. Found
+        hotels are bounded by pages looked through, so best deal is best
+        among first found hotels in API sort order.
 
         Args:
             hotels_details (list[dict]): main hotels details
             user_data (dict): user search settings
+            required_hotels (int): required hotels amount
 
         Returns:
-            list[dict]: sorted hotels details
+            list[HotelSummary]: sorted hotels
 
         """
-        sorted_hotels = []
-        for i_hotel in hotels_details:
-            if cls._is_hotel_as_per_search_settings:
-                sorted_hotels.append(cls._sort_main_hotel_details(i_hotel))
+        sorted_hotels = cls._create_hotel_summaries(
+            rank_best_deals(
+                hotels_details,
+                user_data,
+                required_hotels,
+                cls._best_deal_score_weights,
+            )
+        )
         bot_logger.debug(f"{user_data=}, {sorted_hotels=}")
         return sorted_hotels
 
     @classmethod
     def _sort_hotels_in_city(
-        cls, hotels_data: dict, user_data: dict,
-    ) -> list[Optional[dict]]:
+        cls, hotels_details: list[dict], user_data: dict,
+    ) -> list[HotelSummary]:
         """Sort found hotels in city as per hotel search bot command shortcut.
 
         Args:
-            hotels_data (dict): found hotels data from hotels search in city
+            hotels_details (list[dict]): found hotels (properties) from
+                hotels search in city
             user_data (dict): user search settings
 
         Returns:
-            list[Optional[dict]]: sorted hotels details
+            list[HotelSummary]: sorted hotels
 
         """
         try:
-            hotels_details = hotels_data["propertySearch"]["properties"]
             hotels_amount = min(
                 user_data["hotels_amount"], len(hotels_details),
             )
@@ -532,7 +1774,7 @@ class HotelsApi:
                     )
                 else:
                     sorted_hotels = cls._sort_hotels_for_best_deal_cmd(
-                        hotels_details[:hotels_amount], user_data,
+                        hotels_details, user_data, hotels_amount,
                     )
                 bot_logger.debug(f"{sorted_hotels=}")
                 return sorted_hotels
@@ -0,0 +1,332 @@
+"""Module with process-wide rate limiter for Hotels API requests."""
+
+from asyncio import sleep as async_sleep
+from itertools import count
+from threading import Condition
+from time import monotonic
+from typing import Mapping, Optional
+
+from project_logging.bot_logger import bot_logger
+
+
+class RateLimitError(Exception):
+    """Request is not allowed by rate limit or remaining quota."""
+
+
+class TokenBucket:
+    """
+    Class TokenBucket.
+    Token bucket refilled with constant rate up to its capacity.
+
+    Attributes:
+        rate (float): tokens added per second
+        capacity (float): max number of tokens
+        tokens (float): current number of tokens
+
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Init full bucket.
+
+        Args:
+            rate (float): tokens added per second
+            capacity (float): max number of tokens
+
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated_at = monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add tokens for time passed since last refill.
+
+        Args:
+            now (float): current monotonic time
+
+        """
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated_at) * self.rate,
+        )
+        self._updated_at = now
+
+    def get_delay(self) -> float:
+        """Get time until one token is available.
+
+        Returns:
+            float: delay in seconds, 0 if token is available
+
+        """
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Class RateLimiter.
+    Thread-safe rate limiter with shared and per-endpoint token buckets.
+
+    Request takes one token from shared bucket (plan limit) and one from
+    its endpoint bucket. Waiting requests are served by priority lanes
+    (lower number first), then in arrival order. Remaining monthly quota is
+    read from response headers, when it is low only requests of the first
+    lane are allowed.
+
+    Attributes:
+        max_wait (float): max time to wait for tokens in seconds
+        quota_reserve (int): remaining quota kept for the first lane
+        quota_remaining (Optional[int]): remaining quota from last response
+        rejected (int): number of requests rejected by quota or timeout
+
+    """
+
+    _remaining_header = "X-RateLimit-Requests-Remaining"
+    _reset_header = "X-RateLimit-Requests-Reset"
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        endpoint_limits: dict[str, tuple[float, float]],
+        max_wait: float = 10.0,
+        quota_reserve: int = 0,
+    ) -> None:
+        """Init rate limiter.
+
+        Args:
+            rate (float): shared requests per second
+            capacity (float): shared max burst of requests
+            endpoint_limits (dict[str, tuple[float, float]]): (rate,
+                capacity) per endpoint
+            max_wait (float): max time to wait for tokens in seconds
+            quota_reserve (int): remaining quota kept for the first lane
+
+        """
+        self.max_wait = max_wait
+        self.quota_reserve = quota_reserve
+        self.quota_remaining: Optional[int] = None
+        self.rejected = 0
+        self._shared_bucket = TokenBucket(rate, capacity)
+        self._endpoint_buckets = {
+            i_endpoint: TokenBucket(*i_limits)
+            for i_endpoint, i_limits in endpoint_limits.items()
+        }
+        self._quota_reset_at: Optional[float] = None
+        self._condition = Condition()
+        self._order = count()
+        self._waiters: set[tuple] = set()
+        self._wait_stats = {
+            i_endpoint: {
+                "requests": 0, "throttled": 0, "wait": 0.0, "max_wait": 0.0,
+            }
+            for i_endpoint in endpoint_limits
+        }
+
+    def acquire(self, endpoint: str, priority: int = 0) -> float:
+        """Wait for request tokens of endpoint.
+
+        Args:
+            endpoint (str): Hotels API endpoint
+            priority (int): priority lane, lower number is served first
+
+        Raises:
+            RateLimitError: if quota is exhausted or wait is too long
+
+        Returns:
+            float: waiting time in seconds
+
+        """
+        started_at = monotonic()
+        with self._condition:
+            ticket = self._register(endpoint, priority)
+            try:
+                while True:
+                    delay = self._try_take(ticket, started_at)
+                    if not delay:
+                        return self._record_wait(endpoint, started_at)
+                    self._condition.wait(delay)
+            finally:
+                self._waiters.discard(ticket)
+                self._condition.notify_all()
+
+    async def acquire_async(self, endpoint: str, priority: int = 0) -> float:
+        """Wait for request tokens of endpoint without blocking event loop.
+
+        Args:
+            endpoint (str): Hotels API endpoint
+            priority (int): priority lane, lower number is served first
+
+        Raises:
+            RateLimitError: if quota is exhausted or wait is too long
+
+        Returns:
+            float: waiting time in seconds
+
+        """
+        started_at = monotonic()
+        with self._condition:
+            ticket = self._register(endpoint, priority)
+        try:
+            while True:
+                with self._condition:
+                    delay = self._try_take(ticket, started_at)
+                    if not delay:
+                        return self._record_wait(endpoint, started_at)
+                await async_sleep(delay)
+        finally:
+            with self._condition:
+                self._waiters.discard(ticket)
+                self._condition.notify_all()
+
+    def update_quota(self, headers: Mapping) -> None:
+        """Update remaining quota from response headers.
+
+        Args:
+            headers (Mapping): response headers (case-insensitive)
+
+        """
+        remaining = headers.get(self._remaining_header)
+        if remaining is None:
+            return
+        reset = headers.get(self._reset_header)
+        try:
+            quota_remaining = int(remaining)
+            quota_reset_at = (
+                monotonic() + float(reset) if reset is not None else None
+            )
+        except ValueError as exc:
+            bot_logger.error(f"{exc=}, {remaining=}, {reset=}")
+            return
+        with self._condition:
+            self.quota_remaining = quota_remaining
+            self._quota_reset_at = quota_reset_at
+        if quota_remaining <= self.quota_reserve:
+            bot_logger.warning(f"{quota_remaining=}, {reset=}")
+
+    def stats(self) -> dict:
+        """Get rate limiter statistics.
+
+        Returns:
+            dict: requests, throttled requests and waiting time per
+                endpoint, remaining quota and rejected requests
+
+        """
+        with self._condition:
+            return {
+                "endpoints": {
+                    i_endpoint: dict(i_stats)
+                    for i_endpoint, i_stats in self._wait_stats.items()
+                },
+                "waiting": len(self._waiters),
+                "quota_remaining": self.quota_remaining,
+                "rejected": self.rejected,
+            }
+
+    def _register(self, endpoint: str, priority: int) -> tuple:
+        """Add waiting request. Must be called under self._condition.
+
+        Args:
+            endpoint (str): Hotels API endpoint
+            priority (int): priority lane
+
+        Raises:
+            RateLimitError: if quota is exhausted for priority lane
+
+        Returns:
+            tuple: waiting request ticket
+
+        """
+        if not self._is_quota_available(priority):
+            self.rejected += 1
+            raise RateLimitError(
+                f"Quota is exhausted: {self.quota_remaining=}, {priority=}"
+            )
+        ticket = (priority, next(self._order), endpoint)
+        self._waiters.add(ticket)
+        return ticket
+
+    def _try_take(self, ticket: tuple, started_at: float) -> float:
+        """Take tokens if request is first one in line among ready ones.
+
+        Must be called under self._condition.
+
+        Args:
+            ticket (tuple): waiting request ticket
+            started_at (float): monotonic time request started waiting
+
+        Raises:
+            RateLimitError: if request waits longer than max_wait
+
+        Returns:
+            float: 0 if tokens are taken, otherwise time to wait
+
+        """
+        now = monotonic()
+        self._shared_bucket.refill(now)
+        for i_bucket in self._endpoint_buckets.values():
+            i_bucket.refill(now)
+        endpoint_bucket = self._endpoint_buckets[ticket[2]]
+        delay = max(
+            self._shared_bucket.get_delay(), endpoint_bucket.get_delay(),
+        )
+        if not delay:
+            first_ready = min(
+                i_ticket for i_ticket in self._waiters
+                if not self._endpoint_buckets[i_ticket[2]].get_delay()
+            )
+            if first_ready == ticket:
+                self._shared_bucket.tokens -= 1
+                endpoint_bucket.tokens -= 1
+                return 0.0
+            delay = 1 / self._shared_bucket.rate
+        if now + delay - started_at > self.max_wait:
+            self.rejected += 1
+            raise RateLimitError(f"Rate limit wait timeout: {ticket=}")
+        return delay
+
+    def _is_quota_available(self, priority: int) -> bool:
+        """Check remaining quota for priority lane.
+
+        Must be called under self._condition.
+
+        Args:
+            priority (int): priority lane
+
+        Returns:
+            bool: True if request is allowed by remaining quota
+
+        """
+        if self.quota_remaining is None:
+            return True
+        if (
+            self._quota_reset_at is not None
+            and monotonic() >= self._quota_reset_at
+        ):
+            self.quota_remaining = None
+            return True
+        if self.quota_remaining <= 0:
+            return False
+        return priority == 0 or self.quota_remaining > self.quota_reserve
+
+    def _record_wait(self, endpoint: str, started_at: float) -> float:
+        """Add request waiting time to statistics.
+
+        Must be called under self._condition.
+
+        Args:
+            endpoint (str): Hotels API endpoint
+            started_at (float): monotonic time request started waiting
+
+        Returns:
+            float: waiting time in seconds
+
+        """
+        waited = monotonic() - started_at
+        endpoint_stats = self._wait_stats[endpoint]
+        endpoint_stats["requests"] += 1
+        endpoint_stats["wait"] += waited
+        endpoint_stats["max_wait"] = max(endpoint_stats["max_wait"], waited)
+        if waited > 0.001:
+            endpoint_stats["throttled"] += 1
+        return waited
@@ -0,0 +1,559 @@
+"""Module for background archiving of Hotels API responses.
+
+Responses are appended to rolling segment files (one json line per
+response, each line compressed separately) and indexed in small SQLite
+database with segment offsets, so any response can be read without
+scanning segments.
+"""
+
+import gzip
+import sqlite3
+import zlib
+from atexit import register
+from contextlib import closing
+from datetime import datetime, timedelta
+from json import dumps, loads
+from os import listdir, makedirs, path, remove
+from queue import Empty, Full, Queue
+from re import compile as re_compile
+from sys import argv
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, Optional
+
+from project_logging.bot_logger import bot_logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class SegmentedArchive:
+    """
+    Class SegmentedArchive.
+    Append-only archive of Hotels API responses in rolling segment files
+    with SQLite index.
+
+    Every response is one compact json line compressed as separate gzip
+    member or zstd frame, so it can be read by its offset and length from
+    index. Segments are rolled per hour or day and deleted as per age and
+    total size retention.
+
+    Attributes:
+        files_dir (str): archive root dir
+        segments_dir (str): dir path for segment files
+        index_path (str): path of SQLite index
+        compression (str): "none", "gzip" or "zstd"
+        segment_period (str): "hour" or "day"
+        max_age_days (int): max age of segment
+        max_total_bytes (int): max total size of all segments
+        retention_interval (int): min time between retention checks
+
+    """
+
+    _segment_name_formats = {"hour": "%Y%m%d-%H", "day": "%Y%m%d"}
+    _compression_extensions = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+    _legacy_file_name = re_compile(
+        r"^(?P<user_id>\d+)_(?P<subject>.*)_"
+        r"(?P<method>find_city|find_hotels_in_city|_add_extra_hotels_data)_"
+        r"(?P<created_at>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?)"
+        r"\.json(\.gz|\.zst)?$"
+    )
+
+    def __init__(
+        self,
+        files_dir: str,
+        compression: str = "gzip",
+        segment_period: str = "hour",
+        max_age_days: int = 90,
+        max_total_bytes: int = 5 * 1024 * 1024 * 1024,
+        retention_interval: int = 10 * 60,
+    ) -> None:
+        """Init archive.
+
+        Args:
+            files_dir (str): archive root dir
+            compression (str): "none", "gzip" or "zstd"
+            segment_period (str): "hour" or "day"
+            max_age_days (int): max age of segment
+            max_total_bytes (int): max total size of all segments
+            retention_interval (int): min time between retention checks
+
+        """
+        if compression == "zstd" and zstandard is None:
+            bot_logger.warning("zstandard is not installed, gzip is used")
+            compression = "gzip"
+        self.files_dir = files_dir
+        self.segments_dir = path.join(files_dir, "segments")
+        self.index_path = path.join(files_dir, "archive_index.db")
+        self.compression = compression
+        self.segment_period = segment_period
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.retention_interval = retention_interval
+        self._write_lock = Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._last_retention_check = monotonic()
+
+    def write(
+        self,
+        user_id: int,
+        method: str,
+        subject: str,
+        data: Any,
+        created_at: Optional[datetime] = None,
+    ) -> int:
+        """Append response to segment and add it to index.
+
+        Args:
+            user_id (int): user identifier
+            method (str): HotelsApi method name
+            subject (str): searched city or hotel name
+            data (Any): response data or raw json content in bytes, which
+                is written as is without decoding
+            created_at (Optional[datetime]): response time, default now
+
+        Returns:
+            int: record id in index
+
+        """
+        created_at = created_at or datetime.now()
+        raw_data = None
+        if isinstance(data, bytes):
+            raw_data = data.strip()
+            if raw_data.startswith((b"{", b"[")):
+                data = None
+            else:
+                data = data.decode("utf-8", errors="replace")
+                raw_data = None
+        record = {
+            "user_id": user_id,
+            "method": method,
+            "subject": subject,
+            "created_at": created_at.isoformat(sep=" "),
+            "data": data,
+        }
+        line = dumps(
+            record, ensure_ascii=False, separators=(",", ":"),
+        ).encode("utf-8")
+        if raw_data is not None:
+            # Raw newlines are json whitespace, strings have them escaped
+            line = b"".join((
+                line[:-len(b"null}")],
+                raw_data.replace(b"\r", b"").replace(b"\n", b" "),
+                b"}",
+            ))
+        content = self._compress(line + b"\n")
+        segment_name_format = self._segment_name_formats[self.segment_period]
+        segment = (
+            created_at.strftime(segment_name_format)
+            + ".jsonl" + self._compression_extensions[self.compression]
+        )
+        with self._write_lock:
+            makedirs(self.segments_dir, exist_ok=True)
+            with open(path.join(self.segments_dir, segment), "ab") as file:
+                offset = file.tell()
+                file.write(content)
+            connection = self._get_connection()
+            with connection:
+                record_id = connection.execute(
+                    "INSERT INTO records (user_id, method, subject, "
+                    "created_at, segment, offset, length) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        user_id,
+                        method,
+                        subject,
+                        record["created_at"],
+                        segment,
+                        offset,
+                        len(content),
+                    ),
+                ).lastrowid
+            if monotonic() - self._last_retention_check > (
+                self.retention_interval
+            ):
+                self._apply_retention()
+        bot_logger.debug(f"{segment=}, {offset=}, {len(content)=}")
+        return record_id
+
+    def read(self, record_id: int) -> Optional[dict]:
+        """Read archived response record by id.
+
+        Args:
+            record_id (int): record id in index
+
+        Returns:
+            Optional[dict]: record with user_id, method, subject, created_at
+                and response data, None if record is not found
+
+        """
+        with closing(self._open_reader()) as connection:
+            row = connection.execute(
+                "SELECT segment, offset, length FROM records WHERE id = ?",
+                (record_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        segment, offset, length = row
+        with open(path.join(self.segments_dir, segment), "rb") as file:
+            file.seek(offset)
+            content = file.read(length)
+        return loads(self._decompress(content, segment))
+
+    def find(
+        self,
+        user_id: Optional[int] = None,
+        method: Optional[str] = None,
+        subject: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Find archived responses in index, newest first.
+
+        Args:
+            user_id (Optional[int]): user identifier
+            method (Optional[str]): HotelsApi method name
+            subject (Optional[str]): searched city or hotel name
+            since (Optional[datetime]): min response time
+            until (Optional[datetime]): max response time
+            limit (int): max number of records
+
+        Returns:
+            list[dict]: index records
+
+        """
+        conditions = []
+        params = []
+        for i_column, i_operator, i_value in (
+            ("user_id", "=", user_id),
+            ("method", "=", method),
+            ("subject", "=", subject),
+            ("created_at", ">=", since and since.isoformat(sep=" ")),
+            ("created_at", "<=", until and until.isoformat(sep=" ")),
+        ):
+            if i_value is not None:
+                conditions.append(f"{i_column} {i_operator} ?")
+                params.append(i_value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with closing(self._open_reader()) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                f"SELECT * FROM records {where} "
+                f"ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [dict(i_row) for i_row in rows]
+
+    def import_legacy_files(self, remove_files: bool = False) -> int:
+        """Convert legacy per-response json files in files_dir to segments.
+
+        Legacy file name format is
+        "{user_id}_{city_or_hotel}_{method}_{datetime}.json". Files with
+        other names are imported with method "unknown" and file change time.
+
+        Args:
+            remove_files (bool): delete legacy file after import
+
+        Returns:
+            int: number of imported files
+
+        """
+        imported = 0
+        for i_file_name in sorted(listdir(self.files_dir)):
+            file_path = path.join(self.files_dir, i_file_name)
+            if not path.isfile(file_path) or ".json" not in i_file_name:
+                continue
+            try:
+                with open(file_path, "rb") as file:
+                    data = loads(self._decompress(file.read(), i_file_name))
+            except (OSError, ValueError, zlib.error) as exc:
+                bot_logger.error(f"{exc=}, {i_file_name=}")
+                continue
+            user_id, method, subject, created_at = (
+                self._parse_legacy_file_name(file_path)
+            )
+            self.write(user_id, method, subject, data, created_at)
+            if remove_files:
+                remove(file_path)
+            imported += 1
+        bot_logger.info(f"{self.files_dir=}, {imported=}")
+        return imported
+
+    def _parse_legacy_file_name(self, file_path: str) -> tuple:
+        """Get user id, method, subject and creation time from legacy file.
+
+        Args:
+            file_path (str): legacy file path
+
+        Returns:
+            tuple: user_id, method, subject and created_at
+
+        """
+        file_name = path.basename(file_path)
+        matched = self._legacy_file_name.match(file_name)
+        if matched:
+            return (
+                int(matched["user_id"]),
+                matched["method"],
+                matched["subject"],
+                datetime.fromisoformat(matched["created_at"]),
+            )
+        user_id, _, subject = file_name.split(".json")[0].partition("_")
+        return (
+            int(user_id) if user_id.isdigit() else 0,
+            "unknown",
+            subject,
+            datetime.fromtimestamp(path.getmtime(file_path)),
+        )
+
+    def _apply_retention(self) -> None:
+        """Delete oldest segments as per age and total size limits.
+
+        Segment being written now is never deleted. Must be called under
+        self._write_lock.
+
+        """
+        self._last_retention_check = monotonic()
+        current_segment_prefix = datetime.now().strftime(
+            self._segment_name_formats[self.segment_period],
+        )
+        min_mtime = (
+            datetime.now() - timedelta(days=self.max_age_days)
+        ).timestamp()
+        segments = sorted(listdir(self.segments_dir))
+        segment_sizes = {
+            i_segment: path.getsize(path.join(self.segments_dir, i_segment))
+            for i_segment in segments
+        }
+        total_bytes = sum(segment_sizes.values())
+        connection = self._get_connection()
+        for i_segment in segments:
+            if i_segment.startswith(current_segment_prefix):
+                continue
+            segment_path = path.join(self.segments_dir, i_segment)
+            if (
+                total_bytes <= self.max_total_bytes
+                and path.getmtime(segment_path) >= min_mtime
+            ):
+                break
+            with connection:
+                connection.execute(
+                    "DELETE FROM records WHERE segment = ?", (i_segment,),
+                )
+            remove(segment_path)
+            total_bytes -= segment_sizes[i_segment]
+            bot_logger.info(f"{i_segment=} is deleted, {total_bytes=}")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get index connection of writer, create index if required.
+
+        Returns:
+            sqlite3.Connection: index connection
+
+        """
+        if self._connection is None:
+            makedirs(self.files_dir, exist_ok=True)
+            connection = sqlite3.connect(
+                self.index_path, check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "user_id INTEGER NOT NULL, "
+                "method TEXT NOT NULL, "
+                "subject TEXT NOT NULL, "
+                "created_at TEXT NOT NULL, "
+                "segment TEXT NOT NULL, "
+                "offset INTEGER NOT NULL, "
+                "length INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS records_user_id_created_at "
+                "ON records (user_id, created_at)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS records_method_subject_created_at "
+                "ON records (method, subject, created_at)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS records_created_at "
+                "ON records (created_at)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS records_segment "
+                "ON records (segment)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open new read connection to index.
+
+        Returns:
+            sqlite3.Connection: index connection
+
+        """
+        with self._write_lock:
+            self._get_connection()
+        return sqlite3.connect(self.index_path)
+
+    def _compress(self, content: bytes) -> bytes:
+        """Compress record as separate gzip member or zstd frame.
+
+        Args:
+            content (bytes): record content
+
+        Returns:
+            bytes: compressed content
+
+        """
+        if self.compression == "gzip":
+            return gzip.compress(content, compresslevel=6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(content)
+        return content
+
+    @staticmethod
+    def _decompress(content: bytes, file_name: str) -> bytes:
+        """Decompress content as per file extension.
+
+        Args:
+            content (bytes): file content
+            file_name (str): file name
+
+        Returns:
+            bytes: decompressed content
+
+        """
+        if file_name.endswith(".gz"):
+            return gzip.decompress(content)
+        if file_name.endswith(".zst"):
+            if zstandard is None:
+                raise ValueError("zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(content)
+        return content
+
+
+class ResponseArchiver:
+    """
+    Class ResponseArchiver.
+    Background writer of Hotels API responses to SegmentedArchive.
+
+    Responses are put into bounded queue and written by single daemon
+    thread, so archiving does not add latency to user search. If queue is
+    full, response is dropped or caller waits for free place as per
+    block_when_full.
+
+    Attributes:
+        archive (SegmentedArchive): responses archive
+        block_when_full (bool): wait for free place if queue is full,
+            otherwise drop response
+        put_timeout (float): max waiting time for free place in queue
+        dropped (int): number of dropped responses
+
+    """
+
+    def __init__(
+        self,
+        archive: SegmentedArchive,
+        queue_size: int = 256,
+        block_when_full: bool = False,
+        put_timeout: float = 1.0,
+    ) -> None:
+        """Init archiver.
+
+        Args:
+            archive (SegmentedArchive): responses archive
+            queue_size (int): max number of responses waiting for writing
+            block_when_full (bool): wait for free place if queue is full
+            put_timeout (float): max waiting time for free place in queue
+
+        """
+        self.archive = archive
+        self.block_when_full = block_when_full
+        self.put_timeout = put_timeout
+        self.dropped = 0
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._thread: Optional[Thread] = None
+        self._thread_lock = Lock()
+
+    def save(
+        self, user_id: int, method: str, subject: str, data: Any,
+    ) -> bool:
+        """Put response into archive queue.
+
+        Args:
+            user_id (int): user identifier
+            method (str): HotelsApi method name
+            subject (str): searched city or hotel name
+            data (Any): response data
+
+        Returns:
+            bool: True if response is queued, False if it is dropped
+
+        """
+        self._start()
+        try:
+            self._queue.put(
+                (user_id, method, subject, data, datetime.now()),
+                block=self.block_when_full,
+                timeout=self.put_timeout if self.block_when_full else None,
+            )
+            return True
+        except Full:
+            self.dropped += 1
+            bot_logger.warning(f"{method=}, {subject=}, {self.dropped=}")
+            return False
+
+    def flush(self) -> None:
+        """Wait until all queued responses are written."""
+
+        if self._thread is not None:
+            self._queue.join()
+
+    def _start(self) -> None:
+        """Start writer thread if it is not started."""
+
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = Thread(
+                        target=self._run,
+                        name="response_archiver",
+                        daemon=True,
+                    )
+                    self._thread.start()
+                    register(self.flush)
+
+    def _run(self) -> None:
+        """Write queued responses until process exit."""
+
+        while True:
+            try:
+                user_id, method, subject, data, created_at = self._queue.get(
+                    timeout=1,
+                )
+            except Empty:
+                continue
+            try:
+                self.archive.write(user_id, method, subject, data, created_at)
+            except (OSError, TypeError, ValueError, sqlite3.Error) as exc:
+                bot_logger.error(f"{exc=}, {method=}, {subject=}")
+            finally:
+                self._queue.task_done()
+
+
+if __name__ == "__main__":
+    """Convert legacy response files: python -m ... [files_dir] [--remove]"""
+    legacy_files_dir = path.join(
+        path.abspath(path.dirname(__file__)), "hotels_response_files",
+    )
+    cli_args = [i_arg for i_arg in argv[1:] if i_arg != "--remove"]
+    SegmentedArchive(
+        cli_args[0] if cli_args else legacy_files_dir,
+    ).import_legacy_files(remove_files="--remove" in argv)
@@ -0,0 +1,292 @@
+"""Module with in-process cache for Hotels API responses."""
+
+from asyncio import CancelledError as AsyncCancelledError, shield, wrap_future
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+from json import dumps
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from project_logging.bot_logger import bot_logger
+
+
+class ResponseCache:
+    """
+    Class ResponseCache.
+    Thread-safe LRU cache with TTL expiry for Hotels API responses.
+
+    Cache is bounded by number of entries and by approximate size of values
+    in bytes. Concurrent loads of the same missing key are coalesced, so
+    only one thread or coroutine sends upstream request and the others wait
+    for its result. If coroutine load is cancelled, waiters load again.
+
+    Attributes:
+        name (str): cache name for logs
+        ttl (float): default time to live of entry in seconds
+        max_entries (int): max number of entries
+        max_bytes (int): max approximate size of all values in bytes
+        hits (int): number of found entries
+        misses (int): number of missed entries
+        coalesced (int): number of loads joined to in-flight load
+
+    """
+
+    def __init__(
+        self, name: str, ttl: float, max_entries: int, max_bytes: int,
+    ) -> None:
+        """Init cache.
+
+        Args:
+            name (str): cache name for logs
+            ttl (float): default time to live of entry in seconds
+            max_entries (int): max number of entries
+            max_bytes (int): max approximate size of all values in bytes
+
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._in_flight: dict[Hashable, Future] = {}
+        self._total_bytes = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get value by key if it is cached and not expired.
+
+        Args:
+            key (Hashable): cache key
+
+        Returns:
+            Optional[Any]: cached value or None
+
+        """
+        with self._lock:
+            value = self._get_entry(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None,
+    ) -> None:
+        """Save value in cache and evict least recently used entries.
+
+        Args:
+            key (Hashable): cache key
+            value (Any): value to cache
+            ttl (Optional[float]): time to live in seconds, default self.ttl
+
+        """
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            bot_logger.debug(f"{self.name=}, {key=}, {size=} is too big")
+            return
+        expires_at = monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._pop_entry(key)
+            self._entries[key] = (value, expires_at, size)
+            self._total_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._total_bytes > self.max_bytes
+            ):
+                self._pop_entry(next(iter(self._entries)))
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        get_ttl: Optional[Callable[[Any], Optional[float]]] = None,
+    ) -> Any:
+        """Get cached value or load it once for all concurrent callers.
+
+        Args:
+            key (Hashable): cache key
+            loader (Callable[[], Any]): function to load missing value
+            get_ttl (Optional[Callable[[Any], Optional[float]]]): function
+                to get ttl for loaded value, value is not cached if it
+                returns None. Default ttl is self.ttl
+
+        Returns:
+            Any: cached or loaded value
+
+        """
+        while True:
+            value, in_flight, is_loader = self._join_load(key)
+            if in_flight is None:
+                return value
+            if is_loader:
+                break
+            try:
+                return in_flight.result()
+            except CancelledError:
+                if not in_flight.cancelled():
+                    raise
+        try:
+            value = loader()
+            ttl = get_ttl(value) if get_ttl else self.ttl
+            if ttl is not None:
+                self.set(key, value, ttl)
+            in_flight.set_result(value)
+            return value
+        except BaseException as exc:
+            in_flight.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def get_or_load_async(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        get_ttl: Optional[Callable[[Any], Optional[float]]] = None,
+    ) -> Any:
+        """Get cached value or load it by coroutine once for all callers.
+
+        Loads are coalesced with get_or_load of other threads too.
+
+        Args:
+            key (Hashable): cache key
+            loader (Callable[[], Awaitable[Any]]): coroutine function to
+                load missing value
+            get_ttl (Optional[Callable[[Any], Optional[float]]]): function
+                to get ttl for loaded value, value is not cached if it
+                returns None. Default ttl is self.ttl
+
+        Returns:
+            Any: cached or loaded value
+
+        """
+        while True:
+            value, in_flight, is_loader = self._join_load(key)
+            if in_flight is None:
+                return value
+            if is_loader:
+                break
+            try:
+                return await shield(wrap_future(in_flight))
+            except AsyncCancelledError:
+                if not in_flight.cancelled():
+                    raise
+        try:
+            value = await loader()
+            ttl = get_ttl(value) if get_ttl else self.ttl
+            if ttl is not None:
+                self.set(key, value, ttl)
+            in_flight.set_result(value)
+            return value
+        except AsyncCancelledError:
+            in_flight.cancel()
+            raise
+        except BaseException as exc:
+            in_flight.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _join_load(
+        self, key: Hashable,
+    ) -> tuple[Optional[Any], Optional[Future], bool]:
+        """Get cached value or in-flight load of missing value.
+
+        Args:
+            key (Hashable): cache key
+
+        Returns:
+            tuple[Optional[Any], Optional[Future], bool]: cached value,
+                in-flight load (None if value is cached) and True if caller
+                must load value itself
+
+        """
+        with self._lock:
+            value = self._get_entry(key)
+            if value is not None:
+                self.hits += 1
+                return value, None, False
+            self.misses += 1
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = self._in_flight[key] = Future()
+                return None, in_flight, True
+            self.coalesced += 1
+            return None, in_flight, False
+
+    def stats(self) -> dict:
+        """Get cache statistics.
+
+        Returns:
+            dict: cache statistics
+
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+    def clear(self) -> None:
+        """Delete all cache entries."""
+
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _get_entry(self, key: Hashable) -> Optional[Any]:
+        """Get not expired value and mark it as recently used.
+
+        Must be called under self._lock.
+
+        Args:
+            key (Hashable): cache key
+
+        Returns:
+            Optional[Any]: cached value or None
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= monotonic():
+            self._pop_entry(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _pop_entry(self, key: Hashable) -> None:
+        """Delete entry by key. Must be called under self._lock.
+
+        Args:
+            key (Hashable): cache key
+
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Estimate value size in bytes as size of its compact json.
+
+        Args:
+            value (Any): value to estimate
+
+        Returns:
+            int: approximate size in bytes
+
+        """
+        return len(dumps(value, separators=(",", ":"), default=str))
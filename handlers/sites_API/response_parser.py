@@ -0,0 +1,341 @@
+"""Module for parsing required fields from Hotels API responses.
+
+Hotels list and hotel details responses are hundreds of KB, but HotelsApi
+uses a dozen fields from them. Parsers return only these fields in the
+same nesting as in response, so sorting helpers work with them as with
+full response.
+
+If msgspec is installed, response content is decoded straight into typed
+structs and all other fields are skipped by decoder. Otherwise, content
+is decoded by json module and required fields are copied from full tree,
+which is dropped right after parsing.
+
+Run as script to compare msgspec and json parsers on recorded responses
+from hotels_response_files (.env is required as for the bot):
+    python -m handlers.sites_API.response_parser [repeats]
+"""
+
+from glob import glob
+from json import dumps, loads
+from os import path
+from sys import argv
+from time import perf_counter
+from typing import Any, Optional
+
+from project_logging.bot_logger import bot_logger
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if msgspec is not None:
+    # Leaf values are Any and lists may be null, so values of unexpected
+    # types are kept as json parser keeps them and hotel validation is left
+    # to HotelsApi.
+
+    class _Currency(msgspec.Struct):
+        code: Any = None
+
+    class _Money(msgspec.Struct):
+        amount: Any = None
+        currencyInfo: Optional[_Currency] = None
+
+    class _LineItem(msgspec.Struct):
+        value: Any = None
+
+    class _DisplayMessage(msgspec.Struct):
+        lineItems: Optional[list[_LineItem]] = []
+
+    class _Price(msgspec.Struct):
+        lead: Optional[_Money] = None
+        displayMessages: Optional[list[_DisplayMessage]] = []
+
+    class _Distance(msgspec.Struct):
+        value: Any = None
+        unit: Any = None
+
+    class _DestinationInfo(msgspec.Struct):
+        distanceFromDestination: Optional[_Distance] = None
+
+    class _Reviews(msgspec.Struct):
+        score: Any = None
+        total: Any = None
+
+    class _Property(msgspec.Struct):
+        id: Any = None
+        name: Any = None
+        price: Optional[_Price] = None
+        destinationInfo: Optional[_DestinationInfo] = None
+        reviews: Optional[_Reviews] = None
+
+    class _PropertySearch(msgspec.Struct):
+        properties: list[msgspec.Raw]
+
+    class _PropertiesData(msgspec.Struct):
+        propertySearch: _PropertySearch
+
+    class _PropertiesResponse(msgspec.Struct):
+        data: _PropertiesData
+
+    class _Image(msgspec.Struct):
+        url: Any = None
+
+    class _GalleryImage(msgspec.Struct):
+        image: Optional[_Image] = None
+
+    class _Gallery(msgspec.Struct):
+        images: Optional[list[_GalleryImage]] = []
+
+    class _Rating(msgspec.Struct):
+        rating: Any = None
+
+    class _Overview(msgspec.Struct):
+        propertyRating: Optional[_Rating] = None
+
+    class _Address(msgspec.Struct):
+        addressLine: Any = None
+
+    class _Location(msgspec.Struct):
+        address: Optional[_Address] = None
+
+    class _Summary(msgspec.Struct):
+        name: Any = None
+        overview: Optional[_Overview] = None
+        location: Optional[_Location] = None
+
+    class _PropertyInfo(msgspec.Struct):
+        summary: Optional[_Summary] = None
+        propertyGallery: Optional[_Gallery] = None
+
+    class _DetailsData(msgspec.Struct):
+        propertyInfo: Optional[_PropertyInfo] = None
+
+    class _DetailsResponse(msgspec.Struct):
+        data: Optional[_DetailsData] = None
+
+    _properties_decoder = msgspec.json.Decoder(_PropertiesResponse)
+    _property_decoder = msgspec.json.Decoder(_Property)
+    _details_decoder = msgspec.json.Decoder(_DetailsResponse)
+
+
+def parse_properties(content: bytes) -> Optional[list[dict]]:
+    """Parse found hotels (properties) from hotels search response.
+
+    Found hotels are parsed one by one, found hotel of unexpected structure
+    is skipped, so it does not fail the whole page.
+
+    Args:
+        content (bytes): response content
+
+    Returns:
+        Optional[list[dict]]: found hotels with required fields, None if
+            response is not valid
+
+    """
+    try:
+        if msgspec is not None:
+            response = _properties_decoder.decode(content)
+            properties = response.data.propertySearch.properties
+            project_property = _decode_property
+        else:
+            response = loads(content)
+            properties = list(response["data"]["propertySearch"]["properties"])
+            project_property = _project_property
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        bot_logger.error(f"{exc=}, {content[:200]=}")
+        return None
+    parsed_properties = []
+    for i_property in properties:
+        try:
+            parsed_properties.append(project_property(i_property))
+        except (ValueError, TypeError, AttributeError) as exc:
+            bot_logger.error(f"Found hotel is skipped: {exc=}")
+    return parsed_properties
+
+
+def parse_hotel_details(content: bytes, max_photos: int) -> Optional[dict]:
+    """Parse hotel details response.
+
+    Args:
+        content (bytes): response content
+        max_photos (int): max number of hotel photos to keep
+
+    Returns:
+        Optional[dict]: hotel details with required fields, None if response
+            is not valid
+
+    """
+    try:
+        if msgspec is not None:
+            details = msgspec.to_builtins(_details_decoder.decode(content))
+        else:
+            details = _project_hotel_details(loads(content))
+        gallery = details["data"]["propertyInfo"]["propertyGallery"]
+        if gallery:
+            gallery["images"] = (gallery["images"] or [])[:max_photos]
+        return details
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        bot_logger.error(f"{exc=}, {content[:200]=}")
+        return None
+
+
+def _decode_property(hotel_property: "msgspec.Raw") -> dict:
+    """Decode required fields of found hotel by msgspec.
+
+    Args:
+        hotel_property (msgspec.Raw): found hotel json from response
+
+    Raises:
+        msgspec.ValidationError: if found hotel has unexpected structure
+
+    Returns:
+        dict: found hotel with required fields
+
+    """
+    return msgspec.to_builtins(_property_decoder.decode(hotel_property))
+
+
+def _project_property(hotel_property: dict) -> dict:
+    """Copy required fields of found hotel.
+
+    Args:
+        hotel_property (dict): found hotel from response
+
+    Returns:
+        dict: found hotel with required fields
+
+    """
+    price = hotel_property.get("price") or {}
+    lead_price = price.get("lead") or {}
+    destination_info = hotel_property.get("destinationInfo") or {}
+    distance = destination_info.get("distanceFromDestination") or {}
+    reviews = hotel_property.get("reviews") or {}
+    return {
+        "id": hotel_property.get("id"),
+        "name": hotel_property.get("name"),
+        "price": {
+            "lead": {
+                "amount": lead_price.get("amount"),
+                "currencyInfo": {
+                    "code": (lead_price.get("currencyInfo") or {}).get("code"),
+                },
+            },
+            "displayMessages": [
+                {
+                    "lineItems": [
+                        {"value": i_line_item.get("value")}
+                        for i_line_item in i_message.get("lineItems") or []
+                    ],
+                }
+                for i_message in price.get("displayMessages") or []
+            ],
+        },
+        "destinationInfo": {
+            "distanceFromDestination": {
+                "value": distance.get("value"),
+                "unit": distance.get("unit"),
+            },
+        },
+        "reviews": {
+            "score": reviews.get("score"),
+            "total": reviews.get("total"),
+        },
+    }
+
+
+def _project_hotel_details(hotel_details: dict) -> dict:
+    """Copy required fields of hotel details.
+
+    Args:
+        hotel_details (dict): hotel details response
+
+    Returns:
+        dict: hotel details with required fields
+
+    """
+    property_info = hotel_details["data"]["propertyInfo"]
+    summary = property_info.get("summary") or {}
+    overview = summary.get("overview") or {}
+    property_rating = overview.get("propertyRating")
+    address = (summary.get("location") or {}).get("address") or {}
+    gallery = property_info.get("propertyGallery") or {}
+    return {
+        "data": {
+            "propertyInfo": {
+                "summary": {
+                    "name": summary.get("name"),
+                    "overview": {
+                        "propertyRating": property_rating and {
+                            "rating": property_rating.get("rating"),
+                        },
+                    },
+                    "location": {
+                        "address": {
+                            "addressLine": address.get("addressLine"),
+                        },
+                    },
+                },
+                "propertyGallery": {
+                    "images": [
+                        {"image": {"url": (i_image.get("image") or {}).get(
+                            "url"
+                        )}}
+                        for i_image in gallery.get("images") or []
+                    ],
+                },
+            },
+        },
+    }
+
+
+def _run_benchmark(repeats: int) -> None:
+    """Compare parse time of msgspec, json parsers and full json decoding.
+
+    Recorded responses are re-encoded compactly as API sends them.
+
+    Args:
+        repeats (int): number of parses of every response
+
+    """
+    global msgspec
+    installed_msgspec = msgspec
+    responses_dir = path.join(path.dirname(__file__), "hotels_response_files")
+    parsers = (
+        ("hotels_in_city", parse_properties),
+        ("hotel_details", lambda content: parse_hotel_details(content, 10)),
+    )
+    for i_suffix, i_parser in parsers:
+        file_paths = glob(path.join(responses_dir, f"*_{i_suffix}.json"))
+        for i_file_path in file_paths:
+            with open(i_file_path, "rb") as file:
+                content = dumps(loads(file.read())).encode()
+            times = {}
+            start = perf_counter()
+            for _ in range(repeats):
+                loads(content)
+            times["full json"] = perf_counter() - start
+            msgspec = None
+            start = perf_counter()
+            for _ in range(repeats):
+                json_result = i_parser(content)
+            times["json"] = perf_counter() - start
+            msgspec = installed_msgspec
+            if msgspec is not None:
+                start = perf_counter()
+                for _ in range(repeats):
+                    msgspec_result = i_parser(content)
+                times["msgspec"] = perf_counter() - start
+                assert msgspec_result == json_result
+            print(
+                f"{i_suffix} ({len(content) // 1024} KB): "
+                + ", ".join(
+                    f"{i_name} {i_time / repeats * 1000:.2f} ms"
+                    for i_name, i_time in times.items()
+                )
+            )
+
+
+if __name__ == "__main__":
+    _run_benchmark(int(argv[1]) if len(argv) > 1 else 100)
@@ -0,0 +1,232 @@
+"""Module with shared retry policy for Hotels API requests."""
+
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import monotonic
+from typing import Generator, Mapping, Optional
+
+from project_logging.bot_logger import bot_logger
+
+
+class HotelsApiStatusError(Exception):
+    """
+    Hotels API response has error HTTP status.
+
+    Attributes:
+        status (int): HTTP status
+        retryable (bool): True if request can be retried
+        retry_after (Optional[float]): delay from Retry-After header
+
+    """
+
+    def __init__(
+        self, status: int, retryable: bool, retry_after: Optional[float],
+    ) -> None:
+        """Init error.
+
+        Args:
+            status (int): HTTP status
+            retryable (bool): True if request can be retried
+            retry_after (Optional[float]): delay from Retry-After header
+
+        """
+        super().__init__(f"Hotels API response status: {status}")
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """
+    Class RetryPolicy.
+    Thread-safe retry policy for backoff decorators.
+
+    Error statuses are raised as HotelsApiStatusError, only retry_statuses
+    are retried. Retry delay is Retry-After header value or exponential
+    delay with full jitter. Retries are limited by budget shared by all
+    requests: budget_min_retries plus budget_ratio of requests sent within
+    budget_window seconds.
+
+    Attributes:
+        retry_statuses (frozenset): HTTP statuses to retry
+        base_delay (float): first retry max delay in seconds
+        max_delay (float): max retry delay in seconds
+        max_retry_after (float): max Retry-After delay to wait in seconds
+        budget_ratio (float): retries allowed per request
+        budget_min_retries (int): retries allowed regardless of requests
+        budget_window (float): budget time window in seconds
+        budget_exhausted (int): number of retries denied by budget
+
+    """
+
+    def __init__(
+        self,
+        retry_statuses: tuple = (429, 500, 502, 503, 504),
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_retry_after: float = 10.0,
+        budget_ratio: float = 0.2,
+        budget_min_retries: int = 5,
+        budget_window: float = 10.0,
+    ) -> None:
+        """Init retry policy.
+
+        Args:
+            retry_statuses (tuple): HTTP statuses to retry
+            base_delay (float): first retry max delay in seconds
+            max_delay (float): max retry delay in seconds
+            max_retry_after (float): max Retry-After delay to wait
+            budget_ratio (float): retries allowed per request
+            budget_min_retries (int): retries allowed regardless of requests
+            budget_window (float): budget time window in seconds
+
+        """
+        self.retry_statuses = frozenset(retry_statuses)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget_ratio = budget_ratio
+        self.budget_min_retries = budget_min_retries
+        self.budget_window = budget_window
+        self.budget_exhausted = 0
+        self._lock = Lock()
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+
+    def check_status(self, status: int, headers: Mapping) -> None:
+        """Raise error if response status is not successful.
+
+        Args:
+            status (int): HTTP status
+            headers (Mapping): response headers (case-insensitive)
+
+        Raises:
+            HotelsApiStatusError: if status is 4xx or 5xx
+
+        """
+        if status < 400:
+            return
+        raise HotelsApiStatusError(
+            status,
+            status in self.retry_statuses,
+            self._parse_retry_after(headers.get("Retry-After")),
+        )
+
+    def record_request(self) -> None:
+        """Add sent request to retry budget."""
+
+        with self._lock:
+            now = monotonic()
+            self._requests.append(now)
+            self._expire(now)
+
+    def giveup(self, exc: Exception) -> bool:
+        """Check that failed request must not be retried.
+
+        Args:
+            exc (Exception): request error
+
+        Returns:
+            bool: True if error is not retryable or retry budget is
+                exhausted
+
+        """
+        if isinstance(exc, HotelsApiStatusError) and (
+            not exc.retryable
+            or (exc.retry_after or 0) > self.max_retry_after
+        ):
+            return True
+        with self._lock:
+            self._expire(monotonic())
+            if len(self._retries) < (
+                self.budget_min_retries
+                + self.budget_ratio * len(self._requests)
+            ):
+                return False
+            self.budget_exhausted += 1
+        bot_logger.warning(f"Retry budget is exhausted: {exc=}")
+        return True
+
+    def wait_gen(self) -> Generator[float, Optional[Exception], None]:
+        """Generate retry delays for backoff decorator.
+
+        Backoff sends request error into generator, decorator must be used
+        with jitter=None, as delays are already jittered.
+
+        Yields:
+            float: retry delay in seconds
+
+        """
+        attempt = 0
+        exc = yield
+        while True:
+            retry_after = getattr(exc, "retry_after", None)
+            if retry_after is None:
+                delay = uniform(
+                    0, min(self.max_delay, self.base_delay * 2 ** attempt),
+                )
+            else:
+                delay = retry_after
+            with self._lock:
+                self._retries.append(monotonic())
+            attempt += 1
+            bot_logger.debug(f"{exc=}, {attempt=}, {delay=}")
+            exc = yield delay
+
+    def stats(self) -> dict:
+        """Get retry budget statistics.
+
+        Returns:
+            dict: requests and retries within budget window, number of
+                retries denied by budget
+
+        """
+        with self._lock:
+            self._expire(monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "budget_exhausted": self.budget_exhausted,
+            }
+
+    def _expire(self, now: float) -> None:
+        """Delete requests and retries out of budget window.
+
+        Must be called under self._lock.
+
+        Args:
+            now (float): current monotonic time
+
+        """
+        for i_times in (self._requests, self._retries):
+            while i_times and now - i_times[0] > self.budget_window:
+                i_times.popleft()
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse Retry-After header in seconds or HTTP date format.
+
+        Args:
+            value (Optional[str]): header value
+
+        Returns:
+            Optional[float]: delay in seconds, None if value is not valid
+
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = retry_at - datetime.now(timezone.utc)
+        return max(0.0, delay.total_seconds())
@@ -0,0 +1,120 @@
+"""Module to benchmark pooled HTTP session of HotelsApi.
+
+Local stub HTTPS server with self-signed certificate (made by openssl
+command) answers as Hotels API city search. The same requests are sent
+with new connection per request (module-level requests.get, as before
+session pooling) and through HotelsApi shared session, which makes TCP
+and TLS handshakes once per pooled connection.
+
+Run as script (.env is required as for the bot):
+    python -m handlers.sites_API.session_benchmark [requests_number ...]
+"""
+
+import ssl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import path
+from subprocess import DEVNULL, run as subprocess_run
+from sys import argv
+from tempfile import mkdtemp
+from threading import Thread
+from time import perf_counter
+
+import requests
+
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+
+response_content = b'{"q":"lisbon","rc":"OK","sr":[]}'
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Handler of stub Hotels API, counts accepted connections."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self) -> None:
+        """Count new connection."""
+
+        StubRequestHandler.connections += 1
+        super().setup()
+
+    def do_GET(self) -> None:
+        """Answer city search request."""
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response_content)))
+        self.end_headers()
+        self.wfile.write(response_content)
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not write access log."""
+
+
+def _start_stub_server() -> tuple[ThreadingHTTPServer, str]:
+    """Start stub HTTPS server with self-signed certificate.
+
+    Returns:
+        tuple[ThreadingHTTPServer, str]: started server and certificate path
+
+    """
+    cert_dir = mkdtemp()
+    cert_path = path.join(cert_dir, "cert.pem")
+    key_path = path.join(cert_dir, "key.pem")
+    subprocess_run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key_path, "-out", cert_path, "-days", "1",
+            "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost",
+        ],
+        check=True,
+        stdout=DEVNULL,
+        stderr=DEVNULL,
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server = ThreadingHTTPServer(("localhost", 0), StubRequestHandler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, cert_path
+
+
+def _run_benchmark(requests_number: int) -> None:
+    """Compare new connection per request with pooled session.
+
+    Args:
+        requests_number (int): number of sequential requests
+
+    """
+    server, cert_path = _start_stub_server()
+    base_url = f"https://localhost:{server.server_port}/"
+    url = base_url + HotelsApi._find_city_endpoint
+    StubRequestHandler.connections = 0
+    start = perf_counter()
+    for _ in range(requests_number):
+        requests.get(url, params={"q": "lisbon"}, verify=cert_path)
+    new_connection_time = perf_counter() - start
+    new_connections = StubRequestHandler.connections
+    HotelsApi._base_url = base_url
+    HotelsApi._session = None
+    session = HotelsApi._get_session()
+    StubRequestHandler.connections = 0
+    start = perf_counter()
+    for _ in range(requests_number):
+        session.get(url, params={"q": "lisbon"}, verify=cert_path)
+    pooled_time = perf_counter() - start
+    print(
+        f"{requests_number=}: new connection "
+        f"{new_connection_time / requests_number * 1000:.2f} ms/request "
+        f"({new_connections} connections), pooled session "
+        f"{pooled_time / requests_number * 1000:.2f} ms/request "
+        f"({StubRequestHandler.connections} connections)"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    for i_number in map(int, argv[1:] or ["100", "500"]):
+        _run_benchmark(i_number)
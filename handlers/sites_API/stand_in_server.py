@@ -0,0 +1,554 @@
+"""Module with local stand-in server of Hotels API for offline benchmarks.
+
+Server answers locations/v3/search, properties/v2/list and
+properties/v2/detail with recorded responses, so full search path can be
+load tested without spending RapidAPI quota. Recordings are json files
+"{endpoint}_{key}.json" in recordings dir, key is normalized city name,
+region id or hotel id. Responses of legacy response files in
+hotels_response_files are used as recordings too. Request without recording
+gets default recorded response of endpoint, found hotels are paginated as
+per request payload. In record mode such requests are sent to Hotels API
+and responses are saved as recordings.
+
+Latency (lognormal with median and sigma), 5xx errors and 429 responses
+with Retry-After are injected with seeded random, remaining quota headers
+are sent if quota is set.
+
+Run as script and set HOTELS_API_BASE_URL=http://127.0.0.1:8000/:
+    python -m handlers.sites_API.stand_in_server --help
+"""
+
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from math import exp
+from os import getenv, listdir, makedirs, path
+from random import Random
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from project_logging.bot_logger import bot_logger
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+response_files_abs_path = path.join(
+    path.abspath(path.dirname(__file__)), "hotels_response_files",
+)
+
+
+class StandInServer:
+    """
+    Class StandInServer.
+    Local stand-in of Hotels API serving recorded responses with injected
+    latency and errors.
+
+    Attributes:
+        recordings_dir (str): dir path for recorded responses
+        latency_median (float): median response latency in seconds
+        latency_sigma (float): sigma of lognormal latency, 0 for constant
+            latency
+        error_rate (float): share of 5xx responses
+        throttle_rate (float): share of 429 responses
+        retry_after (int): Retry-After header of 429 response in seconds
+        quota (Optional[int]): remaining requests quota, None if quota
+            headers are not sent
+        total_hotels (Optional[int]): number of found hotels for default
+            hotels list, None for number of recorded hotels
+        record (bool): request missing responses from upstream_url and
+            save them
+        upstream_url (str): Hotels API base url for record mode
+        requests (dict): number of responses per endpoint and status
+
+    """
+
+    _endpoint_names = {
+        "/locations/v3/search": "city",
+        "/properties/v2/list": "list",
+        "/properties/v2/detail": "detail",
+    }
+    _legacy_file_suffixes = {
+        "_check_city.json": "city",
+        "_hotels_in_city.json": "list",
+        "_hotel_details.json": "detail",
+    }
+    _error_statuses = (500, 502, 503)
+    _quota_reset_seconds = 24 * 60 * 60
+
+    def __init__(
+        self,
+        recordings_dir: str = path.join(
+            response_files_abs_path, "stand_in_recordings",
+        ),
+        seed_dir: Optional[str] = response_files_abs_path,
+        latency_median: float = 0.0,
+        latency_sigma: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        quota: Optional[int] = None,
+        total_hotels: Optional[int] = None,
+        record: bool = False,
+        upstream_url: str = "https://hotels4.p.rapidapi.com/",
+        seed: Optional[int] = None,
+    ) -> None:
+        """Init server and load recorded responses.
+
+        Args:
+            recordings_dir (str): dir path for recorded responses
+            seed_dir (Optional[str]): dir path of legacy response files
+            latency_median (float): median response latency in seconds
+            latency_sigma (float): sigma of lognormal latency
+            error_rate (float): share of 5xx responses
+            throttle_rate (float): share of 429 responses
+            retry_after (int): Retry-After header of 429 response
+            quota (Optional[int]): remaining requests quota
+            total_hotels (Optional[int]): number of found hotels for default
+                hotels list
+            record (bool): request missing responses and save them
+            upstream_url (str): Hotels API base url for record mode
+            seed (Optional[int]): random seed of injected latency and errors
+
+        """
+        if record and requests is None:
+            raise RuntimeError("requests is required for record mode")
+        self.recordings_dir = recordings_dir
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.quota = quota
+        self.total_hotels = total_hotels
+        self.record = record
+        self.upstream_url = upstream_url
+        self.requests: dict[str, int] = {}
+        self._random = Random(seed)
+        self._lock = Lock()
+        self._quota_reset_at = monotonic() + self._quota_reset_seconds
+        self._recordings: dict[str, dict[str, dict]] = {
+            i_name: {} for i_name in self._endpoint_names.values()
+        }
+        if seed_dir and path.isdir(seed_dir):
+            self._load_legacy_files(seed_dir)
+        if path.isdir(recordings_dir):
+            self._load_recordings()
+        bot_logger.info(
+            f"{recordings_dir=}, "
+            + ", ".join(
+                f"{i_name}={len(i_responses)}"
+                for i_name, i_responses in self._recordings.items()
+            )
+        )
+
+    def start(
+        self, host: str = "127.0.0.1", port: int = 8000,
+    ) -> ThreadingHTTPServer:
+        """Start server in background thread.
+
+        Args:
+            host (str): host to listen
+            port (int): port to listen, 0 for any free port
+
+        Returns:
+            ThreadingHTTPServer: started HTTP server, server_port is its
+                port and shutdown() stops it
+
+        """
+        http_server = self.create_http_server(host, port)
+        Thread(
+            target=http_server.serve_forever,
+            name="stand_in_server",
+            daemon=True,
+        ).start()
+        return http_server
+
+    def create_http_server(self, host: str, port: int) -> ThreadingHTTPServer:
+        """Create HTTP server with request handler of this stand-in.
+
+        Args:
+            host (str): host to listen
+            port (int): port to listen
+
+        Returns:
+            ThreadingHTTPServer: HTTP server
+
+        """
+        stand_in = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            """Handler of HTTP requests to stand-in server."""
+
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                """Answer GET request."""
+
+                self._answer(b"")
+
+            def do_POST(self) -> None:
+                """Answer POST request."""
+
+                length = int(self.headers.get("Content-Length") or 0)
+                self._answer(self.rfile.read(length))
+
+            def log_message(self, format: str, *args) -> None:
+                """Write access log to bot logger."""
+
+                bot_logger.debug(format % args)
+
+            def _answer(self, body: bytes) -> None:
+                """Send stand-in response."""
+
+                status, headers, content = stand_in.handle(self.path, body)
+                self.send_response(status)
+                for i_name, i_value in headers.items():
+                    self.send_header(i_name, i_value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return ThreadingHTTPServer((host, port), RequestHandler)
+
+    def handle(self, url_path: str, body: bytes) -> tuple[int, dict, bytes]:
+        """Get response of Hotels API request after injected latency.
+
+        Args:
+            url_path (str): request path with query string
+            body (bytes): request body
+
+        Returns:
+            tuple[int, dict, bytes]: status, headers and content
+
+        """
+        url = urlsplit(url_path)
+        endpoint = self._endpoint_names.get(url.path)
+        latency, status, headers = self._get_injected_result()
+        sleep(latency)
+        if endpoint is None:
+            status, content = 404, b'{"message":"Endpoint does not exist"}'
+        elif status != 200:
+            content = dumps({"message": f"Injected status {status}"}).encode()
+        else:
+            try:
+                content = self._get_content(endpoint, url, body)
+            except (ValueError, TypeError, KeyError) as exc:
+                bot_logger.error(f"{exc=}, {url_path=}")
+                status, content = 400, b'{"message":"Invalid request"}'
+        with self._lock:
+            requests_key = f"{endpoint} {status}"
+            self.requests[requests_key] = (
+                self.requests.get(requests_key, 0) + 1
+            )
+        return status, headers, content
+
+    def _get_injected_result(self) -> tuple[float, int, dict]:
+        """Get injected latency, status and headers of one response.
+
+        Returns:
+            tuple[float, int, dict]: latency in seconds, status and headers
+
+        """
+        with self._lock:
+            latency = self.latency_median
+            if self.latency_sigma:
+                latency *= exp(self._random.gauss(0, self.latency_sigma))
+            chance = self._random.random()
+            if chance < self.throttle_rate:
+                return latency, 429, {"Retry-After": str(self.retry_after)}
+            if chance < self.throttle_rate + self.error_rate:
+                return latency, self._random.choice(self._error_statuses), {}
+            headers = {}
+            if self.quota is not None:
+                self.quota = max(0, self.quota - 1)
+                headers = {
+                    "X-RateLimit-Requests-Remaining": str(self.quota),
+                    "X-RateLimit-Requests-Reset": str(
+                        int(self._quota_reset_at - monotonic())
+                    ),
+                }
+            return latency, 200, headers
+
+    def _get_content(self, endpoint: str, url, body: bytes) -> bytes:
+        """Get recorded response content for request.
+
+        Args:
+            endpoint (str): endpoint name
+            url (SplitResult): request url
+            body (bytes): request body
+
+        Raises:
+            ValueError: if request is not valid json
+            KeyError: if required request field is missing
+
+        Returns:
+            bytes: response content
+
+        """
+        if endpoint == "city":
+            payload = None
+            key = self._normalize_key(parse_qs(url.query)["q"][0])
+        else:
+            payload = loads(body)
+            key = str(
+                payload["destination"]["regionId"] if endpoint == "list"
+                else payload["propertyId"]
+            )
+        response = self._recordings[endpoint].get(key)
+        if response is None and self.record:
+            response = self._record(endpoint, key, url, body)
+        if endpoint == "list":
+            return dumps(self._get_list_page(response, payload)).encode()
+        if response is None:
+            response = self._get_default_response(endpoint)
+            if endpoint == "detail":
+                response = self._replace_hotel_id(response, key)
+        return dumps(response).encode()
+
+    def _get_list_page(
+        self, response: Optional[dict], payload: dict,
+    ) -> dict:
+        """Get found hotels page as per request payload.
+
+        Without recorded response, default found hotels are recorded hotels
+        of all regions, repeated with unique ids up to total_hotels.
+
+        Args:
+            response (Optional[dict]): recorded response of region
+            payload (dict): hotel search payload
+
+        Returns:
+            dict: found hotels page response
+
+        """
+        template = response or self._get_default_response("list")
+        properties = template["data"]["propertySearch"]["properties"]
+        if response is None:
+            properties = [
+                i_property
+                for i_response in self._recordings["list"].values()
+                for i_property in (
+                    i_response["data"]["propertySearch"]["properties"]
+                )
+            ]
+            total_hotels = self.total_hotels or len(properties)
+            properties = [
+                self._replace_hotel_id(
+                    properties[i_index % len(properties)], str(i_index),
+                )
+                if i_index >= len(properties)
+                else properties[i_index]
+                for i_index in range(total_hotels)
+            ]
+        start = payload.get("resultsStartingIndex", 0)
+        size = payload.get("resultsSize", len(properties))
+        property_search = dict(
+            template["data"]["propertySearch"],
+            properties=properties[start:start + size],
+        )
+        return dict(
+            template, data=dict(template["data"], propertySearch=property_search),
+        )
+
+    def _get_default_response(self, endpoint: str) -> dict:
+        """Get first recorded response of endpoint.
+
+        Args:
+            endpoint (str): endpoint name
+
+        Raises:
+            KeyError: if endpoint has no recorded responses
+
+        Returns:
+            dict: recorded response
+
+        """
+        try:
+            return next(iter(self._recordings[endpoint].values()))
+        except StopIteration:
+            raise KeyError(f"No recorded responses: {endpoint=}") from None
+
+    @staticmethod
+    def _replace_hotel_id(response: dict, hotel_id: str) -> dict:
+        """Copy recorded hotel with another hotel id.
+
+        Args:
+            response (dict): recorded hotel (property) or hotel details
+            hotel_id (str): hotel id
+
+        Returns:
+            dict: hotel copy
+
+        """
+        if "data" not in response:
+            return dict(response, id=hotel_id)
+        property_info = response["data"]["propertyInfo"]
+        summary = dict(property_info["summary"], id=hotel_id)
+        return dict(
+            response,
+            data=dict(
+                response["data"],
+                propertyInfo=dict(property_info, summary=summary),
+            ),
+        )
+
+    def _record(
+        self, endpoint: str, key: str, url, body: bytes,
+    ) -> Optional[dict]:
+        """Request response from Hotels API and save it as recording.
+
+        Args:
+            endpoint (str): endpoint name
+            key (str): recording key
+            url (SplitResult): request url
+            body (bytes): request body
+
+        Returns:
+            Optional[dict]: response, None if request failed
+
+        """
+        headers = {
+            "X-RapidAPI-Key": getenv("RAPID_API_KEY"),
+            "X-RapidAPI-Host": urlsplit(self.upstream_url).hostname,
+            "content-type": "application/json",
+        }
+        try:
+            upstream_response = requests.request(
+                "POST" if body else "GET",
+                self.upstream_url.rstrip("/") + url.path,
+                params=url.query or None,
+                data=body or None,
+                headers=headers,
+                timeout=(3.05, 30),
+            )
+            upstream_response.raise_for_status()
+            response = upstream_response.json()
+        except (requests.RequestException, ValueError) as exc:
+            bot_logger.error(f"{exc=}, {endpoint=}, {key=}")
+            return None
+        makedirs(self.recordings_dir, exist_ok=True)
+        with open(
+            path.join(self.recordings_dir, f"{endpoint}_{key}.json"),
+            "w",
+            encoding="utf-8",
+        ) as file:
+            file.write(dumps(response, ensure_ascii=False))
+        with self._lock:
+            self._recordings[endpoint][key] = response
+        bot_logger.info(f"Recorded: {endpoint=}, {key=}")
+        return response
+
+    def _load_recordings(self) -> None:
+        """Load recorded responses from recordings dir."""
+
+        for i_file_name in sorted(listdir(self.recordings_dir)):
+            endpoint, _, key = i_file_name.removesuffix(".json").partition(
+                "_",
+            )
+            if endpoint not in self._recordings or not key:
+                continue
+            with open(
+                path.join(self.recordings_dir, i_file_name), encoding="utf-8",
+            ) as file:
+                self._recordings[endpoint][key] = loads(file.read())
+
+    def _load_legacy_files(self, files_dir: str) -> None:
+        """Load responses of legacy response files as recordings.
+
+        Args:
+            files_dir (str): dir path of legacy response files
+
+        """
+        for i_file_name in sorted(listdir(files_dir)):
+            for i_suffix, i_endpoint in self._legacy_file_suffixes.items():
+                if not i_file_name.endswith(i_suffix):
+                    continue
+                try:
+                    with open(
+                        path.join(files_dir, i_file_name), encoding="utf-8",
+                    ) as file:
+                        response = loads(file.read())
+                    key = self._get_response_key(i_endpoint, response)
+                except (OSError, ValueError, KeyError, TypeError) as exc:
+                    bot_logger.error(f"{exc=}, {i_file_name=}")
+                    continue
+                self._recordings[i_endpoint][key] = response
+
+    def _get_response_key(self, endpoint: str, response: dict) -> str:
+        """Get recording key of recorded response.
+
+        Args:
+            endpoint (str): endpoint name
+            response (dict): recorded response
+
+        Returns:
+            str: normalized city name, region id or hotel id
+
+        """
+        if endpoint == "city":
+            return self._normalize_key(response["q"])
+        if endpoint == "list":
+            return str(
+                response["data"]["propertySearch"]["properties"][0]
+                ["destinationInfo"]["regionId"]
+            )
+        return str(response["data"]["propertyInfo"]["summary"]["id"])
+
+    @staticmethod
+    def _normalize_key(city_name: str) -> str:
+        """Normalize city name for recording key.
+
+        Args:
+            city_name (str): city name
+
+        Returns:
+            str: city name in lower case without punctuation
+
+        """
+        return "".join(
+            i_char for i_char in city_name.lower() if i_char.isalnum()
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--recordings-dir",
+        default=path.join(response_files_abs_path, "stand_in_recordings"),
+    )
+    parser.add_argument("--latency-median", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--quota", type=int)
+    parser.add_argument("--total-hotels", type=int)
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--seed", type=int)
+    cli_args = parser.parse_args()
+    stand_in_server = StandInServer(
+        recordings_dir=cli_args.recordings_dir,
+        latency_median=cli_args.latency_median,
+        latency_sigma=cli_args.latency_sigma,
+        error_rate=cli_args.error_rate,
+        throttle_rate=cli_args.throttle_rate,
+        retry_after=cli_args.retry_after,
+        quota=cli_args.quota,
+        total_hotels=cli_args.total_hotels,
+        record=cli_args.record,
+        seed=cli_args.seed,
+    )
+    print(f"Serving on http://{cli_args.host}:{cli_args.port}/")
+    try:
+        stand_in_server.create_http_server(
+            cli_args.host, cli_args.port,
+        ).serve_forever()
+    except KeyboardInterrupt:
+        print(stand_in_server.requests)
@@ -0,0 +1,170 @@
+"""Module for selecting the most expensive hotels from found hotels pages.
+
+Run as script to benchmark selection on synthetic found hotels:
+    python -m handlers.sites_API.top_price_selector [hotels_number]
+"""
+
+from heapq import heappush, heappushpop
+from itertools import count
+from random import uniform
+from sys import argv
+from time import perf_counter
+from typing import Optional
+
+
+class TopPriceSelector:
+    """
+    Class TopPriceSelector.
+    Streaming top-k selection of found hotels (properties) by price.
+
+    Pages of found hotels are added one by one, only k most expensive
+    hotels are kept in min-heap, so memory does not depend on number of
+    scanned hotels.
+
+    Attributes:
+        required_hotels (int): number of hotels to select
+        pages (int): number of added pages
+        scanned (int): number of added hotels
+        skipped (int): number of hotels without price
+        replaced (int): number of selected hotels replaced by more
+            expensive ones
+        exhausted (bool): True if page shorter than requested page size
+            was added, so all found hotels were scanned
+
+    """
+
+    def __init__(self, required_hotels: int) -> None:
+        """Init selector.
+
+        Args:
+            required_hotels (int): number of hotels to select
+
+        """
+        self.required_hotels = required_hotels
+        self.pages = 0
+        self.scanned = 0
+        self.skipped = 0
+        self.replaced = 0
+        self.exhausted = False
+        self._heap: list[tuple] = []
+        self._order = count()
+
+    def add_page(
+        self, hotels_details: list[dict], page_size: Optional[int] = None,
+    ) -> None:
+        """Add found hotels page.
+
+        Args:
+            hotels_details (list[dict]): found hotels (properties)
+            page_size (Optional[int]): requested page size, None if page is
+                not requested by pages
+
+        """
+        self.pages += 1
+        if page_size is not None and len(hotels_details) < page_size:
+            self.exhausted = True
+        for i_hotel in hotels_details:
+            self.scanned += 1
+            price = self._get_price(i_hotel)
+            if price is None:
+                self.skipped += 1
+                continue
+            # Earlier hotel wins equal price, as in API sorting
+            entry = (price, -next(self._order), i_hotel)
+            if len(self._heap) < self.required_hotels:
+                heappush(self._heap, entry)
+            elif entry > self._heap[0]:
+                heappushpop(self._heap, entry)
+                self.replaced += 1
+
+    def result(self) -> list[dict]:
+        """Get selected hotels sorted by price DESC.
+
+        Returns:
+            list[dict]: the most expensive hotels
+
+        """
+        return [i_entry[2] for i_entry in sorted(self._heap, reverse=True)]
+
+    def stats(self) -> dict:
+        """Get selection statistics.
+
+        Returns:
+            dict: selection statistics
+
+        """
+        return {
+            "pages": self.pages,
+            "scanned": self.scanned,
+            "skipped": self.skipped,
+            "replaced": self.replaced,
+            "exhausted": self.exhausted,
+        }
+
+    @staticmethod
+    def _get_price(hotel_details: dict) -> Optional[float]:
+        """Get hotel price per day.
+
+        Args:
+            hotel_details (dict): found hotel (property)
+
+        Returns:
+            Optional[float]: price, None if hotel has no price
+
+        """
+        try:
+            price = hotel_details["price"]["lead"]["amount"]
+        except (KeyError, TypeError):
+            return None
+        return price if isinstance(price, (int, float)) else None
+
+
+def _run_benchmark(hotels_number: int) -> None:
+    """Compare heap selection with full sort on synthetic found hotels.
+
+    Also show how many of true top hotels are found if scan stops after
+    first hotels sorted by price ASC (high price command scanned first
+    200 ones before).
+
+    Args:
+        hotels_number (int): number of synthetic found hotels
+
+    """
+    required_hotels = 3
+    page_size = 200
+    hotels_details = [
+        {"id": str(i_id), "price": {"lead": {"amount": uniform(10, 5000)}}}
+        for i_id in range(hotels_number)
+    ]
+    start = perf_counter()
+    selector = TopPriceSelector(required_hotels)
+    for i_index in range(0, hotels_number, page_size):
+        selector.add_page(
+            hotels_details[i_index:i_index + page_size], page_size,
+        )
+    heap_time = perf_counter() - start
+    start = perf_counter()
+    top_hotels = sorted(
+        hotels_details, key=TopPriceSelector._get_price, reverse=True,
+    )[:required_hotels]
+    sort_time = perf_counter() - start
+    assert selector.result() == top_hotels
+    print(
+        f"{hotels_number=}: heap {heap_time * 1000:.1f} ms, "
+        f"sort {sort_time * 1000:.1f} ms, {selector.stats()}"
+    )
+    hotels_details.sort(key=TopPriceSelector._get_price)
+    top_ids = {i_hotel["id"] for i_hotel in top_hotels}
+    for i_scan_limit in (200, 1000, 5000):
+        selector = TopPriceSelector(required_hotels)
+        selector.add_page(hotels_details[:i_scan_limit])
+        found = top_ids & {i_hotel["id"] for i_hotel in selector.result()}
+        print(
+            f"  scan first {i_scan_limit}: "
+            f"{len(found)}/{required_hotels} of top hotels"
+        )
+
+
+if __name__ == "__main__":
+    for i_number in map(int, argv[1:] or ["1000", "10000", "100000"]):
+        _run_benchmark(i_number)
@@ -1 +1 @@
-from . import calender, start, search_cities
+from . import calender, start, search_cities, hotel_details
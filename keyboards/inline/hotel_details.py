@@ -0,0 +1,37 @@
+"""Module for creating hotel details inline keyboard"""
+
+from telebot.callback_data import CallbackData
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+hotel_details_factory = CallbackData(
+    "search_key", "property_id", "photo_amount", prefix="hotel_details",
+)
+
+
+def get_hotel_details_inline_keyboard(
+    search_key: str, property_id: str, photo_amount: int,
+) -> InlineKeyboardMarkup:
+    """Create inline keyboard with "Details & photos" button of hotel.
+
+    Args:
+        search_key (str): key of search which listed hotel
+        property_id (str): unic hotel id
+        photo_amount (int): number of hotel photos to send, 0 if photos are
+            not required
+
+    Returns:
+        InlineKeyboardMarkup: hotel details inline keyboard
+
+    """
+    hotel_details_keyboard = InlineKeyboardMarkup(row_width=1)
+    hotel_details_keyboard.add(
+        InlineKeyboardButton(
+            text="Details & photos" if photo_amount else "Details",
+            callback_data=hotel_details_factory.new(
+                search_key=search_key,
+                property_id=property_id,
+                photo_amount=photo_amount,
+            ),
+        )
+    )
+    return hotel_details_keyboard
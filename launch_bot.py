@@ -1,5 +1,10 @@
-"""Module for launching Telegram Bot 'Global Hotel Search'"""
+"""Module for launching Telegram Bot 'Global Hotel Search'
 
+SIGTERM (docker stop) is handled as keyboard interrupt, so polling is
+stopped and pending history writes are committed at exit.
+"""
+
+from signal import SIGTERM, default_int_handler, signal
 from sys import exit
 
 from telebot.custom_filters import StateFilter
@@ -20,6 +25,7 @@ def load_telegram_bot() -> None:
 
 
 if __name__ == "__main__":
+    signal(SIGTERM, default_int_handler)
     load_telegram_bot()
 else:
     exit("Access is denied")
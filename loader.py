@@ -9,6 +9,10 @@ from telebot import TeleBot, storage
 
 import config_data.config
 import database.history_model
+from database.migrations import migrate
+
+"""Apply not applied database schema migrations"""
+migrate()
 
 """Create state storage for multiuser mode and set bot base settings"""
 state_storage = storage.StateMemoryStorage()
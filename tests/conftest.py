@@ -0,0 +1,42 @@
+"""Common test settings.
+
+Bot settings are set in os environment before project modules are
+imported, so tests use their own database and do not need .env.
+"""
+
+from os import environ, path
+from tempfile import mkdtemp
+
+import pytest
+
+tests_data_dir = mkdtemp(prefix="telegram_bot_tests_")
+environ["BOT_TOKEN"] = "123456:TEST"
+environ["RAPID_API_KEY"] = "test"
+environ["LOGS_FILE_NAME"] = "tests.log"
+environ["DB_NAME"] = path.join(tests_data_dir, "tests.db")
+
+
+@pytest.fixture
+def sent_messages(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Collect texts of bot messages instead of sending them."""
+
+    from loader import bot
+
+    messages = []
+    monkeypatch.setattr(
+        bot,
+        "send_message",
+        lambda chat_id, text, **kwargs: messages.append(text),
+    )
+    return messages
+
+
+def pytest_sessionfinish() -> None:
+    """Commit pending history writes while pytest output is open."""
+
+    from atexit import unregister
+
+    from database.history_writer import history_writer
+
+    history_writer.close()
+    unregister(history_writer.close)
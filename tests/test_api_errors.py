@@ -0,0 +1,70 @@
+"""Tests of Hotels API errors at HotelsApi search boundary."""
+
+import pytest
+
+from handlers.messages.states_handlers.search_input_city import (
+    handle_input_city,
+    msg_city_not_found,
+)
+from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.endpoint_policy import CircuitOpenError
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from handlers.sites_API.rate_limiter import RateLimitError
+from handlers.sites_API.retry_policy import HotelsApiStatusError
+from loader import bot
+from states.budget_search import BudgetSearchStates
+
+chat_id = 1003
+user_id = 2004
+api_errors = [
+    HotelsApiStatusError(403, retryable=False, retry_after=None),
+    RateLimitError("Quota is exhausted"),
+    CircuitOpenError("Circuit is open"),
+]
+
+
+@pytest.fixture(params=api_errors, ids=lambda exc: type(exc).__name__)
+def api_error(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch,
+) -> Exception:
+    """Make every Hotels API request fail with error."""
+
+    def raise_api_error(*args, **kwargs) -> None:
+        raise request.param
+
+    monkeypatch.setattr(HotelsApi, "_send_request", raise_api_error)
+    return request.param
+
+
+def test_city_search_error_replies_city_not_found(
+    api_error: Exception, sent_messages: list[str],
+) -> None:
+    city_name = f"Lisbon {type(api_error).__name__}"
+
+    handle_input_city(
+        chat_id, user_id, city_name, BudgetSearchStates.confirm_city,
+    )
+
+    assert sent_messages == [msg_city_not_found.format(city_name=city_name)]
+
+
+def test_hotels_search_error_gives_no_hotels(api_error: Exception) -> None:
+    bot.set_state(user_id, BudgetSearchStates.hotels_amount, chat_id)
+    StateData.save_multiple_user_data(
+        chat_id,
+        user_id,
+        {
+            "command": "Top Budget Hotels",
+            "sort": "PRICE_LOW_TO_HIGH",
+            "min_price": 1,
+            "max_price": 1000000,
+            "region_id": f"region {type(api_error).__name__}",
+            "check_in_date": {"day": 1, "month": 6, "year": 2030},
+            "check_out_date": {"day": 5, "month": 6, "year": 2030},
+            "adults": 1,
+            "hotels_amount": 3,
+        },
+    )
+
+    assert HotelsApi.find_hotels_in_city(chat_id, user_id) == []
+    assert list(HotelsApi.iter_hotels_in_city(chat_id, user_id)) == []
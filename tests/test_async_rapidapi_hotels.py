@@ -0,0 +1,199 @@
+"""Tests of AsyncHotelsApi against local async stub of Hotels API."""
+
+from asyncio import gather, run
+from typing import Awaitable, Callable, Optional
+
+import pytest
+from aiohttp import web
+
+from handlers.sites_API.async_rapidapi_hotels import AsyncHotelsApi
+from handlers.sites_API.endpoint_policy import CircuitOpenError
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from handlers.sites_API.rate_limiter import RateLimitError
+from handlers.sites_API.retry_policy import HotelsApiStatusError
+from handlers.sites_API.stand_in_server import StandInServer
+
+user_id = 2005
+search_settings = {
+    "command": "Top Budget Hotels",
+    "sort": "PRICE_LOW_TO_HIGH",
+    "full_name": "Lisbon, Lisbon District, Portugal",
+    "min_price": 1,
+    "max_price": 1000000,
+    "region_id": "2080",
+    "check_in_date": {"day": 1, "month": 6, "year": 2030},
+    "check_out_date": {"day": 5, "month": 6, "year": 2030},
+    "adults": 1,
+    "hotels_amount": 3,
+    "display_hotel_photos": True,
+    "hotel_photo_amount": 2,
+}
+api_errors = [
+    HotelsApiStatusError(403, retryable=False, retry_after=None),
+    RateLimitError("Quota is exhausted"),
+    CircuitOpenError("Circuit is open"),
+]
+
+
+@pytest.fixture
+def stand_in(
+    tmp_path, monkeypatch: pytest.MonkeyPatch,
+) -> StandInServer:
+    """Create stand-in of Hotels API with empty caches of HotelsApi."""
+
+    for i_cache in (
+        HotelsApi._cities_cache,
+        HotelsApi._properties_cache,
+        HotelsApi._hotel_details_cache,
+        HotelsApi._listed_hotels_cache,
+    ):
+        i_cache.clear()
+    monkeypatch.setattr(
+        HotelsApi, "_save_response", lambda *args, **kwargs: None,
+    )
+    return StandInServer(recordings_dir=str(tmp_path))
+
+
+def run_with_stub(
+    stand_in: StandInServer,
+    monkeypatch: pytest.MonkeyPatch,
+    search: Callable[[], Awaitable],
+):
+    """Run search with Hotels API base url of local async stub server.
+
+    Args:
+        stand_in (StandInServer): stand-in answering stub requests
+        monkeypatch (pytest.MonkeyPatch): monkeypatch of base url
+        search (Callable[[], Awaitable]): coroutine function to run
+
+    Returns:
+        Any: search result
+
+    """
+    async def answer(request: web.Request) -> web.Response:
+        status, headers, content = stand_in.handle(
+            request.path_qs, await request.read(),
+        )
+        return web.Response(
+            status=status,
+            headers=headers,
+            body=content,
+            content_type="application/json",
+        )
+
+    async def run_search():
+        app = web.Application()
+        app.router.add_route("*", "/{endpoint:.*}", answer)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(
+            HotelsApi, "_base_url", f"http://127.0.0.1:{port}/",
+        )
+        try:
+            return await search()
+        finally:
+            await AsyncHotelsApi.close()
+            await runner.cleanup()
+
+    return run(run_search())
+
+
+def test_find_city(
+    stand_in: StandInServer, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cities = run_with_stub(
+        stand_in,
+        monkeypatch,
+        lambda: AsyncHotelsApi.find_city(user_id, "Lisbone"),
+    )
+
+    assert cities
+    assert cities[0]["region_id"] == search_settings["region_id"]
+    assert stand_in.requests == {"city 200": 1}
+
+
+def test_concurrent_searches_share_requests(
+    stand_in: StandInServer, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    searches_number = 5
+
+    results = run_with_stub(
+        stand_in,
+        monkeypatch,
+        lambda: gather(
+            *(
+                AsyncHotelsApi.find_hotels_in_city(user_id, search_settings)
+                for _ in range(searches_number)
+            )
+        ),
+    )
+
+    hotels_amount = search_settings["hotels_amount"]
+    assert all(len(i_hotels) == hotels_amount for i_hotels in results)
+    assert len({
+        tuple(i_hotel.property_id for i_hotel in i_hotels)
+        for i_hotels in results
+    }) == 1
+    assert stand_in.requests == {"list 200": 1, "detail 200": hotels_amount}
+    assert HotelsApi._properties_cache.coalesced == searches_number - 1
+
+
+@pytest.mark.parametrize(
+    "api_error", api_errors, ids=lambda exc: type(exc).__name__,
+)
+def test_api_error_gives_no_results(
+    api_error: Exception,
+    stand_in: StandInServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def raise_api_error(*args, **kwargs) -> None:
+        raise api_error
+
+    async def search() -> tuple[list, list]:
+        return (
+            await AsyncHotelsApi.find_city(user_id, "Lisbone"),
+            await AsyncHotelsApi.find_hotels_in_city(
+                user_id, search_settings,
+            ),
+        )
+
+    monkeypatch.setattr(
+        AsyncHotelsApi, "_send_async_request", raise_api_error,
+    )
+
+    assert run_with_stub(stand_in, monkeypatch, search) == ([], [])
+
+
+@pytest.mark.parametrize(
+    "max_results, list_requests",
+    [(HotelsApi._max_results_index, 1), (None, 5)],
+    ids=["first_page", "full_scan_by_default"],
+)
+def test_luxury_search_quota_cost(
+    max_results: Optional[int],
+    list_requests: int,
+    stand_in: StandInServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    luxury_settings = dict(
+        search_settings, command="Top Luxury Hotels", region_id="1",
+    )
+    stand_in.total_hotels = 1000
+    if max_results is not None:
+        monkeypatch.setattr(
+            HotelsApi, "_top_price_max_results", max_results,
+        )
+
+    hotels = run_with_stub(
+        stand_in,
+        monkeypatch,
+        lambda: AsyncHotelsApi.find_hotels_in_city(
+            user_id, luxury_settings, add_details=False,
+        ),
+    )
+
+    assert len(hotels) == luxury_settings["hotels_amount"]
+    assert stand_in.requests == {"list 200": list_requests}
@@ -0,0 +1,60 @@
+"""Tests of best deal filter and ranking of found hotels."""
+
+from handlers.sites_API.best_deal_ranker import rank_best_deals
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+
+search_settings = {
+    "command": "Custom Hotel Search",
+    "sort": "DISTANCE",
+    "region_id": "2080",
+    "check_in_date": {"day": 1, "month": 6, "year": 2030},
+    "check_out_date": {"day": 5, "month": 6, "year": 2030},
+    "adults": 1,
+    "min_price": 50,
+    "max_price": 300,
+    "min_distance": 0,
+    "max_distance": 10,
+    "hotels_amount": 3,
+}
+score_weights = {"price": 1.0, "distance": 1.0, "rating": 1.0}
+
+
+def create_hotel(
+    hotel_id: str, price: float, distance: float, rating: float,
+) -> dict:
+    """Create found hotel with price, distance in miles and rating."""
+
+    return {
+        "id": hotel_id,
+        "price": {"lead": {"amount": price}},
+        "destinationInfo": {
+            "distanceFromDestination": {"value": distance, "unit": "MILE"},
+        },
+        "reviews": {"score": rating},
+    }
+
+
+def test_best_deal_is_ranked_among_all_candidates() -> None:
+    hotels = [
+        create_hotel(str(i_index), 250, i_index / 10, 5)
+        for i_index in range(HotelsApi._best_deal_candidates)
+    ]
+    hotels[-1] = create_hotel("best", 60, 9, 10)
+    hotels.append(create_hotel("out_of_range", 10, 1, 10))
+
+    top_hotels = rank_best_deals(
+        hotels, search_settings, search_settings["hotels_amount"],
+        score_weights,
+    )
+
+    assert [i_hotel["id"] for i_hotel in top_hotels] == ["best", "0", "1"]
+
+
+def test_best_deal_first_page_holds_candidates() -> None:
+    payload = HotelsApi.create_hotel_search_payload(search_settings)
+    low_price_payload = HotelsApi.create_hotel_search_payload(
+        dict(search_settings, command="Top Budget Hotels"),
+    )
+
+    assert payload["resultsSize"] == HotelsApi._best_deal_candidates
+    assert low_price_payload["resultsSize"] == HotelsApi._min_page_size
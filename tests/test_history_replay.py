@@ -0,0 +1,64 @@
+"""Tests of hotel search result replay from history records."""
+
+from json import dumps
+
+import pytest
+
+from handlers.messages.states_handlers.history_records_number import (
+    send_processed_response,
+)
+from keyboards.inline.hotel_details import hotel_details_factory
+from loader import bot
+
+chat_id = 1006
+
+
+@pytest.fixture
+def sent_markups(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    """Collect texts and inline keyboards of bot messages."""
+
+    messages = []
+    monkeypatch.setattr(
+        bot,
+        "send_message",
+        lambda chat_id, text, reply_markup=None, **kwargs: messages.append(
+            (text, reply_markup),
+        ),
+    )
+    return messages
+
+
+def test_listed_hotels_are_replayed_with_details_buttons(
+    sent_markups: list[tuple],
+) -> None:
+    hotels_list = [
+        {
+            "caption": f"Hotel {i_index}",
+            "search_key": "a1b2c3d4e5f60718",
+            "property_id": f"10{i_index}",
+            "photo_amount": 2,
+        }
+        for i_index in (1, 2)
+    ]
+
+    send_processed_response(chat_id, {"bot_response": dumps(hotels_list)})
+
+    assert [i_text for i_text, _ in sent_markups] == ["Hotel 1", "Hotel 2"]
+    assert [
+        hotel_details_factory.parse(
+            i_markup.keyboard[0][0].callback_data,
+        )["property_id"]
+        for _, i_markup in sent_markups
+    ] == ["101", "102"]
+
+
+def test_hotels_details_are_replayed_without_buttons(
+    sent_markups: list[tuple],
+) -> None:
+    hotels_details = [{"caption": "Hotel 1 details", "photos": []}]
+
+    send_processed_response(
+        chat_id, {"bot_response": dumps(hotels_details)},
+    )
+
+    assert sent_markups == [("Hotel 1 details", None)]
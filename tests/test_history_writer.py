@@ -0,0 +1,70 @@
+"""Tests of history write-behind queue."""
+
+import pytest
+
+from database.history_model import History
+from database.history_writer import HistoryWriter, history_writer
+from database.migrations import migrate
+
+
+@pytest.fixture
+def writer() -> HistoryWriter:
+    """Create history writer, bot writer re-reads max id after test."""
+
+    migrate()
+    history_writer.flush()
+    test_writer = HistoryWriter(flush_interval=0.01, max_attempts=2)
+    yield test_writer
+    test_writer.close()
+    with history_writer._condition:
+        history_writer._last_id = None
+
+
+def test_failed_entry_is_dropped_and_does_not_block_others(
+    writer: HistoryWriter,
+) -> None:
+    first_id = writer.create(1, "Top Budget Hotels")
+    assert writer.flush()
+    writer._last_id = first_id - 1
+
+    duplicate_id = writer.create(1, "Top Luxury Hotels")
+    writer._last_id = first_id
+    next_id = writer.create(1, "Custom Hotel Search")
+
+    assert duplicate_id == first_id
+    assert not writer.flush()
+    assert History.get_by_id(next_id).command == "Custom Hotel Search"
+    assert History.get_by_id(first_id).command == "Top Budget Hotels"
+    writer.flush()
+    assert writer.dropped_entries == 1
+    writer.update(next_id, "bot_response", "found hotels")
+    assert writer.flush()
+    assert History.get_by_id(next_id).bot_response == "found hotels"
+
+
+def test_writer_survives_unexpected_error(
+    writer: HistoryWriter, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def raise_error(*args) -> bool:
+        monkeypatch.undo()
+        raise RuntimeError("Unexpected error")
+
+    monkeypatch.setattr(writer, "_write", raise_error)
+    failed_id = writer.create(1, "Top Budget Hotels")
+
+    assert not writer.flush()
+    history_id = writer.create(1, "Top Luxury Hotels")
+    assert writer.flush()
+    assert History.get_by_id(failed_id).command == "Top Budget Hotels"
+    assert History.get_by_id(history_id).command == "Top Luxury Hotels"
+    assert writer.dropped_entries == 0
+
+
+def test_writes_after_close_are_not_lost(writer: HistoryWriter) -> None:
+    writer.close()
+
+    history_id = writer.create(1, "Top Budget Hotels")
+    writer.update(history_id, "bot_response", "found hotels")
+
+    assert History.get_by_id(history_id).bot_response == "found hotels"
+    assert writer.written_entries == 2
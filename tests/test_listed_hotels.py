@@ -0,0 +1,70 @@
+"""Tests of hotels listed without details and their details buttons."""
+
+import pytest
+
+from handlers.sites_API.hotel_summary import HotelSummary
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from handlers.sites_API.rate_limiter import RateLimitError
+from keyboards.inline.hotel_details import (
+    get_hotel_details_inline_keyboard,
+    hotel_details_factory,
+)
+
+user_id = 2006
+property_id = "23704629"
+search_settings = {
+    "command": "Top Budget Hotels",
+    "sort": "PRICE_LOW_TO_HIGH",
+    "min_price": 1,
+    "max_price": 1000000,
+    "region_id": "2080",
+    "check_in_date": {"day": 1, "month": 6, "year": 2030},
+    "check_out_date": {"day": 5, "month": 6, "year": 2030},
+    "adults": 1,
+    "hotels_amount": 3,
+}
+
+
+def test_same_hotel_of_two_searches_keeps_its_search_price(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def raise_rate_limit_error(*args) -> None:
+        raise RateLimitError("Quota is exhausted")
+
+    monkeypatch.setattr(
+        HotelsApi, "_get_cached_hotel_details", raise_rate_limit_error,
+    )
+    searches = [
+        (search_settings, 100.0),
+        (dict(search_settings, adults=3), 250.0),
+    ]
+    search_keys = []
+    for i_settings, i_price in searches:
+        HotelsApi._cache_listed_hotels(
+            i_settings,
+            [HotelSummary(property_id, "Hotel", i_price, "USD", 1.0)],
+        )
+        search_keys.append(HotelsApi.get_search_key(i_settings))
+
+    hotels = [
+        HotelsApi.get_listed_hotel_details(user_id, i_key, property_id, 0)
+        for i_key in search_keys
+    ]
+
+    assert search_keys[0] != search_keys[1]
+    assert [i_hotel.price_per_night for i_hotel in hotels] == [100.0, 250.0]
+
+
+def test_details_button_keeps_search_key() -> None:
+    search_key = HotelsApi.get_search_key(search_settings)
+
+    keyboard = get_hotel_details_inline_keyboard(search_key, property_id, 5)
+
+    assert hotel_details_factory.parse(
+        keyboard.keyboard[0][0].callback_data,
+    ) == {
+        "@": "hotel_details",
+        "search_key": search_key,
+        "property_id": property_id,
+        "photo_amount": "5",
+    }
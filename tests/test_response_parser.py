@@ -0,0 +1,51 @@
+"""Tests of msgspec and json parsers of Hotels API responses."""
+
+from json import dumps, loads
+from os import path
+
+import pytest
+
+from handlers.sites_API import response_parser
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from handlers.sites_API.response_parser import parse_properties
+
+hotels_in_city_path = path.join(
+    path.dirname(response_parser.__file__),
+    "hotels_response_files",
+    "1239955520_Top Budget Hotels_Lisbon, Lisbon District, Portugal"
+    "_hotels_in_city.json",
+)
+
+
+@pytest.fixture
+def malformed_page() -> bytes:
+    """Create found hotels page with malformed found hotels."""
+
+    with open(hotels_in_city_path, "rb") as file:
+        response = loads(file.read())
+    properties = response["data"]["propertySearch"]["properties"][:5]
+    properties[1]["id"] = int(properties[1]["id"])
+    properties[2]["price"] = None
+    properties[3]["price"] = "unknown"
+    properties[4]["price"]["displayMessages"] = None
+    response["data"]["propertySearch"]["properties"] = properties
+    return dumps(response).encode()
+
+
+@pytest.mark.skipif(
+    response_parser.msgspec is None, reason="msgspec is not installed",
+)
+def test_malformed_hotel_does_not_fail_page(
+    malformed_page: bytes, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    msgspec_properties = parse_properties(malformed_page)
+    monkeypatch.setattr(response_parser, "msgspec", None)
+    json_properties = parse_properties(malformed_page)
+
+    assert len(msgspec_properties) == len(json_properties) == 4
+    assert msgspec_properties[1]["id"] == json_properties[1]["id"]
+    assert (
+        HotelsApi._create_hotel_summaries(msgspec_properties)
+        == HotelsApi._create_hotel_summaries(json_properties)
+    )
+    assert len(HotelsApi._create_hotel_summaries(json_properties)) == 2
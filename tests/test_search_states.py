@@ -0,0 +1,157 @@
+"""Tests of budget and luxury hotel search scenarios up to photos prompt."""
+
+from concurrent.futures import Future
+from threading import Event
+from time import monotonic
+from types import SimpleNamespace
+
+import pytest
+
+from handlers.messages import (
+    top_budget_hotels_search_states,
+    top_luxury_hotels_search_states,
+)
+from handlers.messages.commands_handlers.high_price import (
+    handle_high_price_command,
+)
+from handlers.messages.commands_handlers.low_price import (
+    handle_low_price_command,
+)
+from handlers.messages.states_handlers.search_hotels_amount import (
+    msg_select_hotel_photos,
+)
+from handlers.messages.states_handlers.search_trevellers import (
+    msg_select_hotels_amount,
+)
+from handlers.messages.utils.state_data import StateData
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from loader import bot
+from states.budget_search import BudgetSearchStates
+from states.luxury_search import LuxurySearchStates
+
+chat_id = 1001
+user_id = 2002
+confirmed_city = {
+    "region_id": "2872",
+    "check_in_date": {"day": 1, "month": 6, "year": 2030},
+    "check_out_date": {"day": 5, "month": 6, "year": 2030},
+}
+
+
+def create_message(text: str) -> SimpleNamespace:
+    """Create user message with required fields of telebot Message."""
+
+    return SimpleNamespace(
+        chat=SimpleNamespace(id=chat_id),
+        from_user=SimpleNamespace(id=user_id),
+        text=text,
+    )
+
+
+@pytest.fixture
+def prefetched_payloads(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    """Collect payloads of started prefetches instead of requesting API."""
+
+    payloads = []
+    monkeypatch.setattr(
+        HotelsApi,
+        "_prefetch_hotels",
+        lambda user_id, search_settings, payload, *args: payloads.append(
+            payload,
+        ),
+    )
+    yield payloads
+    HotelsApi.cancel_prefetch(chat_id, user_id)
+
+
+@pytest.mark.parametrize(
+    "handle_command, states_module, states",
+    [
+        (
+            handle_low_price_command,
+            top_budget_hotels_search_states,
+            BudgetSearchStates,
+        ),
+        (
+            handle_high_price_command,
+            top_luxury_hotels_search_states,
+            LuxurySearchStates,
+        ),
+    ],
+)
+def test_travellers_and_hotels_amount_prompts(
+    handle_command,
+    states_module,
+    states,
+    sent_messages: list[str],
+    prefetched_payloads: list[dict],
+) -> None:
+    handle_command(chat_id, user_id)
+    StateData.save_multiple_user_data(chat_id, user_id, confirmed_city)
+    bot.set_state(user_id, states.travellers_amount, chat_id)
+
+    states_module.travellers_state(create_message("2"))
+
+    assert sent_messages[-1] == msg_select_hotels_amount
+    assert bot.get_state(user_id, chat_id) == states.hotels_amount.name
+    assert not prefetched_payloads
+
+    states_module.hotels_amount_state(create_message("3"))
+
+    assert sent_messages[-1] == msg_select_hotel_photos
+    assert bot.get_state(user_id, chat_id) == (
+        states.hotels_photos_display.name
+    )
+    HotelsApi._prefetches[(chat_id, user_id)][0].result(timeout=5)
+    assert len(prefetched_payloads) == 1
+    assert prefetched_payloads[0]["rooms"] == [
+        {"adults": 2, "children": []},
+    ]
+    assert prefetched_payloads[0] == HotelsApi.create_hotel_search_payload(
+        StateData.get_full_user_data(chat_id, user_id),
+    )
+
+
+def test_new_command_cancels_prefetch(
+    sent_messages: list[str], prefetched_payloads: list[dict],
+) -> None:
+    handle_low_price_command(chat_id, user_id)
+    StateData.save_multiple_user_data(
+        chat_id, user_id, dict(confirmed_city, adults=1, hotels_amount=3),
+    )
+    HotelsApi.prefetch_hotels_in_city(chat_id, user_id)
+
+    assert (chat_id, user_id) in HotelsApi._prefetches
+
+    handle_high_price_command(chat_id, user_id)
+
+    assert (chat_id, user_id) not in HotelsApi._prefetches
+
+
+def test_prefetch_of_user_who_left_search_expires(
+    sent_messages: list[str],
+    prefetched_payloads: list[dict],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    left_user_key = (chat_id + 1, user_id + 1)
+    left_future = Future()
+    left_cancel_event = Event()
+    monkeypatch.setitem(
+        HotelsApi._prefetches,
+        left_user_key,
+        (
+            left_future, "payload_key", left_cancel_event,
+            monotonic() - HotelsApi._prefetch_ttl - 1,
+        ),
+    )
+    handle_low_price_command(chat_id, user_id)
+    StateData.save_multiple_user_data(
+        chat_id, user_id, dict(confirmed_city, adults=1, hotels_amount=3),
+    )
+
+    HotelsApi.prefetch_hotels_in_city(chat_id, user_id)
+
+    assert left_user_key not in HotelsApi._prefetches
+    assert left_future.cancelled()
+    assert left_cancel_event.is_set()
+    assert (chat_id, user_id) in HotelsApi._prefetches
@@ -0,0 +1,135 @@
+"""Tests of circuit breaker and hedging in HotelsApi request sending."""
+
+from threading import Thread, current_thread
+from time import monotonic, sleep
+
+import pytest
+from requests import exceptions
+
+from handlers.sites_API.endpoint_policy import CircuitOpenError, EndpointPolicy
+from handlers.sites_API.rapidapi_hotels import HotelsApi
+from handlers.sites_API.rate_limiter import RateLimitError
+
+endpoint = HotelsApi._get_hotel_details_endpoint
+
+
+@pytest.fixture
+def policy(monkeypatch: pytest.MonkeyPatch) -> EndpointPolicy:
+    """Replace details endpoint policy with policy of short windows."""
+
+    endpoint_policy = EndpointPolicy(
+        endpoint,
+        max_read_timeout=1,
+        min_samples=5,
+        failure_threshold=1,
+        open_seconds=0.05,
+    )
+    monkeypatch.setitem(
+        HotelsApi._endpoint_policies, endpoint, endpoint_policy,
+    )
+    return endpoint_policy
+
+
+def test_trial_request_rejected_by_rate_limiter_releases_circuit(
+    policy: EndpointPolicy, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def raise_rate_limit_error(*args) -> float:
+        raise RateLimitError("Quota is exhausted")
+
+    policy.record_failure()
+    with pytest.raises(CircuitOpenError):
+        HotelsApi._send_request("POST", endpoint)
+    sleep(policy.open_seconds)
+    monkeypatch.setattr(
+        HotelsApi._rate_limiter, "acquire", raise_rate_limit_error,
+    )
+
+    with pytest.raises(RateLimitError):
+        HotelsApi._send_request("POST", endpoint)
+
+    assert policy.before_request()
+
+
+def test_hedged_requests_are_not_queued(
+    policy: EndpointPolicy, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    request_time = 0.3
+    requests_number = 12
+    responses = []
+
+    def send_slow_request(method: str, endpoint: str, **kwargs) -> str:
+        sleep(request_time)
+        return "response"
+
+    for _ in range(policy.min_samples):
+        policy.record_success(latency=1)
+    monkeypatch.setattr(
+        HotelsApi, "_send_single_request", send_slow_request,
+    )
+    threads = [
+        Thread(
+            target=lambda: responses.append(
+                HotelsApi._send_request("POST", endpoint),
+            ),
+        )
+        for _ in range(requests_number)
+    ]
+
+    started_at = monotonic()
+    for i_thread in threads:
+        i_thread.start()
+    for i_thread in threads:
+        i_thread.join()
+
+    assert policy.get_hedge_delay() == 1
+    assert responses == ["response"] * requests_number
+    assert monotonic() - started_at < request_time * 2
+
+
+def test_fast_request_is_sent_on_caller_thread_without_hedge(
+    policy: EndpointPolicy, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hedge_delay = 0.05
+    request_threads = []
+
+    def send_fast_request(method: str, endpoint: str, **kwargs) -> str:
+        request_threads.append(current_thread())
+        return "response"
+
+    monkeypatch.setattr(policy, "hedge_ratio", 1)
+    for _ in range(policy.min_samples):
+        policy.record_success(latency=hedge_delay)
+    monkeypatch.setattr(
+        HotelsApi, "_send_single_request", send_fast_request,
+    )
+
+    response = HotelsApi._send_request("POST", endpoint)
+    sleep(hedge_delay * 3)
+
+    assert response == "response"
+    assert request_threads == [current_thread()]
+    assert policy.hedged == 0
+
+
+def test_late_failed_request_returns_hedged_response(
+    policy: EndpointPolicy, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hedge_delay = 0.05
+    request_threads = []
+
+    def send_request(method: str, endpoint: str, **kwargs) -> str:
+        request_threads.append(current_thread())
+        if current_thread() is not test_thread:
+            return "hedged response"
+        sleep(hedge_delay * 4)
+        raise exceptions.ReadTimeout("Read timed out")
+
+    test_thread = current_thread()
+    monkeypatch.setattr(policy, "hedge_ratio", 1)
+    for _ in range(policy.min_samples):
+        policy.record_success(latency=hedge_delay)
+    monkeypatch.setattr(HotelsApi, "_send_single_request", send_request)
+
+    assert HotelsApi._send_request("POST", endpoint) == "hedged response"
+    assert len(request_threads) == 2
+    assert policy.hedged == 1
@@ -0,0 +1,31 @@
+"""Tests of streaming selection of the most expensive hotels."""
+
+from handlers.sites_API.top_price_selector import TopPriceSelector
+
+
+def create_page(prices: list[float]) -> list[dict]:
+    """Create found hotels page with hotel prices."""
+
+    return [
+        {"id": str(i_price), "price": {"lead": {"amount": i_price}}}
+        for i_price in prices
+    ]
+
+
+def test_selector_keeps_most_expensive_hotels_of_all_pages() -> None:
+    selector = TopPriceSelector(2)
+
+    selector.add_page(create_page([10, 50, 20]), 3)
+    selector.add_page(create_page([40, 30, 60]), 3)
+
+    assert [i_hotel["id"] for i_hotel in selector.result()] == ["60", "50"]
+    assert not selector.exhausted
+
+
+def test_short_page_exhausts_selector() -> None:
+    selector = TopPriceSelector(2)
+
+    selector.add_page(create_page([10, 50]), 3)
+
+    assert selector.exhausted
+    assert selector.stats()["pages"] == 1